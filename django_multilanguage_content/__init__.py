@@ -1,10 +1,14 @@
 from . import admin, serializers
-from .logic import register, to_translation
+from .logic import bulk_translate, register, to_translation
+from .managers import TranslationManager, TranslationQuerySet
 
 
 __all__ = [
     'admin',
     'serializers',
     'to_translation',
+    'bulk_translate',
+    'TranslationManager',
+    'TranslationQuerySet',
     'register'
 ]
@@ -1,6 +1,15 @@
 import typing
 from itertools import chain
-from .logic import global_langs, translation_models_list
+from django import forms
+from django.contrib import messages
+from django.contrib.admin.options import InlineModelAdmin
+from django.contrib.auth import get_permission_codename
+from django.forms.models import fields_for_model, model_to_dict
+from .exceptions import PartialTranslationError, ResponseError
+from .logic import bulk_translate, global_langs, source_hashes, source_language
+from .registry import registry
+from .storage import LANG_FIELD, SOURCE_HASHES_FIELD
+from .translator import main_translator
 
 
 def setup_inlines(*args):
@@ -21,7 +30,7 @@ class TranslateAdminInlines:
                  include_langs=(),
                  exclude_langs=(),
                  **kwargs):
-        assert base_translating_model in translation_models_list, 'This model is not registered as translatable'
+        assert base_translating_model in registry, 'This model is not registered as translatable'
         self.base_model = base_translating_model
         self.inliner = inliner_type
         self.kwargs = kwargs
@@ -30,8 +39,12 @@ class TranslateAdminInlines:
         self.include_langs = [include_lang.lower() for include_lang in include_langs]
         self.exclude_langs = [exclude_lang.lower() for exclude_lang in exclude_langs]
         self.langs = global_langs
+        self.storage = base_translating_model.get_translation_storage()
 
         self._prepare_langs()
+        if self.storage.single_table:
+            # one inline, rows of all chosen languages
+            self.langs = iter([tuple(self.langs)])
 
     def _prepare_langs(self) -> typing.NoReturn:
         """ Method deal with global_langs stuff """
@@ -45,14 +58,194 @@ class TranslateAdminInlines:
             self.langs = iter(self.langs)
 
     def _prepare_item(self):
+        if self.storage.single_table:
+            return self._prepare_single_table_item(next(self.langs))
         lang = next(self.langs)  # make langs iterator
         name = self.base_model.get_translate_model_name(lang)  # getting our model created name
         base = (self.inliner,)  # set up inliner class
         dct = {'model': self.base_model.get_connected_translated_model_class(lang), **self.kwargs}  # creating dict
         return type(name, base, dct)  # returning class
 
+    def _prepare_single_table_item(self, langs):
+        inliner = self.inliner
+
+        def get_queryset(inline, request):
+            return inliner.get_queryset(inline, request).filter(**{f'{LANG_FIELD}__in': langs})
+
+        name = self.storage.translation_model.__name__
+        dct = {'model': self.storage.translation_model, 'get_queryset': get_queryset, **self.kwargs}
+        return type(name, (inliner,), dct)
+
     def __iter__(self):
         return self
 
     def __next__(self):
         return self._prepare_item()
+
+
+class TranslationFormSet(forms.BaseFormSet):
+    """
+    Form per language over connected records of one instance, whatever storage keeps them.
+    Records of all languages are loaded with one query
+    """
+    base_model = None
+    langs = ()
+    field_names = ()
+
+    def __init__(self, data=None, files=None, instance=None, prefix=None, queryset=None, save_as_new=False,
+                 **kwargs):
+        self.instance = instance
+        self.storage = self.base_model.get_translation_storage()
+        self.records = {}
+        if instance is not None and instance.pk is not None and not save_as_new:
+            self.records = self.storage.get_many(instance, self.langs)
+        initial = [
+            model_to_dict(self.records[lang], fields=self.field_names) if lang in self.records else {}
+            for lang in self.langs
+        ]
+        super().__init__(data, files, prefix=prefix, initial=initial, **kwargs)
+        self.new_objects, self.changed_objects, self.deleted_objects = [], [], []
+
+    @classmethod
+    def get_default_prefix(cls):
+        return f'{cls.base_model._meta.model_name}_translations'
+
+    def _construct_form(self, i, **kwargs):
+        missing = i < len(self.langs) and self.langs[i] not in self.records
+        if missing:
+            # missing record may stay empty
+            kwargs['empty_permitted'] = True
+        form = super()._construct_form(i, **kwargs)
+        if missing:
+            # fields left blank are machine translated
+            for field in form.fields.values():
+                field.required = False
+        form.lang = self.langs[i] if i < len(self.langs) else None
+        return form
+
+    def get_queryset(self):
+        """Connected record or None per form, like model formsets"""
+        return [self.records.get(lang) for lang in self.langs]
+
+    def save(self, commit=True):
+        """Save edited languages. Records are read again - saved instance may have been translated meanwhile"""
+        changed = [(lang, form) for lang, form in zip(self.langs, self.forms) if form.has_changed()]
+        if not changed:
+            return []
+        records = self.storage.get_many(self.instance, [lang for lang, _ in changed])
+        saved = []
+        for lang, form in changed:
+            data = {name: form.cleaned_data[name] for name in form.changed_data}
+            record = records.get(lang)
+            if record is None:
+                record = self._new_record(lang, data)
+                self.new_objects.append(record)
+            else:
+                for name, value in data.items():
+                    setattr(record, name, value)
+                self.changed_objects.append((record, form.changed_data))
+            if commit:
+                record.save()
+            saved.append(record)
+        return saved
+
+
+    def _new_record(self, lang, data):
+        """
+        Record of missing language: edited fields as entered, others machine translated.
+        If translator fails they keep source values without source hashes, so they stay stale
+        """
+        values = dict(zip(self.field_names, (getattr(self.instance, name) for name in self.field_names)))
+        untouched = [name for name in self.field_names if name not in data]
+        translated_names = list(data)
+        if untouched:
+            source = source_language(self.instance, list(values.values()))
+            try:
+                data = {**dict(zip(untouched, main_translator([values[name] for name in untouched], lang, source))),
+                        **data}
+                translated_names = list(self.field_names)
+            except ResponseError:
+                data = {**values, **data}
+        return self.storage.new_record(self.instance, lang, {
+            **data,
+            SOURCE_HASHES_FIELD: source_hashes(translated_names, [values[name] for name in translated_names]),
+        })
+
+
+class TranslationsInline(InlineModelAdmin):
+    """
+    One inline for connected records of all languages, rendered as one table: row per language,
+    column per translated field. Build it with translations_inline()
+    """
+    template = 'django_multilanguage_content/admin/translations_inline.html'
+    base_model = None
+    langs = ()
+    extra = 0
+    can_delete = False
+    view_on_site = False
+
+    def get_formset(self, request, obj=None, **kwargs):
+        field_names = tuple(field.name for field in self.base_model.get_translation_options().fields)
+        form = type(f'{self.base_model.__name__}TranslationForm', (forms.Form,),
+                    fields_for_model(self.model, fields=field_names))
+        formset = forms.formset_factory(form, formset=TranslationFormSet, extra=0, max_num=len(self.langs),
+                                        validate_max=True)
+        formset.base_model, formset.langs, formset.field_names = self.base_model, tuple(self.langs), field_names
+        return formset
+
+    def _has_parent_permission(self, request, action):
+        opts = self.parent_model._meta
+        return request.user.has_perm(f'{opts.app_label}.{get_permission_codename(action, opts)}')
+
+    def has_add_permission(self, request, obj=None):
+        # languages are fixed, forms of missing records create them
+        return False
+
+    def has_delete_permission(self, request, obj=None):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return self._has_parent_permission(request, 'change')
+
+    def has_view_permission(self, request, obj=None):
+        return self._has_parent_permission(request, 'view') or self.has_change_permission(request, obj)
+
+
+def translations_inline(base_translating_model, include_langs=(), exclude_langs=(), **kwargs):
+    """
+    TranslationsInline class of model. Unlike TranslateAdminInlines, all languages are one formset
+    loaded with one query
+    """
+    assert base_translating_model in registry, 'This model is not registered as translatable'
+    include_langs = [lang.lower() for lang in include_langs]
+    exclude_langs = [lang.lower() for lang in exclude_langs]
+    if include_langs and exclude_langs:
+        raise ValueError("Not possible include and exclude languages")
+    langs = base_translating_model.get_translation_langs()
+    if include_langs:
+        langs = [lang for lang in include_langs if lang in langs]
+    langs = tuple(lang for lang in langs if lang not in exclude_langs)
+    attrs = {
+        'model': base_translating_model.get_connected_translated_model_class(langs[0]),
+        'base_model': base_translating_model,
+        'langs': langs,
+        'verbose_name_plural': 'translations',
+        **kwargs,
+    }
+    return type(f'{base_translating_model.__name__}TranslationsInline', (TranslationsInline,), attrs)
+
+
+def translate_selected(modeladmin, request, queryset):
+    """Admin action. Retranslate selected objects to every language with bulk_translate, in packed batches"""
+    try:
+        translated = bulk_translate(queryset, overwrite=True)
+    except PartialTranslationError as e:
+        # other languages are saved already
+        modeladmin.message_user(request, str(e), messages.WARNING)
+        return
+    modeladmin.message_user(request, f'Translated {len(queryset)} objects to {", ".join(translated)}',
+                            messages.SUCCESS)
+
+
+translate_selected.short_description = '(Re)translate selected %(verbose_name_plural)s'
+translate_selected.allowed_permissions = ('change',)
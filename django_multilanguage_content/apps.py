@@ -0,0 +1,13 @@
+from django.apps import AppConfig
+
+
+class MultilanguageContentConfig(AppConfig):
+    default_auto_field = 'django.db.models.AutoField'
+    name = 'django_multilanguage_content'
+    verbose_name = 'Multilanguage content'
+
+    def ready(self):
+        from django.conf import settings
+        if getattr(settings, 'TRANSLATION_METRICS', False):
+            from .metrics import install
+            install()
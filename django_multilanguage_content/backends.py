@@ -0,0 +1,398 @@
+import asyncio
+import inspect
+import json
+import os
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterator, List, Optional, Tuple
+from asgiref.sync import async_to_sync, sync_to_async
+from django.utils.module_loading import import_string
+from .exceptions import ResponseError
+
+
+# boundaries long text is split at, in order of preference: paragraphs, sentences, words
+SPLIT_PATTERNS = (
+    re.compile(r'(\n\s*\n)'),
+    re.compile(r'(?<=[.!?;\u3002\uff01\uff1f])(\s+)'),
+    re.compile(r'(\s+)'),
+)
+
+
+def split_text(text: str, limit: int, level: int = 0) -> Tuple[List[str], List[str]]:
+    """
+    Split text into chunks up to limit characters at paragraph, sentence or word boundaries,
+    text without boundaries is cut.
+    :return tuple[chunks, separators between chunks] - text == chunks[0] + separators[0] + chunks[1] ...
+    """
+    if len(text) <= limit:
+        return [text], []
+    if level >= len(SPLIT_PATTERNS):
+        chunks = [text[start:start + limit] for start in range(0, len(text), limit)]
+        return chunks, [''] * (len(chunks) - 1)
+    parts = SPLIT_PATTERNS[level].split(text)
+    units = []  # [(piece, separator before it)]
+    for index, piece in enumerate(parts[0::2]):
+        separator = parts[index * 2 - 1] if index else ''
+        if len(piece) > limit:
+            sub_chunks, sub_separators = split_text(piece, limit, level + 1)
+            units.append((sub_chunks[0], separator))
+            units.extend(zip(sub_chunks[1:], sub_separators))
+        else:
+            units.append((piece, separator))
+    # greedy packing of pieces back into chunks
+    chunks, separators = [], []
+    for piece, separator in units:
+        if chunks and len(chunks[-1]) + len(separator) + len(piece) <= limit:
+            chunks[-1] += separator + piece
+        else:
+            if chunks:
+                separators.append(separator)
+            chunks.append(piece)
+    return chunks, separators
+
+
+class BaseBackend:
+    """
+    Translation backend interface. Subclasses implement translate_batch(), backends with async client
+    implement atranslate_batch() too, otherwise it runs translate_batch() in thread.
+    Backends with accepts_source get source language as translate_batch(values, lang, source=..),
+    backends with detects_language implement detect()
+    :param name - backend name, used in health stats and translation memory
+    :param max_batch_items - values per one provider request, None - unlimited
+    :param max_batch_chars - characters per one provider request, None - unlimited.
+                             Longer texts are split into chunks at paragraph or sentence boundaries
+    :param max_parallel_requests - provider requests sent at once, when values don't fit one request
+    :param rate_limit - RateLimiter every provider request waits for
+    """
+    name = 'base'
+    default_max_batch_chars = None
+    accepts_source = False
+    detects_language = False
+
+    def __init__(self, name: Optional[str] = None, max_batch_items: Optional[int] = None,
+                 max_batch_chars: Optional[int] = None, max_parallel_requests: int = 4, rate_limit=None):
+        if name:
+            self.name = name
+        self.max_batch_items = max_batch_items
+        self.max_batch_chars = max_batch_chars or self.default_max_batch_chars
+        self.max_parallel_requests = max_parallel_requests
+        self.rate_limit = rate_limit
+        self._executor = None
+        self._executor_lock = threading.Lock()
+
+    def translate_batch(self, values: List, lang: str) -> List:
+        raise NotImplementedError
+
+    def detect(self, text: str) -> str:
+        """Language code of text"""
+        raise NotImplementedError
+
+    def _source_kwargs(self, source: Optional[str]) -> Dict:
+        return {'source': source} if source and self.accepts_source else {}
+
+    def batches(self, values: List) -> Iterator[List]:
+        """Split values by batch limits, order is kept"""
+        batch, chars = [], 0
+        for value in values:
+            size = len(str(value))
+            if batch and (
+                (self.max_batch_items and len(batch) >= self.max_batch_items)
+                or (self.max_batch_chars and chars + size > self.max_batch_chars)
+            ):
+                yield batch
+                batch, chars = [], 0
+            batch.append(value)
+            chars += size
+        if batch:
+            yield batch
+
+    def pack(self, values: List) -> Tuple[List, List]:
+        """
+        Split values longer than max_batch_chars into chunks
+        :return tuple[pieces to translate, layout - (first piece index, separators or None) per value]
+        """
+        pieces, layout = [], []
+        for value in values:
+            if isinstance(value, str) and self.max_batch_chars and len(value) > self.max_batch_chars:
+                chunks, separators = split_text(value, self.max_batch_chars)
+                layout.append((len(pieces), separators))
+                pieces.extend(chunks)
+            else:
+                layout.append((len(pieces), None))
+                pieces.append(value)
+        return pieces, layout
+
+    @staticmethod
+    def unpack(translated: List, layout: List) -> List:
+        """Reassemble translated chunks in order"""
+        values = []
+        for start, separators in layout:
+            if separators is None:
+                values.append(translated[start])
+                continue
+            value = translated[start]
+            for offset, separator in enumerate(separators, 1):
+                value += separator + translated[start + offset]
+            values.append(value)
+        return values
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        with self._executor_lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.max_parallel_requests,
+                                                    thread_name_prefix=f'translation-{self.name}')
+            return self._executor
+
+    def _translate_piece_batch(self, batch: List, lang: str, source: Optional[str] = None) -> List:
+        """Whitespace only chunks are not sent to provider"""
+        to_send = [piece for piece in batch if not (isinstance(piece, str) and not piece.strip())]
+        if not to_send:
+            return list(batch)
+        if self.rate_limit is not None:
+            self.rate_limit.acquire(sum(len(str(piece)) for piece in to_send))
+        translated = iter(self.translate_batch(to_send, lang, **self._source_kwargs(source)))
+        return [piece if isinstance(piece, str) and not piece.strip() else next(translated) for piece in batch]
+
+    async def atranslate_batch(self, values: List, lang: str, **kwargs) -> List:
+        return await sync_to_async(self.translate_batch, thread_sensitive=False)(values, lang, **kwargs)
+
+    async def _atranslate_piece_batch(self, batch: List, lang: str, semaphore: asyncio.Semaphore,
+                                      source: Optional[str] = None) -> List:
+        to_send = [piece for piece in batch if not (isinstance(piece, str) and not piece.strip())]
+        if not to_send:
+            return list(batch)
+        if self.rate_limit is not None:
+            await self.rate_limit.aacquire(sum(len(str(piece)) for piece in to_send))
+        async with semaphore:
+            translated = iter(await self.atranslate_batch(to_send, lang, **self._source_kwargs(source)))
+        return [piece if isinstance(piece, str) and not piece.strip() else next(translated) for piece in batch]
+
+    async def atranslate(self, values: List, lang: str, source: Optional[str] = None) -> List:
+        """Async translate(), requests are awaited concurrently up to max_parallel_requests"""
+        pieces, layout = self.pack(list(values))
+        semaphore = asyncio.Semaphore(max(self.max_parallel_requests, 1))
+        results = await asyncio.gather(*(
+            self._atranslate_piece_batch(batch, lang, semaphore, source) for batch in self.batches(pieces)
+        ))
+        return self.unpack([piece for result in results for piece in result], layout)
+
+    def translate(self, values: List, lang: str, source: Optional[str] = None) -> List:
+        """
+        Pack values into requests within batch limits, send them in parallel, keep values order
+        :param source - language of values, None - detected by provider
+        """
+        pieces, layout = self.pack(list(values))
+        batches = list(self.batches(pieces))
+        if len(batches) > 1 and self.max_parallel_requests > 1:
+            results = list(self._get_executor().map(
+                lambda batch: self._translate_piece_batch(batch, lang, source), batches
+            ))
+        else:
+            results = [self._translate_piece_batch(batch, lang, source) for batch in batches]
+        return self.unpack([piece for result in results for piece in result], layout)
+
+
+class GoogletransBackend(BaseBackend):
+    """googletrans client. Clients are reused, one per thread"""
+    name = 'googletrans'
+    default_max_batch_chars = 5000  # provider limit of one request
+    accepts_source = True
+    detects_language = True
+
+    def __init__(self, service_urls=('translate.googleapis.com',), **kwargs):
+        super().__init__(**kwargs)
+        self.service_urls = list(service_urls)
+        self._clients = threading.local()
+
+    def _client(self):
+        client = getattr(self._clients, 'client', None)
+        if client is None:
+            from googletrans import Translator
+            client = self._clients.client = Translator(service_urls=self.service_urls)
+        return client
+
+    @staticmethod
+    def _async_client() -> bool:
+        """googletrans 4.0.2+ client is async, 3.x one (pinned in setup.cfg) is sync"""
+        from googletrans import Translator
+        return inspect.iscoroutinefunction(Translator.translate)
+
+    def translate_batch(self, values, lang, source='auto'):
+        if self._async_client():
+            return async_to_sync(self.atranslate_batch)(values, lang, source=source)
+        return [d.text for d in self._client().translate(text=list(values), dest=lang, src=source)]
+
+    def detect(self, text):
+        if self._async_client():
+            return async_to_sync(self._adetect)(text)
+        return self._client().detect(text).lang
+
+    async def _adetect(self, text):
+        from googletrans import Translator
+        async with Translator(service_urls=self.service_urls) as client:
+            return (await client.detect(text)).lang
+
+    async def atranslate_batch(self, values, lang, source='auto'):
+        """Async client is awaited on event loop, sync one is run in thread"""
+        if not self._async_client():
+            return await super().atranslate_batch(values, lang, source=source)
+        from googletrans import Translator
+        async with Translator(service_urls=self.service_urls) as client:
+            return [d.text for d in await client.translate(list(values), dest=lang, src=source)]
+
+
+class DeepTranslatorBackend(BaseBackend):
+    """deep_translator GoogleTranslator. Clients are reused, one per thread and (source, target) languages"""
+    name = 'deep_translator'
+    default_max_batch_chars = 5000  # provider limit of one text
+    accepts_source = True
+
+    def __init__(self, source='auto', **kwargs):
+        super().__init__(**kwargs)
+        self.source = source
+        self._clients = threading.local()
+
+    def _client(self, lang, source):
+        clients = getattr(self._clients, 'clients', None)
+        if clients is None:
+            clients = self._clients.clients = {}
+        if (source, lang) not in clients:
+            from deep_translator import GoogleTranslator
+            clients[source, lang] = GoogleTranslator(source=source, target=lang)
+        return clients[source, lang]
+
+    def translate_batch(self, values, lang, source=None):
+        return self._client(lang, source or self.source).translate_batch(batch=list(values))
+
+
+class LocalBackend(BaseBackend):
+    """
+    Offline deterministic backend. Values found in dictionary {lang: {text: translated}} are
+    translated by it, others are formatted with template
+    :param latency - seconds slept per request, to imitate remote provider
+    :param detected - language detect() reports for any text, None - detection is not supported
+    """
+    name = 'local'
+    accepts_source = True
+
+    def __init__(self, dictionary: Optional[Dict[str, Dict[str, str]]] = None, template: str = '{text}',
+                 latency: float = 0.0, detected: Optional[str] = None, **kwargs):
+        super().__init__(**kwargs)
+        self.dictionary = dictionary or {}
+        self.template = template
+        self.latency = latency
+        self.detected = detected
+
+    @property
+    def detects_language(self):
+        return self.detected is not None
+
+    def detect(self, text):
+        return self.detected
+
+    def translate_batch(self, values, lang, source=None):
+        if self.latency:
+            time.sleep(self.latency)
+        return self._lookup(values, lang)
+
+    async def atranslate_batch(self, values, lang, source=None):
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        return self._lookup(values, lang)
+
+    def _lookup(self, values, lang):
+        known = self.dictionary.get(lang, {})
+        return [
+            known.get(value, self.template.format(text=value, lang=lang)) if isinstance(value, str) else value
+            for value in values
+        ]
+
+
+class RecordReplayBackend(BaseBackend):
+    """
+    Records responses of wrapped backend into JSON file {lang: {text: translated}} and replays them.
+    :param path - file path
+    :param backend - wrapped backend config, same format as TRANSLATION_BACKENDS item
+    :param mode - 'replay' (missing value is an error), 'record' (always call wrapped backend),
+                  'auto' (replay known values, record missing ones)
+    """
+    name = 'record_replay'
+
+    def __init__(self, path: str, backend: Optional[Dict] = None, mode: str = 'auto', **kwargs):
+        super().__init__(**kwargs)
+        if mode not in ('replay', 'record', 'auto'):
+            raise ValueError(f'Unknown record/replay mode {mode}')
+        if mode != 'replay' and backend is None:
+            raise ValueError(f'Wrapped backend is required in {mode} mode')
+        self.path = path
+        self.mode = mode
+        self.backend = load_backend(backend) if backend is not None else None
+        self._lock = threading.Lock()
+        self._records = {}
+        if os.path.exists(path):
+            with open(path, encoding='utf-8') as records_file:
+                self._records = json.load(records_file)
+
+    @property
+    def accepts_source(self):
+        return self.backend is not None and self.backend.accepts_source
+
+    def translate_batch(self, values, lang, source=None):
+        with self._lock:
+            known = dict(self._records.get(lang, {}))
+        missing = [value for value in values if self.mode == 'record' or str(value) not in known]
+        if missing:
+            if self.mode == 'replay':
+                raise ResponseError(f'No recorded translation to {lang} for {missing[0]!r}')
+            known.update((str(value), translated) for value, translated in
+                         zip(missing, self.backend.translate(missing, lang, source)))
+            self._save({str(value): known[str(value)] for value in missing}, lang)
+        return [known[str(value)] for value in values]
+
+    def _save(self, records: Dict[str, str], lang: str):
+        with self._lock:
+            self._records.setdefault(lang, {}).update(records)
+            with open(self.path, 'w', encoding='utf-8') as records_file:
+                json.dump(self._records, records_file, ensure_ascii=False, indent=1, sort_keys=True)
+
+
+DEFAULT_BACKENDS = [
+    {'BACKEND': 'django_multilanguage_content.backends.GoogletransBackend'},
+    {'BACKEND': 'django_multilanguage_content.backends.DeepTranslatorBackend'},
+]
+
+
+def load_backend(config: Dict) -> BaseBackend:
+    """
+    Create backend from config
+    {'BACKEND': dotted path, 'NAME': .., 'MAX_BATCH_ITEMS': .., 'MAX_BATCH_CHARS': .., 'MAX_PARALLEL_REQUESTS': ..,
+     'RATE_LIMIT': {'REQUESTS_PER_SECOND': .., 'CHARS_PER_SECOND': .., 'BURST': ..}, 'OPTIONS': {..}}
+    """
+    backend_class = import_string(config['BACKEND'])
+    backend = backend_class(
+        name=config.get('NAME'),
+        max_batch_items=config.get('MAX_BATCH_ITEMS'),
+        max_batch_chars=config.get('MAX_BATCH_CHARS'),
+        max_parallel_requests=config.get('MAX_PARALLEL_REQUESTS', 4),
+        **config.get('OPTIONS', {})
+    )
+    if config.get('RATE_LIMIT'):
+        from .ratelimit import RateLimiter
+        limit = config['RATE_LIMIT']
+        backend.rate_limit = RateLimiter(
+            backend.name,
+            requests_per_second=limit.get('REQUESTS_PER_SECOND'),
+            chars_per_second=limit.get('CHARS_PER_SECOND'),
+            burst=limit.get('BURST', 1.0),
+        )
+    return backend
+
+
+def load_backends(configs: List[Dict]) -> List[BaseBackend]:
+    backends = [load_backend(config) for config in configs]
+    names = [backend.name for backend in backends]
+    if len(set(names)) != len(names):
+        raise ValueError(f'Translation backends names must be unique, got {names}')
+    return backends
@@ -0,0 +1,114 @@
+"""
+Read-through cache of serialized translations, on top of Django cache framework. Enabled by TRANSLATION_CACHE = True.
+Keys are versioned: data key includes model version and object version tokens, so an object is invalidated
+by replacing its token and the whole model - by replacing model token, stale entries just expire
+"""
+import uuid
+from typing import Callable, Dict, List, NoReturn, Type
+from django.conf import settings
+from django.db.models import Model
+from django.db.models.signals import post_delete, post_save
+
+cache_alias = getattr(settings, 'TRANSLATION_CACHE_ALIAS', 'default')
+cache_timeout = getattr(settings, 'TRANSLATION_CACHE_TIMEOUT', 24 * 60 * 60)  # seconds
+
+
+def cache_enabled() -> bool:
+    """Read on every call, so the cache may be switched by override_settings"""
+    return getattr(settings, 'TRANSLATION_CACHE', False)
+
+
+def _new_token() -> str:
+    return uuid.uuid4().hex[:12]
+
+
+class TranslationCache:
+    """
+    Versioned keys
+        <prefix>:<model>:version            - model token, replaced by invalidate_model()
+        <prefix>:<model>:pk:<pk>            - object token, replaced when object or its translations change
+        <prefix>:<model>:lists              - token of list pages, replaced on any change of model objects
+        <prefix>:<model>:<model token>:<object or lists token>:<variant> - cached data
+    """
+    prefix = 'translation_cache'
+
+    def __init__(self, alias: str = cache_alias, timeout: int = cache_timeout):
+        self.alias = alias
+        self.timeout = timeout
+
+    @property
+    def cache(self):
+        from django.core.cache import caches
+        return caches[self.alias]
+
+    def _base_key(self, model: Type[Model]) -> str:
+        return f'{self.prefix}:{model._meta.label_lower}'
+
+    def _tokens(self, keys: List[str]) -> Dict[str, str]:
+        """Current tokens of keys, missing ones are created"""
+        tokens = self.cache.get_many(keys)
+        for key in keys:
+            if key not in tokens:
+                # another process may create it at the same time - its token wins
+                self.cache.add(key, _new_token(), timeout=None)
+                tokens[key] = self.cache.get(key)
+        return tokens
+
+    def object_key(self, model: Type[Model], pk, variant: str) -> str:
+        base = self._base_key(model)
+        version_key, object_key = f'{base}:version', f'{base}:pk:{pk}'
+        tokens = self._tokens([version_key, object_key])
+        return f'{base}:{tokens[version_key]}:{tokens[object_key]}:{variant}'
+
+    def list_key(self, model: Type[Model], variant: str) -> str:
+        base = self._base_key(model)
+        version_key, lists_key = f'{base}:version', f'{base}:lists'
+        tokens = self._tokens([version_key, lists_key])
+        return f'{base}:{tokens[version_key]}:{tokens[lists_key]}:{variant}'
+
+    def get(self, key: str):
+        return self.cache.get(key)
+
+    def set(self, key: str, value) -> NoReturn:
+        self.cache.set(key, value, timeout=self.timeout)
+
+    def get_or_set(self, key: str, producer: Callable):
+        """Read-through. producer result is cached, unless it is None"""
+        value = self.cache.get(key)
+        if value is None:
+            value = producer()
+            if value is not None:
+                self.set(key, value)
+        return value
+
+    def invalidate_object(self, model: Type[Model], pk) -> NoReturn:
+        base = self._base_key(model)
+        self.cache.set_many({f'{base}:pk:{pk}': _new_token(), f'{base}:lists': _new_token()}, timeout=None)
+
+    def invalidate_model(self, model: Type[Model]) -> NoReturn:
+        """Every cached entry of model at once, for bulk updates"""
+        self.cache.set(f'{self._base_key(model)}:version', _new_token(), timeout=None)
+
+
+translation_cache = TranslationCache()
+
+
+def connect_invalidation(model: Type[Model]) -> NoReturn:
+    """Invalidate cached object on save and delete of base model instance or any of its connected records"""
+    storage = model.get_translation_storage()
+    ptr_attname = f'{storage.ptr_name}_id'
+
+    def base_changed(sender, instance, **kwargs):
+        if cache_enabled():
+            translation_cache.invalidate_object(model, instance.pk)
+
+    def connected_changed(sender, instance, **kwargs):
+        if cache_enabled():
+            translation_cache.invalidate_object(model, getattr(instance, ptr_attname))
+
+    uid = f'translation_cache:{model._meta.label}'
+    post_save.connect(base_changed, sender=model, weak=False, dispatch_uid=uid)
+    post_delete.connect(base_changed, sender=model, weak=False, dispatch_uid=uid)
+    for connected_model in set(model.get_translation_options().connected_models.values()):
+        post_save.connect(connected_changed, sender=connected_model, weak=False, dispatch_uid=uid)
+        post_delete.connect(connected_changed, sender=connected_model, weak=False, dispatch_uid=uid)
@@ -0,0 +1,205 @@
+"""
+Consistency of connected records: base rows without record (missing), records without base row or
+in language model doesn't follow (orphaned) and records translated from other source values (stale).
+Missing and orphaned are counted with anti-joins aggregated in SQL, stale records need source hashes,
+computed in Python over one streamed pass of values per model
+"""
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+from django.conf import settings
+from django.db.models import Count, Exists, OuterRef, Q, QuerySet
+from .logic import bulk_translate, translation_batch_size, value_hash
+from .registry import registry
+from .storage import LANG_FIELD, SOURCE_HASHES_FIELD
+
+scan_sample_size = getattr(settings, 'TRANSLATION_SCAN_SAMPLE_SIZE', 10)  # pks reported per problem
+scan_chunk_size = getattr(settings, 'TRANSLATION_SCAN_CHUNK_SIZE', 2000)  # rows streamed or repaired at once
+
+
+class LangReport:
+    """Problems of connected records of one (model, lang). Samples are base pks, orphaned - connected pks"""
+
+    def __init__(self, model, lang: str):
+        self.model = model
+        self.lang = lang
+        self.missing = self.orphaned = self.stale = 0
+        self.missing_sample, self.orphaned_sample, self.stale_sample = [], [], []
+
+    @property
+    def ok(self) -> bool:
+        return not (self.missing or self.orphaned or self.stale)
+
+    def as_dict(self) -> Dict:
+        return {
+            'model': self.model._meta.label,
+            'lang': self.lang,
+            **{kind: getattr(self, kind) for kind in ('missing', 'orphaned', 'stale')},
+            **{f'{kind}_sample': getattr(self, f'{kind}_sample') for kind in ('missing', 'orphaned', 'stale')},
+        }
+
+    def __str__(self):
+        parts = [f'{kind} {getattr(self, kind)} {getattr(self, kind + "_sample")}'
+                 for kind in ('missing', 'orphaned', 'stale') if getattr(self, kind)]
+        return f'{self.model._meta.label} [{self.lang}]: {", ".join(parts) or "ok"}'
+
+
+def _orphaned_filter(model, storage) -> Q:
+    """Connected records whose base row is gone, possible without foreign key constraints or after raw deletes"""
+    return ~Exists(model._default_manager.filter(pk=OuterRef(f'{storage.ptr_name}_id')))
+
+
+def _orphaned(model, langs) -> Dict[str, Tuple[int, QuerySet]]:
+    """
+    {lang: (count, queryset)} of orphaned connected records. Table storage counts all languages in one
+    grouped query and adds languages model doesn't follow, models storage - query per language table
+    """
+    storage = model.get_translation_storage()
+    if not storage.single_table:
+        querysets = {lang: storage.connected_queryset(lang).filter(_orphaned_filter(model, storage)) for lang in langs}
+        return {lang: (queryset.count(), queryset) for lang, queryset in querysets.items()}
+    followed = model.get_translation_langs()
+    records = storage.translation_model._default_manager.filter(
+        _orphaned_filter(model, storage) | ~Q(**{f'{LANG_FIELD}__in': followed})
+    )
+    counts = records.order_by().values(LANG_FIELD).annotate(count=Count('pk')).values_list(LANG_FIELD, 'count')
+    return {
+        lang: (count, records.filter(**{LANG_FIELD: lang}))
+        for lang, count in counts if lang in langs or lang not in followed
+    }
+
+
+def _stale_pks(model, langs) -> Iterator[Tuple[str, object]]:
+    """(lang, base pk) of records whose stored source hashes differ from current values, one streamed query"""
+    storage = model.get_translation_storage()
+    field_names = [field.name for field in model.get_translation_options().fields]
+    if storage.single_table:
+        rows = storage.translation_model._default_manager.filter(**{f'{LANG_FIELD}__in': list(langs)}).values_list(
+            f'{storage.ptr_name}_id', LANG_FIELD, SOURCE_HASHES_FIELD,
+            *(f'{storage.ptr_name}__{name}' for name in field_names)
+        ).order_by().iterator(chunk_size=scan_chunk_size)
+        for pk, lang, stored_hashes, *values in rows:
+            if _is_stale(field_names, values, stored_hashes):
+                yield lang, pk
+        return
+    # every language hashes column joined to base row, source values are hashed once per row
+    rows = model._default_manager.values_list(
+        'pk', *field_names, *(f'{storage.relation_name(lang)}__{SOURCE_HASHES_FIELD}' for lang in langs)
+    ).order_by().iterator(chunk_size=scan_chunk_size)
+    for pk, *columns in rows:
+        values, lang_hashes = columns[:len(field_names)], columns[len(field_names):]
+        current = None
+        for lang, stored_hashes in zip(langs, lang_hashes):
+            if stored_hashes is None:
+                continue  # missing record
+            if current is None:
+                current = [value_hash(value) for value in values]
+            if any(stored_hashes.get(name) != hash_ for name, hash_ in zip(field_names, current)):
+                yield lang, pk
+
+
+def _is_stale(field_names, values, stored_hashes) -> bool:
+    stored_hashes = stored_hashes or {}
+    return any(stored_hashes.get(name) != value_hash(value) for name, value in zip(field_names, values))
+
+
+def _get_langs(model, langs: Optional[Iterable[str]]) -> Tuple[str, ...]:
+    followed = model.get_translation_langs()
+    if langs is None:
+        return followed
+    langs = [lang.lower() for lang in langs]
+    return tuple(lang for lang in followed if lang in langs)
+
+
+def scan_model(model, langs: Optional[Iterable[str]] = None, stale: bool = False,
+               sample_size: int = scan_sample_size) -> List[LangReport]:
+    """
+    Check connected records of model. Missing records of all languages are counted by one aggregate query
+    :param stale - also find records translated from other source values, needs full pass over records
+    """
+    langs = _get_langs(model, langs)
+    storage = model.get_translation_storage()
+    reports = {lang: LangReport(model, lang) for lang in langs}
+
+    if langs:
+        # wrapped in Q - bare Exists filter of aggregate fails to compile on some Django versions
+        counts = model._default_manager.order_by().aggregate(**{
+            f'missing_{lang}': Count('pk', filter=Q(storage.missing(lang))) for lang in langs
+        })
+        for lang in langs:
+            report = reports[lang]
+            report.missing = counts[f'missing_{lang}']
+            if report.missing and sample_size:
+                report.missing_sample = list(model._default_manager.filter(storage.missing(lang)).order_by('pk')
+                                             .values_list('pk', flat=True)[:sample_size])
+
+    for lang, (count, orphaned) in _orphaned(model, langs).items():
+        if count:
+            report = reports.setdefault(lang, LangReport(model, lang))
+            report.orphaned = count
+            if sample_size:
+                report.orphaned_sample = list(orphaned.order_by('pk').values_list('pk', flat=True)[:sample_size])
+
+    if stale:
+        for lang, pk in _stale_pks(model, langs):
+            report = reports[lang]
+            report.stale += 1
+            if len(report.stale_sample) < sample_size:
+                report.stale_sample.append(pk)
+    return list(reports.values())
+
+
+def scan(models: Optional[Iterable] = None, langs: Optional[Iterable[str]] = None, stale: bool = False,
+         sample_size: int = scan_sample_size) -> List[LangReport]:
+    """Check every translatable model, or models. :return report per (model, lang)"""
+    reports = []
+    for model in (registry if models is None else models):
+        reports.extend(scan_model(model, langs, stale, sample_size))
+    return reports
+
+
+def _missing_chunks(model, lang, chunk_size) -> Iterator[list]:
+    """Chunks of base rows without record, by pk ranges - rows are translated while iterating"""
+    storage = model.get_translation_storage()
+    queryset = model._default_manager.filter(storage.missing(lang)).order_by('pk')
+    last_pk = None
+    while True:
+        chunk = list((queryset if last_pk is None else queryset.filter(pk__gt=last_pk))[:chunk_size])
+        if not chunk:
+            return
+        yield chunk
+        last_pk = chunk[-1].pk
+
+
+def repair_model(model, langs: Optional[Iterable[str]] = None, missing: bool = True, orphaned: bool = False,
+                 stale: bool = False, chunk_size: int = scan_chunk_size,
+                 batch_size: int = translation_batch_size) -> Dict[str, Dict[str, int]]:
+    """
+    Fix connected records of model in chunks: translate missing ones and stale ones again with
+    bulk_translate, delete orphaned ones
+    :return {lang: {'missing': translated, 'orphaned': deleted, 'stale': retranslated}}
+    """
+    langs = _get_langs(model, langs)
+    fixed = {lang: {'missing': 0, 'orphaned': 0, 'stale': 0} for lang in langs}
+    if orphaned:
+        for lang, (_, queryset) in _orphaned(model, langs).items():
+            counts = fixed.setdefault(lang, {'missing': 0, 'orphaned': 0, 'stale': 0})
+            while True:
+                pks = list(queryset.order_by('pk').values_list('pk', flat=True)[:chunk_size])
+                if not pks:
+                    break
+                queryset.model._default_manager.filter(pk__in=pks).delete()
+                counts['orphaned'] += len(pks)
+    if missing:
+        for lang in langs:
+            for chunk in _missing_chunks(model, lang, chunk_size):
+                bulk_translate(chunk, langs=[lang], batch_size=batch_size)
+                fixed[lang]['missing'] += len(chunk)
+    if stale:
+        stale_pks = {}
+        for lang, pk in _stale_pks(model, langs):
+            stale_pks.setdefault(lang, []).append(pk)
+        for lang, pks in stale_pks.items():
+            for start in range(0, len(pks), chunk_size):
+                chunk = model._default_manager.filter(pk__in=pks[start:start + chunk_size])
+                bulk_translate(chunk, langs=[lang], batch_size=batch_size, overwrite=True)
+            fixed[lang]['stale'] += len(pks)
+    return fixed
@@ -0,0 +1,114 @@
+"""
+Lazy translation helpers: single-flight calls and per-language read counters of translatable models
+"""
+import threading
+import time
+from concurrent.futures import Future
+from typing import Callable, Dict, Hashable, Optional, Tuple
+from django.conf import settings
+
+# languages with at least this share of model reads are translated eagerly in lazy mode, None - never
+hot_langs_share = getattr(settings, 'TRANSLATION_HOT_LANGS_SHARE', None)
+hot_langs_min_reads = getattr(settings, 'TRANSLATION_HOT_LANGS_MIN_READS', 100)  # reads before policy applies
+demand_cache_alias = getattr(settings, 'TRANSLATION_DEMAND_CACHE', 'default')
+demand_flush_interval = getattr(settings, 'TRANSLATION_DEMAND_FLUSH_INTERVAL', 10)  # seconds
+
+
+class SingleFlight:
+    """Concurrent calls with the same key run function once, others wait for its result"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls: Dict[Hashable, Future] = {}
+
+    def do(self, key: Hashable, func: Callable):
+        with self._lock:
+            future = self._calls.get(key)
+            leader = future is None
+            if leader:
+                future = self._calls[key] = Future()
+        if not leader:
+            return future.result()
+        try:
+            result = func()
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            with self._lock:
+                del self._calls[key]
+
+
+class DemandTracker:
+    """
+    Read counters per (model, lang). Counted in process and added to Django cache every flush_interval
+    seconds, so hot languages are chosen by reads of all processes
+    """
+
+    def __init__(self, alias: str = demand_cache_alias, flush_interval: float = demand_flush_interval):
+        self.alias = alias
+        self.flush_interval = flush_interval
+        self._lock = threading.Lock()
+        self._pending: Dict[Tuple[str, str], int] = {}
+        self._flushed_at = time.monotonic()
+
+    @property
+    def cache(self):
+        from django.core.cache import caches
+        return caches[self.alias]
+
+    @staticmethod
+    def _key(label: str, lang: str) -> str:
+        return f'translation_demand:{label}:{lang}'
+
+    def record(self, model, lang: str):
+        key = (model._meta.label, lang)
+        with self._lock:
+            self._pending[key] = self._pending.get(key, 0) + 1
+            due = time.monotonic() - self._flushed_at >= self.flush_interval
+        if due:
+            self.flush()
+
+    def flush(self):
+        with self._lock:
+            pending, self._pending = self._pending, {}
+            self._flushed_at = time.monotonic()
+        for (label, lang), reads in pending.items():
+            key = self._key(label, lang)
+            self.cache.add(key, 0, timeout=None)
+            try:
+                self.cache.incr(key, reads)
+            except ValueError:
+                # evicted between add and incr
+                self.cache.set(key, reads, timeout=None)
+
+    def counts(self, model) -> Dict[str, int]:
+        """{lang: reads} of model languages"""
+        self.flush()
+        label = model._meta.label
+        keys = {self._key(label, lang): lang for lang in model.get_translation_langs()}
+        return {keys[key]: reads for key, reads in self.cache.get_many(list(keys)).items()}
+
+    def hot_langs(self, model, share: Optional[float] = None, min_reads: Optional[int] = None) -> Tuple[str, ...]:
+        """Languages with at least share of model reads, in model languages order"""
+        share = hot_langs_share if share is None else share
+        min_reads = hot_langs_min_reads if min_reads is None else min_reads
+        if share is None:
+            return ()
+        counts = self.counts(model)
+        total = sum(counts.values())
+        if not total or total < min_reads:
+            return ()
+        return tuple(lang for lang in model.get_translation_langs() if counts.get(lang, 0) / total >= share)
+
+    def reset(self, model):
+        with self._lock:
+            self._pending = {key: reads for key, reads in self._pending.items() if key[0] != model._meta.label}
+        self.cache.delete_many([self._key(model._meta.label, lang) for lang in model.get_translation_langs()])
+
+
+single_flight = SingleFlight()
+demand_tracker = DemandTracker()
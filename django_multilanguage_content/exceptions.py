@@ -1,2 +1,11 @@
 class ResponseError(Exception):
     pass
+
+
+class PartialTranslationError(ResponseError):
+    """Raised when some languages failed. Successful languages are already saved"""
+    def __init__(self, errors):
+        self.errors = errors  # {lang: exception}, in translated languages order
+        super().__init__('Translation failed for languages: ' + ', '.join(
+            f'{lang} ({type(error).__name__}: {error})' for lang, error in errors.items()
+        ))
@@ -0,0 +1,286 @@
+"""
+Export of connected records for review and import of corrected translations. Entry is one translated
+field of one record: (model label, base pk, lang, field name, source value, translation).
+Formats are JSONL, gettext PO and XLIFF 1.2, written and parsed as streams, so memory doesn't depend on
+number of records
+"""
+import json
+import re
+from typing import Dict, IO, Iterable, Iterator, List, NamedTuple, Optional
+from xml.etree.ElementTree import iterparse
+from xml.sax.saxutils import escape, quoteattr
+from django.apps import apps
+from .logic import translation_batch_size, value_hash
+from .prefilter import is_translatable
+from .registry import registry
+from .storage import SOURCE_HASHES_FIELD
+
+export_chunk_size = 2000  # rows fetched from database at once
+XLIFF_NAMESPACE = 'urn:oasis:names:tc:xliff:document:1.2'
+
+
+class Entry(NamedTuple):
+    model: str
+    pk: str
+    lang: str
+    field: str
+    source: str
+    translation: str
+
+
+def export_entries(models: Optional[Iterable] = None, langs: Optional[Iterable[str]] = None) -> Iterator[Entry]:
+    """Translatable fields of connected records, ordered by model, lang and pk. Rows are streamed with iterator()"""
+    langs = None if langs is None else [lang.lower() for lang in langs]
+    for model in (registry if models is None else models):
+        storage = model.get_translation_storage()
+        field_names = [field.name for field in model.get_translation_options().fields]
+        ptr_id = f'{storage.ptr_name}_id'
+        for lang in model.get_translation_langs():
+            if langs is not None and lang not in langs:
+                continue
+            rows = storage.connected_queryset(lang).order_by(ptr_id).values_list(
+                ptr_id, *(f'{storage.ptr_name}__{name}' for name in field_names), *field_names
+            ).iterator(chunk_size=export_chunk_size)
+            for pk, *values in rows:
+                for name, source, translation in zip(field_names, values, values[len(field_names):]):
+                    if is_translatable(source):
+                        yield Entry(model._meta.label, str(pk), lang, name, source, translation or '')
+
+
+# writers and readers
+
+def write_jsonl(entries: Iterable[Entry], out: IO) -> int:
+    count = 0
+    for count, entry in enumerate(entries, 1):
+        out.write(json.dumps(entry._asdict(), ensure_ascii=False) + '\n')
+    return count
+
+
+def read_jsonl(lines: Iterable[str]) -> Iterator[Entry]:
+    for line in lines:
+        if line.strip():
+            data = json.loads(line)
+            yield Entry(data['model'], str(data['pk']), data['lang'], data['field'], data['source'],
+                        data['translation'])
+
+
+PO_ESCAPES = {'\\': '\\\\', '"': '\\"', '\n': '\\n', '\t': '\\t', '\r': '\\r'}
+PO_UNESCAPES = {value: key for key, value in PO_ESCAPES.items()}
+PO_LINE = re.compile(r'^(msgctxt|msgid|msgstr)?\s*"(.*)"\s*$')
+
+
+def _po_quote(text: str) -> str:
+    return '"' + ''.join(PO_ESCAPES.get(char, char) for char in text) + '"'
+
+
+def _po_unquote(text: str) -> str:
+    return re.sub(r'\\.', lambda match: PO_UNESCAPES.get(match.group(0), match.group(0)[1]), text)
+
+
+def write_po(entries: Iterable[Entry], out: IO) -> int:
+    """msgctxt is '<model>:<pk>:<lang>:<field>', so one file may hold several languages"""
+    out.write('msgid ""\nmsgstr ""\n"Content-Type: text/plain; charset=UTF-8\\n"\n')
+    count = 0
+    for count, entry in enumerate(entries, 1):
+        context = ':'.join((entry.model, entry.pk, entry.lang, entry.field))
+        out.write(f'\nmsgctxt {_po_quote(context)}\nmsgid {_po_quote(entry.source)}\n'
+                  f'msgstr {_po_quote(entry.translation)}\n')
+    return count
+
+
+def read_po(lines: Iterable[str]) -> Iterator[Entry]:
+    """Line by line parser of entries written by write_po(), multi-line strings are joined"""
+    message, keyword = {}, None
+
+    def entry():
+        context = message.get('msgctxt')
+        if not context or 'msgid' not in message:
+            return None
+        model, pk, lang, field = context.rsplit(':', 3)
+        return Entry(model, pk, lang, field, message['msgid'], message.get('msgstr', ''))
+
+    for line in lines:
+        line = line.strip()
+        if not line or line.startswith('#'):
+            if not line and message:
+                parsed = entry()
+                if parsed:
+                    yield parsed
+                message, keyword = {}, None
+            continue
+        match = PO_LINE.match(line)
+        if match is None:
+            continue
+        if match.group(1):
+            keyword = match.group(1)
+            message[keyword] = ''
+        if keyword:
+            message[keyword] += _po_unquote(match.group(2))
+    if message:
+        parsed = entry()
+        if parsed:
+            yield parsed
+
+
+def _source_lang(label: str) -> str:
+    """Source language of model, 'und' - unknown"""
+    try:
+        return registry.get(apps.get_model(label)).source_lang or 'und'
+    except (LookupError, ValueError):  # unknown, malformed or not translatable label
+        return 'und'
+
+
+def write_xliff(entries: Iterable[Entry], out: IO) -> int:
+    """<file> per (model, lang), trans-unit id is '<pk>:<field>'"""
+    out.write(f'<?xml version="1.0" encoding="UTF-8"?>\n<xliff version="1.2" xmlns="{XLIFF_NAMESPACE}">\n')
+    current, count = None, 0
+    for count, entry in enumerate(entries, 1):
+        if (entry.model, entry.lang) != current:
+            if current is not None:
+                out.write('</body></file>\n')
+            current = (entry.model, entry.lang)
+            source_lang = _source_lang(entry.model)
+            out.write(f'<file original={quoteattr(entry.model)} source-language={quoteattr(source_lang)} '
+                      f'target-language={quoteattr(entry.lang)} datatype="plaintext"><body>\n')
+        out.write(f'<trans-unit id={quoteattr(f"{entry.pk}:{entry.field}")}>'
+                  f'<source>{escape(entry.source)}</source><target>{escape(entry.translation)}</target>'
+                  f'</trans-unit>\n')
+    if current is not None:
+        out.write('</body></file>\n')
+    out.write('</xliff>\n')
+    return count
+
+
+def read_xliff(source: IO) -> Iterator[Entry]:
+    """Incremental parser, trans-units are dropped from tree once read"""
+    file_attrs, body = {}, None
+    for event, element in iterparse(source, events=('start', 'end')):
+        tag = element.tag.rsplit('}', 1)[-1]
+        if event == 'start' and tag == 'file':
+            file_attrs = dict(element.attrib)
+        elif event == 'start' and tag == 'body':
+            body = element
+        elif event == 'end' and tag == 'trans-unit':
+            pk, field = element.get('id').rsplit(':', 1)
+            texts = {child.tag.rsplit('}', 1)[-1]: child.text or '' for child in element}
+            yield Entry(file_attrs['original'], pk, file_attrs['target-language'], field,
+                        texts.get('source', ''), texts.get('target', ''))
+            element.clear()
+            if body is not None:
+                body.remove(element)
+
+
+FORMATS = ('jsonl', 'po', 'xliff')
+WRITERS = {'jsonl': write_jsonl, 'po': write_po, 'xliff': write_xliff}
+
+
+def read_entries(source: IO, file_format: str) -> Iterator[Entry]:
+    """:param source - text stream for jsonl and po, binary stream for xliff"""
+    if file_format == 'xliff':
+        return read_xliff(source)
+    if file_format == 'po':
+        return read_po(source)
+    if file_format == 'jsonl':
+        return read_jsonl(source)
+    raise ValueError(f'Unknown format {file_format}, use one of {list(FORMATS)}')
+
+
+# import
+
+class ImportStats:
+    def __init__(self):
+        self.updated = self.created = self.skipped = 0
+
+    def as_dict(self) -> Dict[str, int]:
+        return {'updated': self.updated, 'created': self.created, 'skipped': self.skipped}
+
+
+def _save_batch(model, lang: str, entries: List[Entry], stats: ImportStats, seed_memory: bool):
+    """
+    Write entries of one (model, lang): existing records with bulk_update, missing ones with bulk_create.
+    Entries whose source differs from current base value are skipped - base changed after export.
+    Imported fields get hash of current source, so they are not retranslated
+    """
+    storage = model.get_translation_storage()
+    field_names = [field.name for field in model.get_translation_options().fields]
+    pk_field = model._meta.pk
+    translations = {}  # {pk: {field: translation}}
+    sources = {pk: dict(zip(field_names, values)) for pk, *values in model._default_manager.filter(
+        pk__in={pk_field.to_python(entry.pk) for entry in entries}
+    ).values_list('pk', *field_names)}
+    memory = {}
+    for entry in entries:
+        pk = pk_field.to_python(entry.pk)
+        if entry.field not in field_names or pk not in sources or sources[pk][entry.field] != entry.source:
+            stats.skipped += 1
+            continue
+        translations.setdefault(pk, {})[entry.field] = entry.translation
+        memory[entry.source] = entry.translation
+    if not translations:
+        return
+
+    ptr_id = f'{storage.ptr_name}_id'
+    records = {getattr(record, ptr_id): record for record in
+               storage.connected_queryset(lang).filter(**{f'{ptr_id}__in': list(translations)})}
+    to_update, to_create, updated_fields = [], [], set()
+    for pk, fields in translations.items():
+        hashes = {name: value_hash(sources[pk][name]) for name in fields}
+        record = records.get(pk)
+        if record is None:
+            data = {**sources[pk], **fields, SOURCE_HASHES_FIELD: {
+                **{name: value_hash(value) for name, value in sources[pk].items()}, **hashes
+            }}
+            # base instance is not fetched, only its pk is needed
+            to_create.append(storage.new_record(model(pk=pk), lang, data))
+            continue
+        for name, translation in fields.items():
+            setattr(record, name, translation)
+        setattr(record, SOURCE_HASHES_FIELD, {**(getattr(record, SOURCE_HASHES_FIELD) or {}), **hashes})
+        updated_fields.update(fields)
+        to_update.append(record)
+    connected_model = storage.connected_model(lang)
+    # bulk_create(update_conflicts=True) needs Django 4.1, existing records are found first instead
+    if to_update:
+        connected_model._default_manager.bulk_update(to_update, [*updated_fields, SOURCE_HASHES_FIELD])
+    if to_create:
+        connected_model._default_manager.bulk_create(to_create)
+    stats.updated += sum(len(translations[getattr(record, ptr_id)]) for record in to_update)
+    stats.created += sum(len(translations[getattr(record, ptr_id)]) for record in to_create)
+    if seed_memory:
+        from .memory import translation_memory
+        from .translator import main_translator
+        translation_memory.set_many(memory, lang, main_translator.name, model.get_translation_options().source_lang)
+
+
+def import_entries(entries: Iterable[Entry], batch_size: int = translation_batch_size,
+                   seed_memory: bool = True) -> Dict[str, int]:
+    """
+    Save translations of entries in batches per (model, lang). Corrected translations are put into
+    translation memory too, so same source texts get them instead of provider translation
+    :return {'updated': fields, 'created': fields of new records, 'skipped': entries of changed sources}
+    """
+    stats, batches, touched = ImportStats(), {}, set()
+    for entry in entries:
+        try:
+            model = apps.get_model(entry.model)
+        except (LookupError, ValueError):
+            model = None  # unknown or malformed label
+        if model is None or model not in registry or entry.lang not in model.get_translation_langs():
+            stats.skipped += 1
+            continue
+        batch = batches.setdefault((model, entry.lang), [])
+        batch.append(entry)
+        if len(batch) >= batch_size:
+            _save_batch(model, entry.lang, batch, stats, seed_memory)
+            touched.add(model)
+            batches[model, entry.lang] = []
+    for (model, lang), batch in batches.items():
+        if batch:
+            _save_batch(model, lang, batch, stats, seed_memory)
+            touched.add(model)
+    # bulk writes send no signals
+    from .caching import cache_enabled, translation_cache
+    if cache_enabled():
+        for model in touched:
+            translation_cache.invalidate_model(model)
+    return stats.as_dict()
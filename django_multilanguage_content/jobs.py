@@ -0,0 +1,125 @@
+import random
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+from typing import Iterable, List, NoReturn
+from django.apps import apps
+from django.conf import settings
+from django.db import connection, transaction
+from django.utils import timezone
+from .demand import demand_tracker
+from .logic import retranslate_changed
+from .models import TranslationJob
+
+queue_max_attempts = getattr(settings, 'TRANSLATION_QUEUE_MAX_ATTEMPTS', 5)
+queue_retry_delay = getattr(settings, 'TRANSLATION_QUEUE_RETRY_DELAY', 30)  # seconds, doubles on each attempt
+queue_concurrency = getattr(settings, 'TRANSLATION_QUEUE_CONCURRENCY', 4)
+
+
+def create_job(model_label: str, object_pk, langs: Iterable[str]) -> TranslationJob:
+    """Store pending translation job"""
+    return TranslationJob.objects.create(
+        model_label=model_label,
+        object_pk=str(object_pk),
+        langs=','.join(langs),
+    )
+
+
+def enqueue_translation(instance, langs: Iterable[str]) -> NoReturn:
+    """Schedule translation job creation right after current transaction commits"""
+    model_label, object_pk, langs = instance._meta.label, instance.pk, tuple(langs)
+    transaction.on_commit(lambda: create_job(model_label, object_pk, langs))
+
+
+def claim_jobs(limit: int) -> List[TranslationJob]:
+    """
+    Mark up to limit available jobs as running and return them.
+    Claiming is an UPDATE guarded by status, so concurrent workers never get the same job
+    """
+    now = timezone.now()
+    candidates = TranslationJob.objects.filter(
+        status=TranslationJob.PENDING, available_at__lte=now
+    ).order_by('available_at', 'pk').values_list('pk', flat=True)[:limit]
+    claimed = [
+        pk for pk in list(candidates)
+        if TranslationJob.objects.filter(pk=pk, status=TranslationJob.PENDING).update(
+            status=TranslationJob.RUNNING, updated_at=now
+        )
+    ]
+    return list(TranslationJob.objects.filter(pk__in=claimed).order_by('available_at', 'pk'))
+
+
+def requeue_stale_jobs(older_than: int) -> int:
+    """Return to queue jobs left running by crashed worker. :param older_than - seconds"""
+    border = timezone.now() - timedelta(seconds=older_than)
+    return TranslationJob.objects.filter(status=TranslationJob.RUNNING, updated_at__lt=border).update(
+        status=TranslationJob.PENDING, updated_at=timezone.now()
+    )
+
+
+def requeue_dead_jobs() -> int:
+    """Give dead-lettered jobs another chance"""
+    return TranslationJob.objects.filter(status=TranslationJob.DEAD).update(
+        status=TranslationJob.PENDING, attempts=0, available_at=timezone.now(), updated_at=timezone.now()
+    )
+
+
+def purge_done_jobs(older_than: int) -> int:
+    """Delete jobs done more than older_than seconds ago, so queue table doesn't grow"""
+    border = timezone.now() - timedelta(seconds=older_than)
+    deleted, _ = TranslationJob.objects.filter(status=TranslationJob.DONE, updated_at__lt=border).delete()
+    return deleted
+
+
+def _fail_job(job: TranslationJob, error: Exception, max_attempts: int) -> NoReturn:
+    """Schedule retry with exponential backoff and jitter, or dead-letter the job"""
+    job.attempts += 1
+    job.last_error = f'{type(error).__name__}: {error}'
+    if job.attempts >= max_attempts:
+        job.status = TranslationJob.DEAD
+    else:
+        job.status = TranslationJob.PENDING
+        delay = queue_retry_delay * 2 ** (job.attempts - 1)
+        job.available_at = timezone.now() + timedelta(seconds=delay * random.uniform(0.5, 1.5))
+    job.save(update_fields=['attempts', 'last_error', 'status', 'available_at', 'updated_at'])
+
+
+def process_job(job: TranslationJob, max_attempts: int = queue_max_attempts) -> bool:
+    """
+    Translate instance the job points to.
+    :return bool - whether job is done
+    """
+    try:
+        model = apps.get_model(job.model_label)
+        instance = model._default_manager.filter(pk=job.object_pk).first()
+        # instance deleted before translating - nothing to do
+        if instance is not None:
+            # new instance has no connected records - translated completely,
+            # lazy model gets missing records of hot languages only
+            lazy = model.get_translation_options().lazy
+            retranslate_changed(instance, job.get_langs(),
+                                missing_langs=demand_tracker.hot_langs(model) if lazy else None)
+    except Exception as e:
+        _fail_job(job, e, max_attempts)
+        return False
+    job.attempts += 1
+    job.status = TranslationJob.DONE
+    job.last_error = ''
+    job.save(update_fields=['attempts', 'status', 'last_error', 'updated_at'])
+    return True
+
+
+def _process_in_thread(job: TranslationJob, max_attempts: int) -> bool:
+    try:
+        return process_job(job, max_attempts)
+    finally:
+        # pool threads must not keep connections opened
+        connection.close()
+
+
+def run_jobs(jobs: List[TranslationJob], concurrency: int = queue_concurrency,
+             max_attempts: int = queue_max_attempts) -> List[bool]:
+    """Process jobs in thread pool. :return list of job results in jobs order"""
+    if concurrency <= 1:
+        return [process_job(job, max_attempts) for job in jobs]
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        return list(executor.map(lambda job: _process_in_thread(job, max_attempts), jobs))
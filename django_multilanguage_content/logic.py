@@ -1,216 +1,557 @@
-from typing import Type, Union, Tuple, List, NoReturn, Dict
-from operator import attrgetter
-from types import MethodType
+import asyncio
+import time
+from typing import Type, Tuple, List, NoReturn, Dict, Optional
+from concurrent.futures import ThreadPoolExecutor
+from asgiref.sync import sync_to_async
 from django.conf import settings
-from django.db.models import CASCADE, Field, Model, OneToOneField
+from django.db import IntegrityError, transaction
+from django.db.models import Field, Model
 from django.db.models.signals import post_save
-from django.dispatch import receiver
+from .demand import demand_tracker, single_flight
+from .exceptions import PartialTranslationError, ResponseError
+from .memory import source_hash
+from .prefilter import is_translatable
+from .signals import connected_saved, content_prepared
+from .registry import TranslationOptions, registry
+from .storage import SOURCE_HASHES_FIELD, make_storage
 from .translator import main_translator
 
 global_langs = tuple(lang.lower() for lang in settings.TRANSLATING_LANGS)
-translation_models_list = []
-
-# TODO consider how to save it
-new_created_models_properties = {}
-
-
-def __cleanify_fields(fields_to_stay: tuple, model: Type[Model]) -> Dict[str, Type[Field]]:
-    """Method check fields to be translated, make list of needed fields"""
-
-    base_model_name = model.get_base_model_name()
-    cleaned_base_fields = {}
-
-    models_fields = model.get_base_model_fields()
-    if not all(stay_field in list(map(lambda x: x.name, models_fields)) for stay_field in fields_to_stay):
-        raise ValueError(f'{base_model_name} has incompatible field name to translation')
-
-    for field in models_fields:
-        if field.primary_key is not True and field.name in fields_to_stay:
-            cleaned_base_fields[field.name] = field
-    cleaned_base_fields[f'{base_model_name}_ptr'] = OneToOneField(model, on_delete=CASCADE)
-    return cleaned_base_fields
-
-
-def __follow_langs__create_models(model: Type[Model],
-                                  langs_to_translate: Union[list, tuple],
-                                  fields_to_stay: tuple) -> NoReturn:
-    """Method actually creates new connected models"""
-
-    for lang in langs_to_translate:
-        translate_model_name = model.get_translate_model_name(lang)
-        cleaned_fields = __cleanify_fields(fields_to_stay, model)
-        translate_dict = {'__module__': model.__module__, **cleaned_fields}
-        # creating happens here. Magic type() :)
-        type(translate_model_name, (Model,), translate_dict)
-
-
-def to_translation(*field_names: str, only_langs=None):
+translation_queue_enabled = getattr(settings, 'TRANSLATION_QUEUE', False)
+# number of languages translated in parallel for one instance, 1 - sequential
+translation_concurrency = getattr(settings, 'TRANSLATION_CONCURRENCY', 1)
+translation_batch_size = getattr(settings, 'TRANSLATION_BATCH_SIZE', 100)  # values per translator call in bulk
+# connected records are created on first read, unless to_translation(lazy=...) says otherwise
+translation_lazy = getattr(settings, 'TRANSLATION_LAZY', False)
+# language of source values, unless to_translation(source_lang=...) says otherwise. None - detected
+translation_source_lang = getattr(settings, 'TRANSLATION_SOURCE_LANG', None)
+# detect unknown source language once per instance, so languages equal to it are copied, not translated
+translation_detect_source = getattr(settings, 'TRANSLATION_DETECT_SOURCE', True)
+detect_chars = getattr(settings, 'TRANSLATION_DETECT_CHARS', 1000)  # text sample sent to detection
+_translation_executor = None
+
+
+class TranslatableModelMethods:
+    """Methods copied onto every translatable model class. Metadata is looked up in registry"""
+
+    @classmethod
+    def get_translation_options(cls) -> TranslationOptions:
+        """Class method. Translation metadata"""
+        return registry.get(cls)
+
+    @classmethod
+    def get_base_model_name(cls) -> str:
+        """ Class method
+         :return str - model name
+         """
+        return cls._meta.model_name
+
+    @classmethod
+    def get_base_model_fields(cls) -> List[Type[Field]]:
+        """ Class method
+         :return list - list of model fields
+         """
+        return list(cls._meta.fields)
+
+    @classmethod
+    def get_translate_model_name(cls, lang: str) -> str:
+        """ Class method
+         :return str - translated model name
+         """
+        return f'{cls.get_base_model_name()}_{lang}'
+
+    @classmethod
+    def get_connected_translated_model_class(cls, lang: str) -> Type[Model]:
+        """
+        Class method. Returns connected translated model class according to chosen lang
+        :return: connected model class
+        """
+        connected_models = cls.get_translation_options().connected_models
+        if lang not in connected_models:
+            raise ValueError(f'{cls.__name__} is not translated to {lang}')
+        return connected_models[lang]
+
+    @classmethod
+    def get_all_connected_models(cls) -> Dict[str, Type[Model]]:
+        """Class method. Return dict of all connected models {name: model_class}"""
+        return {
+            connected_model._meta.model_name: connected_model
+            for connected_model in cls.get_translation_options().connected_models.values()
+        }
+
+    @classmethod
+    def get_translation_langs(cls) -> Tuple[str, ...]:
+        """Class method. Languages model is translated to"""
+        return cls.get_translation_options().langs
+
+    @classmethod
+    def get_translation_storage(cls):
+        """Class method. Storage of connected records"""
+        return cls.get_translation_options().storage
+
+    def translate_connected(self, lang: str, data: dict):
+        """ Instance level method."""
+        '''
+        :param lang - precise language
+        :param data - data
+        '''
+        '''Consider, create new or update existence record'''
+        if self.get_translation_storage().get(self, lang) is not None:
+            self._update_connected(lang, data)
+        else:
+            self._create_connected(lang, data)
+
+    async def atranslate_connected(self, lang: str, data: dict):
+        """Async translate_connected, database access runs in thread"""
+        await sync_to_async(self.translate_connected)(lang, data)
+
+    def _create_connected(self, lang: str, data: dict):
+        """Create new record"""
+        self.get_translation_storage().new_record(self, lang, data).save()
+
+    def _update_connected(self, lang: str, data: dict):
+        """Update existence record"""
+        this_lang_connected_model = self.get_translation_storage().get(self, lang)
+        assert this_lang_connected_model is not None
+        for key in data:
+            setattr(this_lang_connected_model, key, data[key])
+        this_lang_connected_model.save()
+
+    def get_fields_and_pk(self) -> Tuple[List[Type[Field]], Type[Field]]:
+        """Instance level method"""
+        '''
+        :return tuple[instance fields list, instance pk field]
+        '''
+        options = self.get_translation_options()
+        return list(options.fields), options.pk_field
+
+    def get_connected_translated_model_instance(self, lang: str):
+        """Instance level method"""
+        ''':param lang - language from translated languages list'''
+        '''Method returns instance of connected translated model according to language or None'''
+        '''Lazy model translates missing record here, the read is counted for hot languages policy'''
+        options = self.get_translation_options()
+        record = options.storage.get(self, lang)
+        if options.lazy and lang in options.langs:
+            demand_tracker.record(type(self), lang)
+            if record is None:
+                record = translate_on_demand(self, lang)
+        return record
+
+
+def to_translation(*field_names: str, only_langs=None, storage='models', lazy=None, source_lang=None,
+                   source_lang_field=None):
     """Decorator to mark model as translatable"""
     '''
     *field_names - "positional" field names
     FEAT:
         only_langs - list or tuple langs to be used for translation only
+        storage - 'models' - connected model per language, 'table' - one connected model for all languages
+        lazy - translate on first read instead of on save, TRANSLATION_LAZY by default
+        source_lang - language of source values, TRANSLATION_SOURCE_LANG by default, None - detected
+        source_lang_field - name of model field with language of instance, empty value falls back to source_lang
     '''
     def inner(model: Model) -> Type[Model]:
-
-        def get_base_model_name(cls: Type[Model]) -> str:
-            """ Class method
-             :return str - model name
-             """
-            return cls._meta.model_name
-
-        def get_base_model_fields(cls: Type[Model]) -> List[Type[Field]]:
-            """ Class method
-             :return list - list of model fields
-             """
-            return list(cls._meta.fields)
-
-        def get_translate_model_name(cls: Type[Model], lang: str) -> str:
-            """ Class method
-             :return str - translated model name
-             """
-            return f'{cls.get_base_model_name()}_{lang}'
-
-        def get_connected_translated_model_class(cls: Type[Model], lang: str) -> Type[Model]:
-            """
-            Class method. Returns connected translated model class according to chosen lang
-            :return: connected model class
-            """
-            translated_model_getter = attrgetter(f'{cls.get_translate_model_name(lang)}.related.related_model')
-            return translated_model_getter(cls)
-
-        def get_all_connected_models(cls: Type[Model]) -> Dict[str, Type[Model]]:
-            """Class method. Return dict of all connected models {name: model_class}"""
-            all_connected_models = {}
-            for lang in global_langs:
-                try:
-                    connected_model = cls.get_connected_translated_model_class(lang)
-                    all_connected_models[connected_model.get_base_model_name()] = connected_model
-                except AttributeError:
-                    continue
-            return all_connected_models
-
-        # registration new class methods
-        setattr(model, 'get_base_model_name', MethodType(get_base_model_name, model))
-        setattr(model, 'get_base_model_fields', MethodType(get_base_model_fields, model))
-        setattr(model, 'get_translate_model_name', MethodType(get_translate_model_name, model))
-        setattr(model, 'get_connected_translated_model_class', MethodType(get_connected_translated_model_class, model))
-        setattr(model, 'get_all_connected_models', MethodType(get_all_connected_models, model))
-
-        translation_models_list.append(model)  # adding models to translation to list
-
         followed_langs = global_langs
         if isinstance(only_langs, (list, tuple)):
             for lang in only_langs:
                 if lang not in followed_langs:
-                    raise ValueError(f'Language {lang}, to be followed by {model.get_base_model_name()} model,'
+                    raise ValueError(f'Language {lang}, to be followed by {model._meta.model_name} model,'
                                      f' is not in global languages list')
-            followed_langs = only_langs
-        fields_to_stay = (*field_names,)
-        __follow_langs__create_models(model, followed_langs, fields_to_stay)
+            followed_langs = tuple(only_langs)
 
-        new_created_models_properties[model.get_base_model_name()] = fields_to_stay
+        if source_lang_field and source_lang_field not in [field.name for field in model._meta.fields]:
+            raise ValueError(f'{model._meta.model_name} has no source language field {source_lang_field}')
 
+        fields_to_stay = (*field_names,)
+        translation_storage = make_storage(storage, model, followed_langs, fields_to_stay)
+        translation_storage.create_models()
+        registry.register(TranslationOptions(
+            model, fields_to_stay, followed_langs, translation_storage,
+            lazy=translation_lazy if lazy is None else lazy,
+            source_lang=(source_lang or translation_source_lang or '').lower() or None,
+            source_lang_field=source_lang_field,
+        ))
+
+        # registration of methods, once per class
+        for name, method in vars(TranslatableModelMethods).items():
+            if not name.startswith('__'):
+                setattr(model, name, method)
         return model
     return inner
 
 
-def __set_util_funcs():
-    """Private decorator. Adds additional functionality to model instance """
-    def decor(func):
-        def wrapper(sender, instance, update_fields, **kwargs):
-            """ Adds instance methods """
-
-            if isinstance(instance, tuple(translation_models_list)):
-                model = instance
-
-                def translate_connected(self, lang: str, data: dict):
-                    """ Instance level method."""
-                    '''
-                    :param lang - precise language
-                    :param data - data
-                    '''
-                    '''Consider, create new or update existence record'''
-                    if hasattr(self, self.get_translate_model_name(lang)):
-                        self._update_connected(lang, data)
-                    else:
-                        self._create_connected(lang, data)
-
-                def _create_connected(self, lang: str, data: dict):
-                    """Create new record"""
-                    this_lang_connected_model = getattr(self, self.get_translate_model_name(lang), None)
-                    assert this_lang_connected_model is None
-                    model_for_translating = self.get_connected_translated_model_class(lang)
-                    model_for_translating.objects.create(**data)
-
-                def _update_connected(self, lang: str, data: dict):
-                    """Update existence record"""
-                    this_lang_connected_model = getattr(self, self.get_translate_model_name(lang), None)
-                    assert this_lang_connected_model is not None
-                    for key in data:
-                        setattr(this_lang_connected_model, key, data[key])
-                    this_lang_connected_model.save()
-
-                def get_fields_and_pk(self) -> Tuple[List[Type[Field]], Type[Field]]:
-                    """Instance level method"""
-                    '''
-                    :return tuple[instance fields list, instance pk field]
-                    '''
-                    fields = self.get_base_model_fields()  # base fields
-                    # to stay fields
-                    fields_to_stay = new_created_models_properties[sender.get_base_model_name()]
-
-                    pk_field = list(filter(lambda x: x.primary_key is True, fields))[0]
-                    fields.remove(pk_field)
-                    # if fields to stay list is empty - all by default
-                    if len(fields_to_stay):
-                        fields = filter(lambda x: x.name in fields_to_stay, fields)
-                    return fields, pk_field
-
-                def get_connected_translated_model_instance(self, lang: str):
-                    """Instance level method"""
-                    ''':param lang - language from translated languages list'''
-                    '''Method returns instance of connected translated model according to language'''
-                    return attrgetter(f'{self.get_translate_model_name(lang)}')(self)
-
-                setattr(model, '_create_connected', MethodType(_create_connected, model))
-                setattr(model, '_update_connected', MethodType(_update_connected, model))
-                setattr(model, 'translate_connected', MethodType(translate_connected, model))
-                setattr(model, 'get_fields_and_pk', MethodType(get_fields_and_pk, model))
-                setattr(model, 'get_connected_translated_model_instance',
-                        MethodType(get_connected_translated_model_instance, model)
-                        )
-
-            func(sender, instance, **kwargs)
-        return wrapper
-    return decor
-
-
 def preparing_content(instance):
+    started = time.perf_counter()
     # already filtered fields
     fields, pk = instance.get_fields_and_pk()
     # get values from base model for translation
     object_to_translate = {field.name: field.value_from_object(instance) for field in fields}
     obj_keys, obj_vals = list(zip(*object_to_translate.items()))  # unzip dict items | [tuple_keys, tuple_values]
     # base_model_name = instance.get_base_model_name()
+    content_prepared.send(sender=type(instance), instance=instance, fields=obj_keys,
+                          duration=time.perf_counter() - started)
     return obj_keys, obj_vals
 
 
-def do_translate(instance, lang, field_names, field_values):
-    translated = main_translator(field_values, lang)
+def source_language(instance, field_values, detect: bool = translation_detect_source) -> Optional[str]:
+    """
+    Language of instance values: source language field, configured language or detected by translator
+    from sample of translatable values. None - unknown, provider detects it on every call
+    """
+    options = instance.get_translation_options()
+    if options.source_lang_field:
+        lang = getattr(instance, options.source_lang_field)
+        if lang:
+            return str(lang).lower()
+    if options.source_lang or not detect:
+        return options.source_lang
+    sample = ' '.join(value for value in field_values if is_translatable(value))[:detect_chars]
+    return main_translator.detect(sample) if sample else None
+
+
+def value_hash(value) -> str:
+    return source_hash('' if value is None else str(value))
+
+
+def source_hashes(field_names, field_values) -> Dict[str, str]:
+    return {name: value_hash(value) for name, value in zip(field_names, field_values)}
+
+
+def save_translated(instance, lang, field_names, field_values, translated):
     data = dict(zip(field_names, translated))
-    data[f'{instance.get_base_model_name()}_ptr'] = instance
+    data[SOURCE_HASHES_FIELD] = source_hashes(field_names, field_values)
+    started = time.perf_counter()
     instance.translate_connected(lang, data)
+    connected_saved.send(sender=type(instance), lang=lang, count=1, duration=time.perf_counter() - started)
+
+
+def do_translate(instance, lang, field_names, field_values, source=None):
+    translated = main_translator(field_values, lang, source)
+    save_translated(instance, lang, field_names, field_values, translated)
+
+
+def _get_translation_executor() -> ThreadPoolExecutor:
+    """Thread pool shared by all concurrent translations, created on first use"""
+    global _translation_executor
+    if _translation_executor is None:
+        _translation_executor = ThreadPoolExecutor(max_workers=translation_concurrency,
+                                                   thread_name_prefix='translation')
+    return _translation_executor
+
+
+def translate_concurrently(field_values, langs, source=None) -> Tuple[Dict[str, list], Dict[str, Exception]]:
+    """
+    Issue translator calls for all langs in parallel
+    :return tuple[{lang: translated values}, {lang: exception}] - both in langs order
+    """
+    executor = _get_translation_executor()
+    futures = [(lang, executor.submit(main_translator, field_values, lang, source)) for lang in langs]
+    translations, errors = {}, {}
+    for lang, future in futures:
+        try:
+            translations[lang] = future.result()
+        except Exception as e:
+            errors[lang] = e
+    return translations, errors
+
+
+def translate_instance(instance, langs, source='auto') -> NoReturn:
+    """
+    Translate instance into each of langs and save connected records.
+    Language equal to source language gets copy of values
+    :param source - source language, 'auto' - resolved by source_language()
+    """
+    field_names, field_values = preparing_content(instance)
+    if source == 'auto':
+        source = source_language(instance, field_values)
+    if translation_concurrency > 1 and len(langs) > 1:
+        translations, errors = translate_concurrently(field_values, langs, source)
+        # db writes stay in the calling thread, inside its transaction
+        for lang, translated in translations.items():
+            save_translated(instance, lang, field_names, field_values, translated)
+        if errors:
+            raise PartialTranslationError(errors)
+    else:
+        # failed language doesn't stop the others, like in concurrent mode
+        errors = {}
+        for lang in langs:
+            try:
+                do_translate(instance, lang, field_names, field_values, source)
+            except Exception as e:
+                errors[lang] = e
+        if errors and len(langs) == 1:
+            raise errors[langs[0]]
+        if errors:
+            raise PartialTranslationError(errors)
+
+
+async def atranslate_instance(instance, langs) -> NoReturn:
+    """
+    Async translate_instance. Translator calls of all langs are awaited concurrently on event loop,
+    connected records are saved in thread afterwards
+    """
+    field_names, field_values = preparing_content(instance)
+    source = await sync_to_async(source_language)(instance, field_values)
+    results = await asyncio.gather(
+        *(main_translator.atranslate(field_values, lang, source) for lang in langs), return_exceptions=True
+    )
+    translations, errors = {}, {}
+    for lang, result in zip(langs, results):
+        if isinstance(result, Exception):
+            errors[lang] = result
+        else:
+            translations[lang] = result
+
+    def save_all():
+        for lang, translated in translations.items():
+            save_translated(instance, lang, field_names, field_values, translated)
+
+    await sync_to_async(save_all)()
+    if errors:
+        raise PartialTranslationError(errors)
+
+
+def translate_on_demand(instance, lang: str):
+    """
+    Create missing connected record of lazy model. Concurrent readers of the same record in process
+    wait for one translation, other processes are deduplicated by unique connected records
+    :return connected record, None if translators failed - reader falls back to base values
+    """
+    model = type(instance)
+    storage = model.get_translation_storage()
+
+    def translate():
+        record = storage.fetch(instance, lang)
+        if record is None:
+            try:
+                with transaction.atomic():
+                    translate_instance(instance, [lang])
+            except IntegrityError:
+                pass  # created by another process meanwhile
+            except ResponseError:
+                return None
+            record = storage.fetch(instance, lang)
+        return record
+
+    return single_flight.do((model._meta.label, instance.pk, lang), translate)
+
+
+def _translate_langs(field_values, langs, source=None) -> Tuple[Dict[str, list], Dict[str, Exception]]:
+    """Translate values to every lang, concurrently if enabled. Errors are collected, not raised"""
+    if translation_concurrency > 1 and len(langs) > 1:
+        return translate_concurrently(field_values, langs, source)
+    translations, errors = {}, {}
+    for lang in langs:
+        try:
+            translations[lang] = main_translator(field_values, lang, source)
+        except Exception as e:
+            errors[lang] = e
+    return translations, errors
+
+
+def retranslate_changed(instance, langs, update_fields=None, missing_langs=None) -> NoReturn:
+    """
+    Translate only fields whose source value changed since connected record was translated.
+    Missing connected records are translated completely
+    :param update_fields - saved fields, others are considered unchanged
+    :param missing_langs - languages whose missing records are created, None - all langs
+    """
+    model = type(instance)
+    fields = get_translation_fields(model)
+    if update_fields is not None:
+        fields = [field for field in fields if field.name in update_fields]
+        if not fields:
+            return
+    values = {field.name: field.value_from_object(instance) for field in fields}
+    hashes = {name: value_hash(value) for name, value in values.items()}
+    # all connected records in one query
+    stored = model.get_translation_storage().get_many(instance, langs)
+
+    missing, changed_groups = [], {}  # changed_groups - {changed field names: [(lang, connected record)]}
+    for lang in langs:
+        connected = stored.get(lang)
+        if connected is None:
+            if missing_langs is None or lang in missing_langs:
+                missing.append(lang)
+            continue
+        stored_hashes = getattr(connected, SOURCE_HASHES_FIELD) or {}
+        changed = tuple(name for name in values if stored_hashes.get(name) != hashes[name])
+        if changed:
+            changed_groups.setdefault(changed, []).append((lang, connected))
+
+    errors = {}
+    if not missing and not changed_groups:
+        return
+    # source language of instance is resolved once for all languages
+    all_values = [field.value_from_object(instance) for field in get_translation_fields(model)]
+    source = source_language(instance, all_values)
+    if missing:
+        try:
+            translate_instance(instance, missing, source)
+        except PartialTranslationError as e:
+            errors.update(e.errors)
+        except Exception as e:
+            errors[missing[0]] = e
+    for changed, records in changed_groups.items():
+        translations, group_errors = _translate_langs([values[name] for name in changed],
+                                                      [lang for lang, _ in records], source)
+        errors.update(group_errors)
+        for lang, connected in records:
+            if lang not in translations:
+                continue
+            started = time.perf_counter()
+            for name, translated in zip(changed, translations[lang]):
+                setattr(connected, name, translated)
+            setattr(connected, SOURCE_HASHES_FIELD, {**(getattr(connected, SOURCE_HASHES_FIELD) or {}),
+                                                     **{name: hashes[name] for name in changed}})
+            connected.save(update_fields=[*changed, SOURCE_HASHES_FIELD])
+            connected_saved.send(sender=model, lang=lang, count=1, duration=time.perf_counter() - started)
+    if errors:
+        raise PartialTranslationError({lang: errors[lang] for lang in langs if lang in errors})
+
+
+def get_translation_fields(model: Type[Model]) -> List[Type[Field]]:
+    """Fields of base model copied into connected models"""
+    return registry.get(model).fields
+
+
+def _chunks(values: list, size: int):
+    for start in range(0, len(values), size):
+        yield values[start:start + size]
+
+
+def translate_unique(values, lang: str, batch_size: int = translation_batch_size, source=None) -> dict:
+    """
+    Translate distinct values in packed batches
+    :return {value: translated}
+    """
+    unique_values = list(dict.fromkeys(values))
+    translated = {}
+    for chunk in _chunks(unique_values, batch_size):
+        translated.update(zip(chunk, main_translator(chunk, lang, source)))
+    return translated
+
+
+def bulk_translate(instances, langs=None, batch_size: int = translation_batch_size,
+                   overwrite: bool = False) -> Dict[str, int]:
+    """
+    Create connected records for many instances of one model.
+    Distinct source values of all instances are translated in packed batches per language and source language,
+    connected records are saved with bulk_create. Instances already translated to language are skipped.
+    Source language comes from source_lang_field or source_lang only, it is not detected per instance
+    :param instances - queryset or iterable of base model instances
+    :param langs - languages, all model languages by default
+    :param overwrite - retranslate existing connected records too, saved with bulk_update
+    :return {lang: created or updated records count}
+    """
+    instances = list(instances)
+    if not instances:
+        return {}
+    model = type(instances[0])
+    if model not in registry:
+        raise ValueError(f'{model.__name__} is not registered as translatable')
+    if any(type(instance) is not model for instance in instances):
+        raise ValueError('All instances must be of the same model')
+    langs = model.get_translation_langs() if langs is None else tuple(lang.lower() for lang in langs)
+    field_names = [field.name for field in get_translation_fields(model)]
+    storage = model.get_translation_storage()
+    ptr_name = storage.ptr_name
+
+    pending = {}  # {lang: instances to translate}
+    existing = {}  # {lang: {base pk: connected record}}, filled only for overwrite
+    for lang in langs:
+        existing[lang] = {}
+        # chunked to stay under database limit of query parameters
+        for pks in _chunks([instance.pk for instance in instances], 500):
+            connected = storage.connected_queryset(lang).filter(**{f'{ptr_name}__in': pks})
+            if overwrite:
+                existing[lang].update((getattr(record, f'{ptr_name}_id'), record) for record in connected)
+            else:
+                existing[lang].update(dict.fromkeys(connected.values_list(f'{ptr_name}_id', flat=True)))
+        pending[lang] = [instance for instance in instances if overwrite or instance.pk not in existing[lang]]
+
+    sources = {instance.pk: source_language(instance, (), detect=False) for instance in instances}
+
+    def translate_pending(lang):
+        """:return {(source language, value): translated}"""
+        groups = {}
+        for instance in pending[lang]:
+            groups.setdefault(sources[instance.pk], []).extend(getattr(instance, name) for name in field_names)
+        translated = {}
+        for source, values in groups.items():
+            unique = translate_unique(values, lang, batch_size, source)
+            translated.update(((source, value), result) for value, result in unique.items())
+        return translated
+
+    if translation_concurrency > 1 and len(langs) > 1:
+        executor = _get_translation_executor()
+        futures = [(lang, executor.submit(translate_pending, lang)) for lang in langs]
+    else:
+        futures = [(lang, None) for lang in langs]
+
+    created, errors = {}, {}
+    for lang, future in futures:
+        try:
+            translated = future.result() if future else translate_pending(lang)
+        except Exception as e:
+            errors[lang] = e
+            continue
+        connected_model = storage.connected_model(lang)
+        to_create, to_update = [], []
+        for instance in pending[lang]:
+            data = {name: translated[sources[instance.pk], getattr(instance, name)] for name in field_names}
+            data[SOURCE_HASHES_FIELD] = source_hashes(field_names, [getattr(instance, name) for name in field_names])
+            record = existing[lang].get(instance.pk)
+            if record is None:
+                to_create.append(storage.new_record(instance, lang, data))
+            else:
+                for name, value in data.items():
+                    setattr(record, name, value)
+                to_update.append(record)
+        started = time.perf_counter()
+        connected_model.objects.bulk_create(to_create, batch_size=batch_size)
+        if to_update and field_names:
+            connected_model.objects.bulk_update(to_update, [*field_names, SOURCE_HASHES_FIELD], batch_size=batch_size)
+        connected_saved.send(sender=model, lang=lang, count=len(pending[lang]), duration=time.perf_counter() - started)
+        created[lang] = len(pending[lang])
+    if created:
+        # bulk writes send no signals - every cached entry of model is dropped at once
+        from .caching import cache_enabled, translation_cache
+        if cache_enabled():
+            translation_cache.invalidate_model(model)
+    if errors:
+        raise PartialTranslationError(errors)
+    return created
+
+
+def translate_to_connected_tables(sender, instance, update_fields=None, **kwargs):
+    """post_save receiver, connected to translatable models only"""
+    options = registry.get(sender)
+    created = kwargs.get('created', False)
+    # lazy model - only hot languages are translated ahead, others on first read
+    eager_langs = demand_tracker.hot_langs(sender) if options.lazy else options.langs
+    if translation_queue_enabled:
+        if update_fields is not None and not any(field.name in update_fields for field in options.fields):
+            return
+        if created and not eager_langs:
+            return
+        # translation is done by translation_worker command, after transaction commits
+        from .jobs import enqueue_translation
+        enqueue_translation(instance, eager_langs if created else options.langs)
+    elif created:
+        if eager_langs:
+            translate_instance(instance, eager_langs)
+    else:
+        # only fields with changed source are translated again
+        retranslate_changed(instance, options.langs, update_fields, missing_langs=eager_langs)
 
 
 def register():
-    @receiver(post_save, weak=False)
-    @__set_util_funcs()
-    def translate_to_connected_tables(sender, instance, **kwargs):
-        if kwargs.get('created', False):
-            if sender in translation_models_list:
-                field_names, field_values = preparing_content(instance)
-                for lang in global_langs:
-                    # # TODO too slow. threading mb
-                    do_translate(instance, lang, field_names, field_values)
-
+    """Connect translation receiver to every translatable model. Other models saves are not affected"""
+    from .caching import connect_invalidation
+    for model in registry:
+        post_save.connect(translate_to_connected_tables, sender=model, weak=False,
+                          dispatch_uid=f'translate_to_connected_tables:{model._meta.label}')
+        # receivers do nothing while TRANSLATION_CACHE is off
+        connect_invalidation(model)
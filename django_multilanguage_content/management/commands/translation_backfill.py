@@ -0,0 +1,87 @@
+import time
+from django.core.management.base import BaseCommand, CommandError
+from ...logic import bulk_translate, translation_batch_size
+from ...models import TranslationCheckpoint
+from ..utils import get_models
+
+
+class Command(BaseCommand):
+    help = 'Creates missing connected records for existing rows (new language or newly translatable model)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--models', nargs='+', default=None,
+                            help='Models as app_label.ModelName. Default - all translatable models')
+        parser.add_argument('--langs', nargs='+', default=None,
+                            help='Languages. Default - TRANSLATING_LANGS')
+        parser.add_argument('--chunk-size', type=int, default=1000,
+                            help='Rows fetched and translated at once')
+        parser.add_argument('--batch-size', type=int, default=translation_batch_size,
+                            help='Values per translator call')
+        parser.add_argument('--rate', type=float, default=0,
+                            help='Max rows per second, 0 - unlimited')
+        parser.add_argument('--retranslate', action='store_true',
+                            help='Translate all rows again, not only missing ones')
+        parser.add_argument('--reset', action='store_true',
+                            help='Forget saved checkpoints and start from the beginning')
+        parser.add_argument('--dry-run', action='store_true',
+                            help='Only report how many rows would be translated')
+
+    def handle(self, *args, **options):
+        models = get_models(options['models'])
+        for model in models:
+            for lang in self._get_langs(model, options['langs']):
+                self._process(model, lang, options)
+
+    @staticmethod
+    def _get_langs(model, langs):
+        followed = model.get_translation_langs()
+        if not langs:
+            return followed
+        unknown = [lang for lang in langs if lang.lower() not in followed]
+        if unknown:
+            raise CommandError(f'{model._meta.label} is not translated into {", ".join(unknown)}')
+        return [lang.lower() for lang in langs]
+
+    def _process(self, model, lang, options):
+        mode = 'retranslate' if options['retranslate'] else 'backfill'
+        checkpoint_name = f'{mode}:{model._meta.label}:{lang}'
+        if options['reset']:
+            TranslationCheckpoint.objects.filter(name=checkpoint_name).delete()
+        checkpoint = TranslationCheckpoint.objects.filter(name=checkpoint_name).first()
+
+        queryset = model._default_manager.order_by('pk')
+        if not options['retranslate']:
+            # anti-join: rows without connected record in this language
+            queryset = queryset.filter(model.get_translation_storage().missing(lang))
+        if checkpoint is not None:
+            queryset = queryset.filter(pk__gt=checkpoint.last_pk)
+
+        if options['dry_run']:
+            self.stdout.write(f'{model._meta.label} [{lang}]: {queryset.count()} rows to translate')
+            return
+
+        started, processed, batch = time.monotonic(), 0, []
+        for instance in queryset.iterator(chunk_size=options['chunk_size']):
+            batch.append(instance)
+            if len(batch) >= options['chunk_size']:
+                processed += self._translate_batch(batch, lang, checkpoint_name, options)
+                batch = []
+                self._throttle(started, processed, options['rate'])
+        if batch:
+            processed += self._translate_batch(batch, lang, checkpoint_name, options)
+        # checkpoint is needed only to resume interrupted run
+        TranslationCheckpoint.objects.filter(name=checkpoint_name).delete()
+        self.stdout.write(f'{model._meta.label} [{lang}]: {processed} rows translated')
+
+    @staticmethod
+    def _translate_batch(batch, lang, checkpoint_name, options):
+        bulk_translate(batch, langs=[lang], batch_size=options['batch_size'], overwrite=options['retranslate'])
+        TranslationCheckpoint.objects.update_or_create(name=checkpoint_name, defaults={'last_pk': str(batch[-1].pk)})
+        return len(batch)
+
+    @staticmethod
+    def _throttle(started, processed, rate):
+        if rate > 0:
+            ahead = processed / rate - (time.monotonic() - started)
+            if ahead > 0:
+                time.sleep(ahead)
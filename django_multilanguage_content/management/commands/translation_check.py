@@ -0,0 +1,43 @@
+from django.core.management.base import BaseCommand
+from ...consistency import repair_model, scan_chunk_size, scan_model, scan_sample_size
+from ...logic import translation_batch_size
+from ..utils import get_models
+
+
+class Command(BaseCommand):
+    help = ('Reports missing, orphaned and stale connected records per model and language, '
+            'optionally repairs them in batches')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--models', nargs='+', default=None,
+                            help='Models as app_label.ModelName. Default - all translatable models')
+        parser.add_argument('--langs', nargs='+', default=None,
+                            help='Languages. Default - all languages of model')
+        parser.add_argument('--stale', action='store_true',
+                            help='Also find records translated from other source values (full pass over records)')
+        parser.add_argument('--sample-size', type=int, default=scan_sample_size,
+                            help='Pks reported per problem')
+        parser.add_argument('--repair', nargs='*', choices=('missing', 'orphaned', 'stale'), default=None,
+                            help='Translate missing, delete orphaned, retranslate stale records. '
+                                 'Without values - missing only')
+        parser.add_argument('--chunk-size', type=int, default=scan_chunk_size,
+                            help='Rows repaired at once')
+        parser.add_argument('--batch-size', type=int, default=translation_batch_size,
+                            help='Values per translator call')
+
+    def handle(self, *args, **options):
+        problems = 0
+        for model in get_models(options['models']):
+            for report in scan_model(model, options['langs'], options['stale'], options['sample_size']):
+                problems += not report.ok
+                self.stdout.write(str(report))
+            if options['repair'] is not None:
+                kinds = options['repair'] or ['missing']
+                fixed = repair_model(model, options['langs'], missing='missing' in kinds,
+                                     orphaned='orphaned' in kinds, stale='stale' in kinds,
+                                     chunk_size=options['chunk_size'], batch_size=options['batch_size'])
+                for lang, counts in fixed.items():
+                    if any(counts.values()):
+                        done = ', '.join(f'{kind} {count}' for kind, count in counts.items() if count)
+                        self.stdout.write(f'{model._meta.label} [{lang}]: repaired {done}')
+        self.stdout.write(f'{problems} (model, language) pairs with problems')
@@ -0,0 +1,27 @@
+import sys
+from django.core.management.base import BaseCommand
+from ...exchange import FORMATS, WRITERS, export_entries
+from ..utils import file_format_of, get_models
+
+
+class Command(BaseCommand):
+    help = 'Streams translated fields of connected records to JSONL, PO or XLIFF file for review'
+
+    def add_arguments(self, parser):
+        parser.add_argument('output', help='File path, "-" - stdout')
+        parser.add_argument('--format', choices=FORMATS, default=None,
+                            help='Default - by output file extension, jsonl for stdout')
+        parser.add_argument('--models', nargs='+', default=None,
+                            help='Models as app_label.ModelName. Default - all translatable models')
+        parser.add_argument('--langs', nargs='+', default=None,
+                            help='Languages. Default - all languages of model')
+
+    def handle(self, *args, **options):
+        file_format = options['format'] or file_format_of(options['output'])
+        entries = export_entries(get_models(options['models']), options['langs'])
+        if options['output'] == '-':
+            count = WRITERS[file_format](entries, sys.stdout)
+        else:
+            with open(options['output'], 'w', encoding='utf-8') as out:
+                count = WRITERS[file_format](entries, out)
+            self.stdout.write(f'{count} entries exported to {options["output"]}')
@@ -0,0 +1,34 @@
+import sys
+from django.core.management.base import BaseCommand
+from ...exchange import FORMATS, import_entries, read_entries
+from ...logic import translation_batch_size
+from ..utils import file_format_of
+
+
+class Command(BaseCommand):
+    help = ('Loads reviewed translations from JSONL, PO or XLIFF file in batches and puts them '
+            'into translation memory')
+
+    def add_arguments(self, parser):
+        parser.add_argument('input', help='File path, "-" - stdin')
+        parser.add_argument('--format', choices=FORMATS, default=None,
+                            help='Default - by input file extension, jsonl for stdin')
+        parser.add_argument('--batch-size', type=int, default=translation_batch_size,
+                            help='Entries written at once per model and language')
+        parser.add_argument('--no-memory', action='store_true',
+                            help="Don't put imported translations into translation memory")
+
+    def handle(self, *args, **options):
+        file_format = options['format'] or file_format_of(options['input'])
+        if options['input'] == '-':
+            stats = self._import(sys.stdin.buffer if file_format == 'xliff' else sys.stdin, file_format, options)
+        else:
+            mode, encoding = ('rb', None) if file_format == 'xliff' else ('r', 'utf-8')
+            with open(options['input'], mode, encoding=encoding) as source:
+                stats = self._import(source, file_format, options)
+        self.stdout.write(', '.join(f'{count} {kind}' for kind, count in stats.items()))
+
+    @staticmethod
+    def _import(source, file_format, options):
+        return import_entries(read_entries(source, file_format), batch_size=options['batch_size'],
+                              seed_memory=not options['no_memory'])
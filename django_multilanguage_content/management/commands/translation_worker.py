@@ -0,0 +1,49 @@
+import time
+from django.core.management.base import BaseCommand
+from ...jobs import (claim_jobs, purge_done_jobs, queue_concurrency, queue_max_attempts, requeue_dead_jobs,
+                     requeue_stale_jobs, run_jobs)
+
+
+class Command(BaseCommand):
+    help = 'Drains queue of pending translation jobs (TRANSLATION_QUEUE = True)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--concurrency', type=int, default=queue_concurrency,
+                            help='Number of jobs translated in parallel')
+        parser.add_argument('--batch-size', type=int, default=None,
+                            help='Number of jobs claimed at once. Default - 4 * concurrency')
+        parser.add_argument('--max-attempts', type=int, default=queue_max_attempts,
+                            help='Attempts before job is dead-lettered')
+        parser.add_argument('--sleep', type=float, default=1.0,
+                            help='Seconds to wait when queue is empty')
+        parser.add_argument('--stale-after', type=int, default=600,
+                            help='Seconds after which running job is considered abandoned and requeued')
+        parser.add_argument('--purge-done-after', type=int, default=3600,
+                            help='Seconds after which done jobs are deleted')
+        parser.add_argument('--once', action='store_true',
+                            help='Exit when queue is empty instead of polling')
+        parser.add_argument('--retry-dead', action='store_true',
+                            help='Requeue dead-lettered jobs before start')
+
+    def handle(self, *args, **options):
+        concurrency = max(options['concurrency'], 1)
+        batch_size = options['batch_size'] or concurrency * 4
+        if options['retry_dead']:
+            self.stdout.write(f'Requeued {requeue_dead_jobs()} dead jobs')
+        done = failed = 0
+        try:
+            while True:
+                requeue_stale_jobs(options['stale_after'])
+                purge_done_jobs(options['purge_done_after'])
+                jobs = claim_jobs(batch_size)
+                if not jobs:
+                    if options['once']:
+                        break
+                    time.sleep(options['sleep'])
+                    continue
+                results = run_jobs(jobs, concurrency, options['max_attempts'])
+                done += results.count(True)
+                failed += results.count(False)
+        except KeyboardInterrupt:
+            pass
+        self.stdout.write(f'Jobs done: {done}, failed: {failed}')
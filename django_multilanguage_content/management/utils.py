@@ -0,0 +1,29 @@
+from typing import List, Optional
+from django.apps import apps
+from django.core.management.base import CommandError
+from ..exchange import FORMATS
+from ..registry import registry
+
+
+def get_models(labels: Optional[List[str]]) -> List:
+    """Translatable models of app_label.ModelName labels, every translatable model if none"""
+    if not labels:
+        return list(registry)
+    models = []
+    for label in labels:
+        try:
+            model = apps.get_model(label)
+        except (LookupError, ValueError) as e:
+            raise CommandError(str(e))
+        if model not in registry:
+            raise CommandError(f'{label} is not registered as translatable')
+        models.append(model)
+    return models
+
+
+def file_format_of(path: str) -> str:
+    """Exchange format by file extension, jsonl if unknown"""
+    extension = path.rsplit('.', 1)[-1].lower()
+    if extension == 'xlf':
+        return 'xliff'
+    return extension if extension in FORMATS else 'jsonl'
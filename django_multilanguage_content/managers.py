@@ -0,0 +1,49 @@
+from django.db.models import F, Manager, QuerySet
+from django.db.models.functions import Coalesce
+from .logic import get_translation_fields
+
+
+class TranslationQuerySet(QuerySet):
+    """QuerySet of translatable model. Resolves connected models values in SQL"""
+
+    translated_suffix = '_translated'
+
+    def _check_langs(self, langs):
+        followed = self.model.get_translation_langs()
+        for lang in langs:
+            if lang not in followed:
+                raise ValueError(f'{self.model.__name__} is not translated to {lang}')
+
+    def with_translations(self, *langs):
+        """Load connected records of langs, all model languages by default"""
+        langs = [lang.lower() for lang in langs] or self.model.get_translation_langs()
+        self._check_langs(langs)
+        return self.model.get_translation_storage().eager(self, langs)
+
+    def translated(self, lang, fallback=(), fallback_to_source=True):
+        """
+        Annotate translated fields as <field>_translated, in one query with JOINs
+        :param lang - language
+        :param fallback - languages used in order when lang is not translated
+        :param fallback_to_source - base model value is used as last resort
+        Annotations may be used in filter(), order_by() and values()
+        """
+        langs = [lang.lower(), *(fallback_lang.lower() for fallback_lang in fallback)]
+        self._check_langs(langs)
+        queryset, prefixes = self, []
+        for each in langs:
+            queryset, prefix = self.model.get_translation_storage().lookup_prefix(queryset, each)
+            prefixes.append(prefix)
+        annotations = {}
+        for field in get_translation_fields(self.model):
+            expressions = [F(f'{prefix}__{field.name}') for prefix in prefixes]
+            if fallback_to_source:
+                expressions.append(F(field.name))
+            annotations[f'{field.name}{self.translated_suffix}'] = (
+                Coalesce(*expressions) if len(expressions) > 1 else expressions[0]
+            )
+        return queryset.annotate(**annotations)
+
+
+class TranslationManager(Manager.from_queryset(TranslationQuerySet)):
+    pass
@@ -0,0 +1,157 @@
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Dict, Iterable, NoReturn, Optional
+from django.conf import settings
+from .signals import memory_looked_up
+
+memory_size = getattr(settings, 'TRANSLATION_MEMORY_SIZE', 10000)  # in-process entries, 0 - disabled
+memory_store = getattr(settings, 'TRANSLATION_MEMORY_STORE', None)  # None, 'db' or 'cache'
+memory_cache_alias = getattr(settings, 'TRANSLATION_MEMORY_CACHE', 'default')
+
+
+def source_hash(text: str) -> str:
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+
+class DatabaseMemoryStore:
+    """Persistent tier in TranslationMemoryEntry table"""
+
+    def get_many(self, hashes: Iterable[str], lang: str, backend: str, source_lang: str = '') -> Dict[str, str]:
+        from .models import TranslationMemoryEntry
+        return dict(TranslationMemoryEntry.objects.filter(
+            source_lang=source_lang, lang=lang, backend=backend, source_hash__in=list(hashes)
+        ).values_list('source_hash', 'translated'))
+
+    def set_many(self, entries: Dict[str, tuple], lang: str, backend: str, source_lang: str = '') -> NoReturn:
+        """:param entries - {hash: (source, translated)}"""
+        from .models import TranslationMemoryEntry
+        TranslationMemoryEntry.objects.bulk_create([
+            TranslationMemoryEntry(source_hash=hash_, source_lang=source_lang, lang=lang, backend=backend,
+                                   source=source, translated=translated)
+            for hash_, (source, translated) in entries.items()
+        ], ignore_conflicts=True)
+
+
+class CacheMemoryStore:
+    """Persistent tier in Django cache backend"""
+
+    def __init__(self, alias: str):
+        self.alias = alias
+
+    @property
+    def cache(self):
+        from django.core.cache import caches
+        return caches[self.alias]
+
+    @staticmethod
+    def _key(hash_: str, lang: str, backend: str, source_lang: str = '') -> str:
+        return f'translation_memory:{backend}:{source_lang or "auto"}:{lang}:{hash_}'
+
+    def get_many(self, hashes: Iterable[str], lang: str, backend: str, source_lang: str = '') -> Dict[str, str]:
+        keys = {self._key(hash_, lang, backend, source_lang): hash_ for hash_ in hashes}
+        return {keys[key]: value for key, value in self.cache.get_many(list(keys)).items()}
+
+    def set_many(self, entries: Dict[str, tuple], lang: str, backend: str, source_lang: str = '') -> NoReturn:
+        self.cache.set_many({
+            self._key(hash_, lang, backend, source_lang): translated
+            for hash_, (source, translated) in entries.items()
+        }, timeout=None)
+
+
+class TranslationMemory:
+    """
+    Two-tier translation memory: in-process LRU in front of optional persistent store.
+    Entries are keyed by (source text hash, source lang, target lang, backend), source lang is ''
+    when provider detects it
+    """
+
+    def __init__(self, size: int = memory_size, store=None):
+        self.size = size
+        self.store = store
+        self._lru = OrderedDict()
+        self._lock = threading.Lock()
+        self.lru_hits = 0
+        self.store_hits = 0
+        self.misses = 0
+
+    def get_many(self, texts: Iterable, lang: str, backend: str, source: Optional[str] = None) -> Dict[str, str]:
+        """
+        :return {text: translated} for known texts. Only strings are looked up
+        :param source - language of texts, None - detected by provider
+        """
+        source = source or ''
+        hashes = {source_hash(text): text for text in texts if isinstance(text, str)}
+        found = {}
+        with self._lock:
+            for hash_, text in hashes.items():
+                key = (hash_, source, lang, backend)
+                if key in self._lru:
+                    self._lru.move_to_end(key)
+                    found[text] = self._lru[key]
+            lru_hits = len(found)
+            self.lru_hits += lru_hits
+        remaining = [hash_ for hash_, text in hashes.items() if text not in found]
+        if remaining and self.store is not None:
+            stored = self.store.get_many(remaining, lang, backend, source)
+            with self._lock:
+                for hash_, translated in stored.items():
+                    self._remember((hash_, source, lang, backend), translated)
+                    found[hashes[hash_]] = translated
+                self.store_hits += len(stored)
+        misses = len(hashes) - len(found)
+        with self._lock:
+            self.misses += misses
+        memory_looked_up.send(sender=type(self), lang=lang, backend=backend, lru_hits=lru_hits,
+                              store_hits=len(found) - lru_hits, misses=misses)
+        return found
+
+    def set_many(self, translations: Dict[str, str], lang: str, backend: str,
+                 source: Optional[str] = None) -> NoReturn:
+        """:param translations - {text: translated}"""
+        source = source or ''
+        entries = {
+            source_hash(text): (text, translated) for text, translated in translations.items()
+            if isinstance(text, str) and isinstance(translated, str)
+        }
+        with self._lock:
+            for hash_, (text, translated) in entries.items():
+                self._remember((hash_, source, lang, backend), translated)
+        if entries and self.store is not None:
+            self.store.set_many(entries, lang, backend, source)
+
+    def _remember(self, key: tuple, translated: str) -> NoReturn:
+        if self.size <= 0:
+            return
+        self._lru[key] = translated
+        self._lru.move_to_end(key)
+        while len(self._lru) > self.size:
+            self._lru.popitem(last=False)
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                'lru_hits': self.lru_hits,
+                'store_hits': self.store_hits,
+                'misses': self.misses,
+                'lru_size': len(self._lru),
+            }
+
+    def clear(self) -> NoReturn:
+        """Clear in-process tier and counters. Persistent store is kept"""
+        with self._lock:
+            self._lru.clear()
+            self.lru_hits = self.store_hits = self.misses = 0
+
+
+def _make_store(kind: Optional[str]):
+    if kind is None:
+        return None
+    if kind == 'db':
+        return DatabaseMemoryStore()
+    if kind == 'cache':
+        return CacheMemoryStore(memory_cache_alias)
+    raise ValueError(f'Unknown TRANSLATION_MEMORY_STORE {kind}, use "db" or "cache"')
+
+
+translation_memory = TranslationMemory(memory_size, _make_store(memory_store))
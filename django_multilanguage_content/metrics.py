@@ -0,0 +1,189 @@
+"""
+Prometheus-style metrics of translation pipeline, collected from instrumentation signals.
+Enabled by TRANSLATION_METRICS = True, exposed in text format by metrics_view
+"""
+import bisect
+import threading
+from typing import Dict, Iterable, Tuple
+from django.http import HttpResponse
+from . import signals
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def _labels_key(labels: Dict[str, str]) -> Tuple:
+    return tuple(sorted((name, str(value)) for name, value in labels.items()))
+
+
+def _format_labels(labels: Iterable[Tuple[str, str]]) -> str:
+    labels = list(labels)
+    if not labels:
+        return ''
+    escaped = (
+        f'{name}="' + value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n') + '"'
+        for name, value in labels
+    )
+    return '{' + ','.join(escaped) + '}'
+
+
+class Counter:
+    kind = 'counter'
+
+    def __init__(self, name: str, documentation: str):
+        self.name = name
+        self.documentation = documentation
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1, **labels):
+        key = _labels_key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels) -> float:
+        with self._lock:
+            return self._values.get(_labels_key(labels), 0)
+
+    def samples(self):
+        with self._lock:
+            return [(self.name, key, value) for key, value in self._values.items()]
+
+
+class Histogram:
+    kind = 'histogram'
+
+    def __init__(self, name: str, documentation: str, buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.buckets = tuple(sorted(buckets))
+        self._values = {}  # {labels: [bucket counts..., sum, count]}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, **labels):
+        key = _labels_key(labels)
+        with self._lock:
+            state = self._values.setdefault(key, [0] * len(self.buckets) + [0.0, 0])
+            index = bisect.bisect_left(self.buckets, value)
+            if index < len(self.buckets):
+                state[index] += 1
+            state[-2] += value
+            state[-1] += 1
+
+    def count(self, **labels) -> int:
+        with self._lock:
+            return self._values.get(_labels_key(labels), [0])[-1]
+
+    def samples(self):
+        samples = []
+        with self._lock:
+            for key, state in self._values.items():
+                cumulative = 0
+                for bound, bucket_count in zip(self.buckets, state):
+                    cumulative += bucket_count
+                    samples.append((f'{self.name}_bucket', key + (('le', repr(bound)),), cumulative))
+                samples.append((f'{self.name}_bucket', key + (('le', '+Inf'),), state[-1]))
+                samples.append((f'{self.name}_sum', key, state[-2]))
+                samples.append((f'{self.name}_count', key, state[-1]))
+        return samples
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self._metrics = {}
+        self._lock = threading.Lock()
+
+    def _register(self, metric):
+        with self._lock:
+            return self._metrics.setdefault(metric.name, metric)
+
+    def counter(self, name: str, documentation: str) -> Counter:
+        return self._register(Counter(name, documentation))
+
+    def histogram(self, name: str, documentation: str, buckets=DEFAULT_BUCKETS) -> Histogram:
+        return self._register(Histogram(name, documentation, buckets))
+
+    def get(self, name: str):
+        return self._metrics[name]
+
+    def render(self) -> str:
+        """Prometheus text exposition format"""
+        lines = []
+        for metric in list(self._metrics.values()):
+            lines.append(f'# HELP {metric.name} {metric.documentation}')
+            lines.append(f'# TYPE {metric.name} {metric.kind}')
+            for sample_name, labels, value in metric.samples():
+                lines.append(f'{sample_name}{_format_labels(labels)} {value}')
+        return '\n'.join(lines) + '\n'
+
+
+registry = MetricsRegistry()
+
+backend_calls = registry.counter('translation_backend_calls_total', 'Calls to translation backends')
+backend_failures = registry.counter('translation_backend_failures_total', 'Failed calls to translation backends')
+backend_latency = registry.histogram('translation_backend_latency_seconds', 'Translation backend call latency')
+characters_translated = registry.counter('translation_characters_total', 'Characters sent to translation backends')
+fallbacks = registry.counter('translation_fallbacks_total', 'Translations served after another backend failed')
+memory_hits = registry.counter('translation_memory_hits_total', 'Translation memory hits')
+memory_misses = registry.counter('translation_memory_misses_total', 'Translation memory misses')
+prepare_latency = registry.histogram('translation_prepare_seconds', 'Collecting instance values for translation')
+connected_writes = registry.counter('translation_connected_writes_total', 'Connected records written')
+connected_latency = registry.histogram('translation_connected_write_seconds', 'Writing connected records')
+rate_limit_waits = registry.histogram('translation_rate_limit_wait_seconds', 'Waiting for backend rate limit slot')
+serializer_builds = registry.counter('translation_serializer_builds_total', 'Connected serializer class requests')
+serializer_latency = registry.histogram('translation_serializer_build_seconds', 'Connected serializer class requests',
+                                        buckets=(0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05))
+
+
+def _on_content_prepared(sender, duration, **kwargs):
+    prepare_latency.observe(duration, model=sender._meta.label)
+
+
+def _on_backend_called(sender, backend, lang, characters, duration, error, **kwargs):
+    status = 'ok' if error is None else 'error'
+    backend_calls.inc(backend=backend, lang=lang, status=status)
+    backend_latency.observe(duration, backend=backend)
+    characters_translated.inc(characters, backend=backend, lang=lang)
+    if error is not None:
+        backend_failures.inc(backend=backend, error=type(error).__name__)
+
+
+def _on_backend_fallback(sender, backend, lang, **kwargs):
+    fallbacks.inc(backend=backend, lang=lang)
+
+
+def _on_memory_looked_up(sender, lang, lru_hits, store_hits, misses, **kwargs):
+    if lru_hits:
+        memory_hits.inc(lru_hits, tier='lru', lang=lang)
+    if store_hits:
+        memory_hits.inc(store_hits, tier='store', lang=lang)
+    if misses:
+        memory_misses.inc(misses, lang=lang)
+
+
+def _on_connected_saved(sender, lang, count, duration, **kwargs):
+    connected_writes.inc(count, model=sender._meta.label, lang=lang)
+    connected_latency.observe(duration, model=sender._meta.label)
+
+
+def _on_serializer_built(sender, cached, duration, **kwargs):
+    serializer_builds.inc(cached=cached)
+    serializer_latency.observe(duration, cached=cached)
+
+
+def _on_rate_limit_waited(sender, backend, wait, **kwargs):
+    rate_limit_waits.observe(wait, backend=backend)
+
+
+def install():
+    """Collect metrics from instrumentation signals"""
+    signals.content_prepared.connect(_on_content_prepared, dispatch_uid='translation_metrics')
+    signals.backend_called.connect(_on_backend_called, dispatch_uid='translation_metrics')
+    signals.backend_fallback.connect(_on_backend_fallback, dispatch_uid='translation_metrics')
+    signals.memory_looked_up.connect(_on_memory_looked_up, dispatch_uid='translation_metrics')
+    signals.connected_saved.connect(_on_connected_saved, dispatch_uid='translation_metrics')
+    signals.serializer_built.connect(_on_serializer_built, dispatch_uid='translation_metrics')
+    signals.rate_limit_waited.connect(_on_rate_limit_waited, dispatch_uid='translation_metrics')
+
+
+def metrics_view(request):
+    return HttpResponse(registry.render(), content_type='text/plain; version=0.0.4; charset=utf-8')
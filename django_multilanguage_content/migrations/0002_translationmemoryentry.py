@@ -0,0 +1,28 @@
+# Generated by Django 3.2.25 on 2026-10-18 13:23
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('django_multilanguage_content', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TranslationMemoryEntry',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('source_hash', models.CharField(max_length=64)),
+                ('lang', models.CharField(max_length=16)),
+                ('backend', models.CharField(max_length=50)),
+                ('source', models.TextField()),
+                ('translated', models.TextField()),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'unique_together': {('source_hash', 'lang', 'backend')},
+            },
+        ),
+    ]
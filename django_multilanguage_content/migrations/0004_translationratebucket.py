@@ -0,0 +1,22 @@
+# Generated by Django 3.2.25 on 2026-10-18 13:42
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('django_multilanguage_content', '0003_translationcheckpoint'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TranslationRateBucket',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('key', models.CharField(max_length=255, unique=True)),
+                ('tokens', models.FloatField(default=0)),
+                ('updated', models.FloatField(null=True)),
+            ],
+        ),
+    ]
@@ -0,0 +1,22 @@
+# Generated by Django 3.2.25 on 2026-10-18 14:06
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('django_multilanguage_content', '0004_translationratebucket'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='translationmemoryentry',
+            name='source_lang',
+            field=models.CharField(blank=True, default='', max_length=16),
+        ),
+        migrations.AlterUniqueTogether(
+            name='translationmemoryentry',
+            unique_together={('source_hash', 'source_lang', 'lang', 'backend')},
+        ),
+    ]
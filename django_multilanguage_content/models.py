@@ -0,0 +1,72 @@
+from django.db import models
+from django.utils import timezone
+
+
+class TranslationJob(models.Model):
+    """Pending translation of a base model instance. Drained by translation_worker command"""
+    PENDING = 'pending'
+    RUNNING = 'running'
+    DONE = 'done'
+    DEAD = 'dead'
+    STATUSES = (
+        (PENDING, 'Pending'),
+        (RUNNING, 'Running'),
+        (DONE, 'Done'),
+        (DEAD, 'Dead'),
+    )
+
+    model_label = models.CharField(max_length=200)
+    object_pk = models.CharField(max_length=64)
+    langs = models.CharField(max_length=255)  # comma separated languages
+    status = models.CharField(max_length=10, choices=STATUSES, default=PENDING)
+    attempts = models.PositiveIntegerField(default=0)
+    last_error = models.TextField(blank=True, default='')
+    available_at = models.DateTimeField(default=timezone.now)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [models.Index(fields=['status', 'available_at'])]
+
+    def __str__(self):
+        return f'{self.model_label}:{self.object_pk} [{self.langs}] {self.status}'
+
+    def get_langs(self):
+        return [lang for lang in self.langs.split(',') if lang]
+
+
+class TranslationMemoryEntry(models.Model):
+    """Persistent tier of translation memory (TRANSLATION_MEMORY_STORE = 'db')"""
+    source_hash = models.CharField(max_length=64)
+    source_lang = models.CharField(max_length=16, blank=True, default='')  # '' - detected by provider
+    lang = models.CharField(max_length=16)
+    backend = models.CharField(max_length=50)
+    source = models.TextField()
+    translated = models.TextField()
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        unique_together = ('source_hash', 'source_lang', 'lang', 'backend')
+
+    def __str__(self):
+        return f'[{self.backend}:{self.lang}] {self.source[:50]}'
+
+
+class TranslationCheckpoint(models.Model):
+    """Last processed primary key of resumable command (translation_backfill)"""
+    name = models.CharField(max_length=255, unique=True)
+    last_pk = models.CharField(max_length=64)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f'{self.name}: {self.last_pk}'
+
+
+class TranslationRateBucket(models.Model):
+    """Token bucket state of backend rate limit, shared by processes (TRANSLATION_RATE_LIMIT_STORE = 'db')"""
+    key = models.CharField(max_length=255, unique=True)
+    tokens = models.FloatField(default=0)
+    updated = models.FloatField(null=True)  # unix time, empty - bucket was never used
+
+    def __str__(self):
+        return f'{self.key}: {self.tokens}'
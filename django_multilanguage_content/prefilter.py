@@ -0,0 +1,25 @@
+"""
+Pre-translation filter: values which can't be translated are passed through locally, not sent to providers
+"""
+import re
+from django.conf import settings
+
+URL_PATTERN = re.compile(r'^(?:[a-z][a-z0-9+.\-]*://|www\.)\S+$', re.IGNORECASE)
+EMAIL_PATTERN = re.compile(r'^[^@\s]+@[^@\s]+\.[^@\s]+$')
+# extra regular expressions of values to keep untranslated, like product codes
+skip_patterns = [re.compile(pattern) for pattern in getattr(settings, 'TRANSLATION_SKIP_PATTERNS', ())]
+
+
+def is_translatable(value) -> bool:
+    """
+    Whether value goes to translator. Skipped: non strings (None, numbers, dates ..), texts without letters
+    (empty, whitespace, numbers as text, punctuation), URLs, emails and TRANSLATION_SKIP_PATTERNS matches
+    """
+    if not isinstance(value, str):
+        return False
+    text = value.strip()
+    if not any(char.isalpha() for char in text):
+        return False
+    if URL_PATTERN.match(text) or EMAIL_PATTERN.match(text):
+        return False
+    return not any(pattern.fullmatch(text) for pattern in skip_patterns)
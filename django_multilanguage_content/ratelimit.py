@@ -0,0 +1,177 @@
+"""
+Token bucket rate limits of translation backends, shared by all processes through a store.
+Callers reserve tokens under store lock, bucket may go into debt - every caller gets its own slot
+in the future and sleeps until it comes, so callers are served in arrival order without bursts
+"""
+import asyncio
+import json
+import os
+import tempfile
+import time
+import uuid
+from typing import Dict, List, NoReturn, Optional, Tuple
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from .signals import rate_limit_waited
+
+rate_limit_store = getattr(settings, 'TRANSLATION_RATE_LIMIT_STORE', 'file')  # 'file', 'db' or 'cache'
+rate_limit_path = getattr(settings, 'TRANSLATION_RATE_LIMIT_PATH',
+                          os.path.join(tempfile.gettempdir(), 'django_translation_rate_limits'))
+rate_limit_cache_alias = getattr(settings, 'TRANSLATION_RATE_LIMIT_CACHE', 'default')
+
+# (bucket key, cost, rate per second, capacity)
+Bucket = Tuple[str, float, float, float]
+
+
+def take_tokens(state: Optional[Tuple[float, float]], cost: float, rate: float, capacity: float,
+                now: float) -> Tuple[Tuple[float, float], float]:
+    """
+    Refill bucket by elapsed time and take cost from it
+    :param state - (tokens, updated at) or None for full bucket
+    :return tuple[new state, seconds to wait before the call]
+    """
+    tokens, updated = state if state is not None else (capacity, now)
+    tokens = min(capacity, tokens + max(0.0, now - updated) * rate) - cost
+    return (tokens, now), max(0.0, -tokens / rate)
+
+
+def reserve_buckets(states: Dict[str, Tuple[float, float]], buckets: List[Bucket], now: float) -> float:
+    """Take tokens from every bucket, states are updated in place. :return seconds to wait"""
+    wait = 0.0
+    for key, cost, rate, capacity in buckets:
+        states[key], bucket_wait = take_tokens(states.get(key), cost, rate, capacity, now)
+        wait = max(wait, bucket_wait)
+    return wait
+
+
+class FileRateLimitStore:
+    """Bucket states in JSON files guarded by fcntl lock, shared by processes of one host"""
+
+    def __init__(self, directory: str = rate_limit_path):
+        self.directory = directory
+
+    def reserve(self, name: str, buckets: List[Bucket]) -> float:
+        import fcntl
+        os.makedirs(self.directory, exist_ok=True)
+        with open(os.path.join(self.directory, f'{name}.json'), 'a+') as state_file:
+            fcntl.flock(state_file, fcntl.LOCK_EX)
+            try:
+                state_file.seek(0)
+                content = state_file.read()
+                states = {key: tuple(value) for key, value in json.loads(content).items()} if content else {}
+                wait = reserve_buckets(states, buckets, time.time())
+                state_file.seek(0)
+                state_file.truncate()
+                json.dump(states, state_file)
+                state_file.flush()
+            finally:
+                fcntl.flock(state_file, fcntl.LOCK_UN)
+        return wait
+
+
+class DatabaseRateLimitStore:
+    """
+    Bucket states in TranslationRateBucket rows, locked with select_for_update.
+    Row lock is held until outer transaction ends, use it where translation runs outside
+    long transactions (translation_worker)
+    """
+
+    def reserve(self, name: str, buckets: List[Bucket]) -> float:
+        from django.db import transaction
+        from .models import TranslationRateBucket
+        keys = [key for key, *_ in buckets]
+        with transaction.atomic():
+            for key in keys:
+                TranslationRateBucket.objects.get_or_create(key=key)
+            rows = {row.key: row for row in TranslationRateBucket.objects.select_for_update().filter(key__in=keys)}
+            states = {key: (row.tokens, row.updated) for key, row in rows.items() if row.updated is not None}
+            wait = reserve_buckets(states, buckets, time.time())
+            for key, row in rows.items():
+                row.tokens, row.updated = states[key]
+                row.save(update_fields=['tokens', 'updated'])
+        return wait
+
+
+class CacheRateLimitStore:
+    """Bucket states in Django cache, guarded by cache.add() lock. Cache must be shared, like Redis or Memcached"""
+
+    def __init__(self, alias: str = rate_limit_cache_alias, lock_timeout: float = 5):
+        self.alias = alias
+        self.lock_timeout = lock_timeout
+
+    @property
+    def cache(self):
+        from django.core.cache import caches
+        return caches[self.alias]
+
+    def reserve(self, name: str, buckets: List[Bucket]) -> float:
+        lock_key = f'translation_rate_limit_lock:{name}'
+        token = uuid.uuid4().hex
+        # lock of dead owner expires after lock_timeout by itself
+        while not self.cache.add(lock_key, token, timeout=self.lock_timeout):
+            time.sleep(0.001)
+        try:
+            state_keys = {key: f'translation_rate_limit:{key}' for key, *_ in buckets}
+            stored = self.cache.get_many(list(state_keys.values()))
+            states = {key: tuple(stored[cache_key]) for key, cache_key in state_keys.items() if cache_key in stored}
+            wait = reserve_buckets(states, buckets, time.time())
+            self.cache.set_many({state_keys[key]: state for key, state in states.items()}, timeout=None)
+        finally:
+            # lock may have expired and been taken by other caller meanwhile
+            if self.cache.get(lock_key) == token:
+                self.cache.delete(lock_key)
+        return wait
+
+
+def make_store(kind: str):
+    if kind == 'file':
+        return FileRateLimitStore()
+    if kind == 'db':
+        return DatabaseRateLimitStore()
+    if kind == 'cache':
+        return CacheRateLimitStore()
+    raise ValueError(f'Unknown TRANSLATION_RATE_LIMIT_STORE {kind}, use "file", "db" or "cache"')
+
+
+class RateLimiter:
+    """
+    Requests and characters per second limits of one backend
+    :param burst - seconds of quota which may be spent at once after idle period
+    """
+
+    def __init__(self, name: str, requests_per_second: Optional[float] = None,
+                 chars_per_second: Optional[float] = None, burst: float = 1.0, store=None):
+        if not requests_per_second and not chars_per_second:
+            raise ValueError('Rate limit needs REQUESTS_PER_SECOND or CHARS_PER_SECOND')
+        self.name = name
+        self.requests_per_second = requests_per_second
+        self.chars_per_second = chars_per_second
+        self.burst = burst
+        self.store = store if store is not None else make_store(rate_limit_store)
+
+    def _buckets(self, chars: int) -> List[Bucket]:
+        buckets = []
+        if self.requests_per_second:
+            rate = self.requests_per_second
+            buckets.append((f'{self.name}:requests', 1, rate, max(1.0, rate * self.burst)))
+        if self.chars_per_second:
+            rate = self.chars_per_second
+            buckets.append((f'{self.name}:chars', chars, rate, rate * self.burst))
+        return buckets
+
+    def reserve(self, chars: int) -> float:
+        """Reserve one request of chars characters. :return seconds to wait before sending it"""
+        wait = self.store.reserve(self.name, self._buckets(chars))
+        if wait:
+            rate_limit_waited.send(sender=type(self), backend=self.name, chars=chars, wait=wait)
+        return wait
+
+    def acquire(self, chars: int) -> NoReturn:
+        wait = self.reserve(chars)
+        if wait:
+            time.sleep(wait)
+
+    async def aacquire(self, chars: int) -> NoReturn:
+        wait = await sync_to_async(self.reserve)(chars)
+        if wait:
+            await asyncio.sleep(wait)
@@ -0,0 +1,65 @@
+from typing import Dict, Iterator, List, Optional, Tuple, Type
+from django.db.models import Field, Model
+
+
+class TranslationOptions:
+    """
+    Translation metadata of one model, computed once when model is decorated
+    :param field_names - translated fields, empty - all non pk fields
+    :param langs - followed languages
+    :param storage - storage of connected records, models are created already
+    :param lazy - connected records are created on first read
+    :param source_lang - language of source values, None - detected
+    :param source_lang_field - model field with language of instance
+    """
+
+    def __init__(self, model: Type[Model], field_names: Tuple[str, ...], langs: Tuple[str, ...], storage,
+                 lazy: bool = False, source_lang: Optional[str] = None, source_lang_field: Optional[str] = None):
+        self.model = model
+        self.field_names = field_names
+        self.langs = langs
+        self.storage = storage
+        self.lazy = lazy
+        self.source_lang = source_lang
+        self.source_lang_field = source_lang_field
+        self.pk_field = model._meta.pk
+        self.fields: List[Field] = [
+            field for field in model._meta.fields
+            if field.primary_key is not True and (not field_names or field.name in field_names)
+        ]
+        self.connected_models: Dict[str, Type[Model]] = {lang: storage.connected_model(lang) for lang in langs}
+
+
+class TranslationRegistry:
+    """Translatable models {model: TranslationOptions}"""
+
+    def __init__(self):
+        self._options = {}
+
+    def register(self, options: TranslationOptions):
+        self._options[options.model] = options
+
+    def _find(self, model) -> Optional[TranslationOptions]:
+        options = self._options.get(model)
+        if options is None:
+            # proxy models share metadata of concrete model
+            options = self._options.get(getattr(getattr(model, '_meta', None), 'concrete_model', None))
+        return options
+
+    def get(self, model: Type[Model]) -> TranslationOptions:
+        options = self._find(model)
+        if options is None:
+            raise ValueError(f'{model.__name__} is not registered as translatable')
+        return options
+
+    def __contains__(self, model) -> bool:
+        return self._find(model) is not None
+
+    def __iter__(self) -> Iterator[Type[Model]]:
+        return iter(list(self._options))
+
+    def __len__(self) -> int:
+        return len(self._options)
+
+
+registry = TranslationRegistry()
@@ -1,42 +1,96 @@
+import time
 from collections import OrderedDict
 from rest_framework.serializers import ModelSerializer
-from .logic import global_langs
+from .logic import get_translation_fields, global_langs
+from .storage import LANG_FIELD, SOURCE_HASHES_FIELD
+from .signals import serializer_built
 
+# generated connected model serializers {(base model, lang, fields, exclude connect): serializer class}
+_serializer_classes_cache = {}
 
-def translated_model_serializers_fabric(base_model, languages, translations_fields,
-                                        translations_connect_exclude,
-                                        is_read_only=True,
-                                        return_serializer_class=False):
-    new_fields = {}
-    base_model_name = base_model.get_base_model_name()
-    for lang in languages:
-        connected_model_class = base_model.get_connected_translated_model_class(lang)
+
+def clear_serializer_cache():
+    _serializer_classes_cache.clear()
+
+
+def get_connected_model_serializer(base_model, lang, translations_fields, translations_connect_exclude):
+    """Returns serializer class of connected model. Class is generated once per arguments combination"""
+    if not isinstance(translations_fields, str):
+        translations_fields = tuple(translations_fields)
+    started = time.perf_counter()
+    key = (base_model, lang, translations_fields, translations_connect_exclude)
+    serializer = _serializer_classes_cache.get(key)
+    cached = serializer is not None
+    if serializer is None:
+        storage = base_model.get_translation_storage()
+        connected_model_class = storage.connected_model(lang)
         connected_model_name = base_model.get_translate_model_name(lang)
         # Fabrica-like stuff to dynamically creating serializing
         new_serializer_meta_dict = {
             'model': connected_model_class
         }
-        if translations_fields == '__all__' and translations_connect_exclude:
-            new_serializer_meta_dict['exclude'] = [f'{base_model_name}_ptr']
+        if translations_fields == '__all__':
+            new_serializer_meta_dict['exclude'] = [SOURCE_HASHES_FIELD]
+            if storage.single_table:
+                new_serializer_meta_dict['exclude'].append(LANG_FIELD)
+            if translations_connect_exclude:
+                new_serializer_meta_dict['exclude'].append(storage.ptr_name)
         else:
             new_serializer_meta_dict['fields'] = translations_fields
 
-        new_serializer = type(
+        def get_attribute(self, instance):
+            """Nested in base model serializer - connected record of lang, whatever storage is"""
+            return instance.get_connected_translated_model_instance(lang)
+
+        serializer = type(
             f'{connected_model_name}_serializer',
             (ModelSerializer,),
-            {'Meta': type('Meta', (object,), new_serializer_meta_dict)}
+            {'Meta': type('Meta', (object,), new_serializer_meta_dict), 'get_attribute': get_attribute}
+        )
+        _serializer_classes_cache[key] = serializer
+    serializer_built.send(sender=base_model, lang=lang, cached=cached, duration=time.perf_counter() - started)
+    return serializer
+
+
+def translated_model_serializers_fabric(base_model, languages, translations_fields,
+                                        translations_connect_exclude,
+                                        is_read_only=True,
+                                        return_serializer_class=False):
+    new_fields = {}
+    for lang in languages:
+        new_serializer = get_connected_model_serializer(
+            base_model, lang, translations_fields, translations_connect_exclude
         )
         if return_serializer_class:
             return new_serializer
-        new_fields[connected_model_name] = new_serializer(read_only=is_read_only)
+        new_fields[base_model.get_translate_model_name(lang)] = new_serializer(read_only=is_read_only)
     return new_fields
 
 
 class TranslationModelSerializer(ModelSerializer):
+    @classmethod
+    def get_translations(cls):
+        """Serializing languages"""
+        return getattr(cls.Meta, 'translations', global_langs)
+
+    @classmethod
+    def get_translation_relations(cls):
+        """Names of connected models relations needed by serializer"""
+        base_model = cls.Meta.model
+        return [base_model.get_translate_model_name(lang) for lang in cls.get_translations()]
+
+    @classmethod
+    def setup_eager_loading(cls, queryset):
+        """Load connected records of serialized languages, instead of query per object per language"""
+        return cls.Meta.model.get_translation_storage().eager(queryset, cls.get_translations())
+
     def get_fields(self):
         base_serializer_fields = super().get_fields()
+        if self.context.get('translation_lang'):
+            # single language mode - translated values replace base ones in to_representation
+            return base_serializer_fields
         # get serializing languages
-        translations = getattr(self.Meta, 'translations', global_langs)
+        translations = self.get_translations()
         # get serializing fields for translated models
         translations_fields = getattr(self.Meta, 'translations_fields', '__all__')
         translations_connect_exclude = getattr(self.Meta, 'translations_connect_exclude', True)
@@ -51,3 +105,18 @@ class TranslationModelSerializer(ModelSerializer):
         base_serializer_fields = dict(base_serializer_fields)
         base_serializer_fields.update(new_fields)
         return OrderedDict(base_serializer_fields)
+
+    def to_representation(self, instance):
+        representation = super().to_representation(instance)
+        lang = self.context.get('translation_lang')
+        if lang:
+            base_model = self.Meta.model
+            connected = instance.get_connected_translated_model_instance(lang)
+            # not translated yet - base values stay
+            if connected is not None:
+                for field in get_translation_fields(base_model):
+                    if field.name in representation:
+                        representation[field.name] = self.fields[field.name].to_representation(
+                            field.value_from_object(connected)
+                        )
+        return representation
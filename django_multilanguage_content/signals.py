@@ -0,0 +1,32 @@
+"""
+Instrumentation signals of translation pipeline. Durations are in seconds
+"""
+from django.dispatch import Signal
+
+# base model instance values collected for translation
+# sender - base model, kwargs: instance, fields, duration
+content_prepared = Signal()
+
+# one call to translation backend
+# sender - backend class, kwargs: backend (name), lang, items, characters, duration, error (None on success)
+backend_called = Signal()
+
+# translation served by backend after another backend failed
+# sender - backend class, kwargs: backend, lang, failed_backends
+backend_fallback = Signal()
+
+# translation memory lookup
+# sender - TranslationMemory, kwargs: lang, backend, lru_hits, store_hits, misses
+memory_looked_up = Signal()
+
+# connected records written
+# sender - base model, kwargs: lang, count, duration
+connected_saved = Signal()
+
+# connected model serializer class requested
+# sender - base model, kwargs: lang, cached, duration
+serializer_built = Signal()
+
+# caller of rate limited backend has to wait for its slot
+# sender - RateLimiter, kwargs: backend, chars, wait
+rate_limit_waited = Signal()
@@ -0,0 +1,165 @@
+"""
+Where connected records of translatable model live.
+ModelPerLanguageStorage - concrete model (table) per language, one-to-one to base model (default)
+SingleTableStorage - one model for all languages, row per (base pk, lang), field per translated field
+"""
+from typing import Dict, Iterable, Tuple, Type
+from django.db.models import (CASCADE, CharField, Exists, FilteredRelation, ForeignKey, JSONField, Model,
+                              OneToOneField, OuterRef, Prefetch, Q, QuerySet)
+
+# connected model field {base field name: hash of translated source value}
+SOURCE_HASHES_FIELD = 'translation_source_hashes'
+LANG_FIELD = 'lang'
+
+
+def copied_fields(model: Type[Model], field_names: Tuple[str, ...]) -> Dict:
+    """Fresh copies of base model fields to be translated, all non pk fields if field_names is empty"""
+    model_fields = list(model._meta.fields)
+    if not all(name in [field.name for field in model_fields] for name in field_names):
+        raise ValueError(f'{model._meta.model_name} has incompatible field name to translation')
+    return {
+        field.name: field.clone() for field in model_fields
+        if field.primary_key is not True and (not field_names or field.name in field_names)
+    }
+
+
+class ModelPerLanguageStorage:
+    """Connected model <model>_<lang> per language, reached by reverse one-to-one relation <model>_<lang>"""
+    single_table = False
+
+    def __init__(self, model: Type[Model], langs: Tuple[str, ...], field_names: Tuple[str, ...]):
+        self.model = model
+        self.langs = langs
+        self.field_names = field_names
+        self.ptr_name = f'{model._meta.model_name}_ptr'
+        self.connected_models = {}  # {lang: connected model}
+
+    def relation_name(self, lang: str) -> str:
+        return f'{self.model._meta.model_name}_{lang}'
+
+    def create_models(self):
+        for lang in self.langs:
+            attrs = {
+                '__module__': self.model.__module__,
+                **copied_fields(self.model, self.field_names),
+                self.ptr_name: OneToOneField(self.model, on_delete=CASCADE),
+                SOURCE_HASHES_FIELD: JSONField(default=dict, editable=False),
+            }
+            # creating happens here. Magic type() :)
+            self.connected_models[lang] = type(self.relation_name(lang), (Model,), attrs)
+
+    def connected_model(self, lang: str) -> Type[Model]:
+        return self.connected_models[lang]
+
+    def connected_queryset(self, lang: str) -> QuerySet:
+        """Connected records of lang"""
+        return self.connected_model(lang)._default_manager.all()
+
+    def new_record(self, instance: Model, lang: str, data: dict) -> Model:
+        """Unsaved connected record of instance"""
+        return self.connected_model(lang)(**{**data, self.ptr_name: instance})
+
+    def get(self, instance: Model, lang: str):
+        """Connected record of instance or None. Joined record is used, otherwise it is queried"""
+        return getattr(instance, self.relation_name(lang), None)
+
+    def fetch(self, instance: Model, lang: str):
+        """Connected record of instance or None, always queried"""
+        return self.connected_queryset(lang).filter(**{self.ptr_name: instance.pk}).first()
+
+    def get_many(self, instance: Model, langs: Iterable[str]) -> Dict[str, Model]:
+        """{lang: connected record} of instance, in one query"""
+        langs = list(langs)
+        stored = self.eager(self.model._default_manager.filter(pk=instance.pk), langs).get()
+        records = {lang: self.get(stored, lang) for lang in langs}
+        return {lang: record for lang, record in records.items() if record is not None}
+
+    def eager(self, queryset: QuerySet, langs: Iterable[str]) -> QuerySet:
+        """Load connected records of langs along with queryset"""
+        return queryset.select_related(*(self.relation_name(lang) for lang in langs))
+
+    def missing(self, lang: str) -> Q:
+        """Filter of base rows without connected record in lang (anti-join)"""
+        return Q(**{f'{self.relation_name(lang)}__isnull': True})
+
+    def lookup_prefix(self, queryset: QuerySet, lang: str) -> Tuple[QuerySet, str]:
+        """:return queryset, prefix of connected fields lookups in it, like F(f'{prefix}__name')"""
+        return queryset, self.relation_name(lang)
+
+
+class SingleTableStorage(ModelPerLanguageStorage):
+    """
+    Connected model <model>_translation for all languages, rows are unique by (<model>_ptr, lang).
+    Adding language needs no schema change. Reached by reverse relation <model>_translations
+    """
+    single_table = True
+
+    def __init__(self, model, langs, field_names):
+        super().__init__(model, langs, field_names)
+        self.related_name = f'{model._meta.model_name}_translations'
+
+    def create_models(self):
+        attrs = {
+            '__module__': self.model.__module__,
+            **copied_fields(self.model, self.field_names),
+            self.ptr_name: ForeignKey(self.model, on_delete=CASCADE, related_name=self.related_name),
+            LANG_FIELD: CharField(max_length=16),
+            SOURCE_HASHES_FIELD: JSONField(default=dict, editable=False),
+            # unique index on (base pk, lang) serves every lookup
+            'Meta': type('Meta', (), {'unique_together': ((self.ptr_name, LANG_FIELD),)}),
+        }
+        self.translation_model = type(f'{self.model._meta.model_name}_translation', (Model,), attrs)
+        self.connected_models = dict.fromkeys(self.langs, self.translation_model)
+
+    def connected_queryset(self, lang):
+        return self.translation_model._default_manager.filter(**{LANG_FIELD: lang})
+
+    def new_record(self, instance, lang, data):
+        return self.translation_model(**{**data, self.ptr_name: instance, LANG_FIELD: lang})
+
+    def prefetched(self, instance: Model):
+        """Prefetched connected records of instance or None"""
+        return getattr(instance, '_prefetched_objects_cache', {}).get(self.related_name)
+
+    def get(self, instance, lang):
+        prefetched = self.prefetched(instance)
+        if prefetched is not None:
+            return next((record for record in prefetched if getattr(record, LANG_FIELD) == lang), None)
+        return self.fetch(instance, lang)
+
+    def get_many(self, instance, langs):
+        records = self.translation_model._default_manager.filter(
+            **{self.ptr_name: instance, f'{LANG_FIELD}__in': list(langs)}
+        )
+        return {getattr(record, LANG_FIELD): record for record in records}
+
+    def eager(self, queryset, langs):
+        """Every language of whole page in one additional query"""
+        return queryset.prefetch_related(Prefetch(
+            self.related_name,
+            queryset=self.translation_model._default_manager.filter(**{f'{LANG_FIELD}__in': list(langs)})
+        ))
+
+    def missing(self, lang):
+        return ~Exists(self.connected_queryset(lang).filter(**{self.ptr_name: OuterRef('pk')}))
+
+    def lookup_prefix(self, queryset, lang):
+        alias = self.relation_name(lang)
+        if alias not in queryset.query._filtered_relations:
+            queryset = queryset.annotate(**{alias: FilteredRelation(
+                self.related_name, condition=Q(**{f'{self.related_name}__{LANG_FIELD}': lang})
+            )})
+        return queryset, alias
+
+
+STORAGES = {
+    'models': ModelPerLanguageStorage,
+    'table': SingleTableStorage,
+}
+
+
+def make_storage(kind: str, model: Type[Model], langs: Tuple[str, ...], field_names: Tuple[str, ...]):
+    if kind not in STORAGES:
+        raise ValueError(f'Unknown translation storage {kind}, use one of {list(STORAGES)}')
+    return STORAGES[kind](model, langs, field_names)
+
@@ -1,44 +1,351 @@
-from googletrans import Translator
-from deep_translator import GoogleTranslator
+import asyncio
+import random
+import statistics
+import threading
+import time
+import weakref
+from collections import deque
+from typing import Dict, List, Optional
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.signals import setting_changed
+from django.dispatch import receiver
+from .backends import DEFAULT_BACKENDS, BaseBackend, load_backends
 from .exceptions import ResponseError
+from .memory import translation_memory
+from .prefilter import is_translatable
+from .signals import backend_called, backend_fallback
+
+circuit_failures = getattr(settings, 'TRANSLATION_CIRCUIT_FAILURES', 5)  # consecutive failures to open circuit
+circuit_reset = getattr(settings, 'TRANSLATION_CIRCUIT_RESET', 30)  # seconds before trial call to open backend
+backoff_base = getattr(settings, 'TRANSLATION_BACKOFF_BASE', 0.5)  # seconds
+backoff_max = getattr(settings, 'TRANSLATION_BACKOFF_MAX', 8)  # seconds
+async_concurrency = getattr(settings, 'TRANSLATION_ASYNC_CONCURRENCY', 100)  # backend calls in flight per event loop
+latency_min_samples = getattr(settings, 'TRANSLATION_LATENCY_MIN_SAMPLES', 20)  # calls before latency affects rank
+
+
+class BackendHealth:
+    """Thread-safe circuit breaker and rolling latency/error stats of one translation backend"""
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half-open'
+
+    def __init__(self, name: str, priority: int = 0, window: int = 100):
+        self.name = name
+        self.priority = priority
+        self.state = self.CLOSED
+        self.consecutive_failures = 0
+        self.opened_at = 0.0
+        self.calls = 0
+        self.failures = 0
+        self._latencies = deque(maxlen=window)
+        self._outcomes = deque(maxlen=window)  # True - success
+        self._trial_running = False
+        self._lock = threading.Lock()
+
+    def acquire(self) -> bool:
+        """Whether call may go to backend. Open circuit lets one trial call after circuit_reset seconds"""
+        with self._lock:
+            if self.state == self.CLOSED:
+                return True
+            if self.state == self.OPEN and time.monotonic() - self.opened_at >= circuit_reset:
+                self.state = self.HALF_OPEN
+            if self.state == self.HALF_OPEN and not self._trial_running:
+                self._trial_running = True
+                return True
+            return False
+
+    def available(self) -> bool:
+        """Whether acquire() would let call through, trial call of open circuit is not taken"""
+        with self._lock:
+            if self.state == self.OPEN:
+                return time.monotonic() - self.opened_at >= circuit_reset
+            return self.state == self.CLOSED or not self._trial_running
+
+    def record_success(self, latency: float):
+        with self._lock:
+            self.calls += 1
+            self._latencies.append(latency)
+            self._outcomes.append(True)
+            self.consecutive_failures = 0
+            self.state = self.CLOSED
+            self._trial_running = False
+
+    def record_failure(self, latency: float):
+        with self._lock:
+            self.calls += 1
+            self.failures += 1
+            self._latencies.append(latency)
+            self._outcomes.append(False)
+            self.consecutive_failures += 1
+            if self.state == self.HALF_OPEN or self.consecutive_failures >= circuit_failures:
+                self.state = self.OPEN
+                self.opened_at = time.monotonic()
+            self._trial_running = False
+
+    def _error_rate(self) -> float:
+        return self._outcomes.count(False) / len(self._outcomes) if self._outcomes else 0.0
+
+    def _median_latency(self) -> float:
+        return statistics.median(self._latencies) if self._latencies else 0.0
+
+    def rank(self) -> tuple:
+        """
+        Healthier backends have lower rank: closed circuit, lower error rate, then configured priority.
+        Median latency only breaks ties, once latency_min_samples calls are measured
+        """
+        with self._lock:
+            latency = self._median_latency() if len(self._latencies) >= latency_min_samples else 0.0
+            return self.state != self.CLOSED, round(self._error_rate(), 2), self.priority, latency
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {
+                'state': self.state,
+                'calls': self.calls,
+                'failures': self.failures,
+                'error_rate': self._error_rate(),
+                'median_latency': self._median_latency(),
+            }
 
 
 class BigBoyTranslator:
-    def __init__(self):
-        self.state = 0
-        self.tries = 1
+    """
+    Translates through backends of TRANSLATION_BACKENDS, in priority order adjusted by health.
+    Backends are loaded on first use
+    """
+
+    def __init__(self, backend_configs=None):
         self.max_tries = 5
-        self.translators = [self.translate_1, self.translate_2]
-        self.now_translator = self.translators[self.state]
-
-    def translate_1(self, data, lang):
-        translated = Translator(service_urls=['translate.googleapis.com']).translate(text=list(data), dest=lang)
-        response = []
-        for d in translated:
-            response.append(d.text)
-        return response
-
-    def translate_2(self, data, lang):
-        response = GoogleTranslator(source='auto', target=lang).translate_batch(batch=data)
-        return response
-
-    def __call__(self, list_values, lang, **kwargs):
-        self.tries = 1
-        while self.tries:
-            self.now_translator = self.translators[self.state]
+        self.backend_configs = backend_configs
+        self._backends = None
+        self.health = {}
+        self._load_lock = threading.Lock()
+        self._semaphores = weakref.WeakKeyDictionary()  # {event loop: semaphore}
+
+    @property
+    def backends(self) -> List[BaseBackend]:
+        if self._backends is None:
+            with self._load_lock:
+                if self._backends is None:
+                    configs = self.backend_configs
+                    if configs is None:
+                        configs = getattr(settings, 'TRANSLATION_BACKENDS', DEFAULT_BACKENDS)
+                    backends = load_backends(configs)
+                    self.health = {
+                        backend.name: BackendHealth(backend.name, priority) for priority, backend in enumerate(backends)
+                    }
+                    self._backends = backends
+        return self._backends
+
+    def reload_backends(self):
+        """Forget loaded backends and their health, next call loads them from settings again"""
+        with self._load_lock:
+            self._backends = None
+            self.health = {}
+
+    @property
+    def name(self) -> str:
+        """Name of the primary backend, translation memory namespace of its and imported translations"""
+        return self.backends[0].name
+
+    def _remembered(self, texts, lang, source) -> Dict[str, str]:
+        """
+        Translations in memory of the primary backend, then of backends in health order up to the first
+        available one - translations of fallback backends are used only while they would answer anyway
+        """
+        known, names = {}, [self.name]
+        for backend in self.ordered_backends():
+            names.append(backend.name)
+            if self.health[backend.name].available():
+                break
+        for name in dict.fromkeys(names):
+            remaining = [text for text in texts if text not in known]
+            if not remaining:
+                break
+            known.update(translation_memory.get_many(remaining, lang, name, source))
+        return known
+
+    def __call__(self, list_values, lang, source=None, **kwargs):
+        """
+        Translate values not found in translation memory. Untranslatable values (see prefilter)
+        and values already in target language are returned as is
+        :param source - language of values, None - detected by provider
+        """
+        list_values = list(list_values)
+        texts = self._texts(list_values, lang, source)
+        if not texts:
+            return list_values
+        known = self._remembered(texts, lang, source)
+        missing_texts = [text for text in texts if text not in known]
+        if missing_texts:
+            translated, backend_name = self.translate(missing_texts, lang, source)
+            fresh = dict(zip(missing_texts, translated))
+            # kept under backend which answered, fallback output doesn't pass for primary one
+            translation_memory.set_many(fresh, lang, backend_name, source)
+            known.update(fresh)
+        return [known.get(value, value) if is_translatable(value) else value for value in list_values]
+
+    async def atranslate(self, list_values, lang, source=None):
+        """Async __call__. Backends are awaited, translation memory store is queried in thread"""
+        list_values = list(list_values)
+        texts = self._texts(list_values, lang, source)
+        if not texts:
+            return list_values
+        memory_call = sync_to_async if translation_memory.store is not None else _run_sync
+        known = await memory_call(self._remembered)(texts, lang, source)
+        missing_texts = [text for text in texts if text not in known]
+        if missing_texts:
+            translated, backend_name = await self.atranslate_values(missing_texts, lang, source)
+            fresh = dict(zip(missing_texts, translated))
+            await memory_call(translation_memory.set_many)(fresh, lang, backend_name, source)
+            known.update(fresh)
+        return [known.get(value, value) if is_translatable(value) else value for value in list_values]
+
+    @staticmethod
+    def _texts(list_values, lang, source) -> List[str]:
+        """Distinct values which need translation"""
+        if source is not None and source == lang:
+            return []
+        return list(dict.fromkeys(value for value in list_values if is_translatable(value)))
+
+    def detect(self, text: str) -> Optional[str]:
+        """Language of text by the healthiest backend which detects languages, None - unknown"""
+        for backend in self.ordered_backends():
+            if not backend.detects_language or not self.health[backend.name].acquire():
+                continue
+            started = time.monotonic()
             try:
-                self.tries += 1
-                response = self.now_translator(list_values, lang)
+                lang = backend.detect(text)
             except Exception:
-                self.state += 1
-                if self.state > len(self.translators)-1:
-                    self.state = 0
-            else:
-                self.tries = 0
-                return response
-            finally:
-                if self.tries > self.max_tries:
-                    raise ResponseError('Any of translation services does not respond')
+                self.health[backend.name].record_failure(time.monotonic() - started)
+                continue
+            self.health[backend.name].record_success(time.monotonic() - started)
+            if lang:
+                return lang.lower()
+        return None
+
+    def _semaphore(self) -> asyncio.Semaphore:
+        """Semaphore bounding backend calls of current event loop"""
+        loop = asyncio.get_event_loop()
+        semaphore = self._semaphores.get(loop)
+        if semaphore is None:
+            semaphore = self._semaphores[loop] = asyncio.Semaphore(async_concurrency)
+        return semaphore
+
+    def ordered_backends(self) -> List[BaseBackend]:
+        """Backends sorted from the healthiest one"""
+        return sorted(self.backends, key=lambda backend: self.health[backend.name].rank())
+
+    def health_stats(self) -> Dict[str, Dict]:
+        return {name: health.stats() for name, health in self.health.items()}
+
+    @staticmethod
+    def _send_called(backend, list_values, lang, duration, error):
+        backend_called.send(
+            sender=type(backend), backend=backend.name, lang=lang, items=len(list_values),
+            characters=sum(len(str(value)) for value in list_values), duration=duration, error=error
+        )
+
+    @staticmethod
+    def _backoff(round_number: int) -> float:
+        """Exponential backoff with full jitter"""
+        return random.uniform(0, min(backoff_max, backoff_base * 2 ** round_number))
+
+    def translate(self, list_values, lang, source=None):
+        """
+        Call backends from the healthiest one. Backend with open circuit is skipped,
+        rounds over backends are separated by backoff. max_tries calls at most
+        :return tuple[translated values, name of backend which translated them]
+        """
+        tries, round_number, last_error, failed_backends = 0, 0, None, []
+        while tries < self.max_tries:
+            if round_number:
+                time.sleep(self._backoff(round_number))
+            called = False
+            for backend in self.ordered_backends():
+                if tries >= self.max_tries:
+                    break
+                health = self.health[backend.name]
+                if not health.acquire():
+                    continue
+                called = True
+                tries += 1
+                started = time.monotonic()
+                try:
+                    response = backend.translate(list_values, lang, source)
+                except Exception as e:
+                    duration = time.monotonic() - started
+                    health.record_failure(duration)
+                    self._send_called(backend, list_values, lang, duration, e)
+                    last_error = e
+                    failed_backends.append(backend.name)
+                else:
+                    duration = time.monotonic() - started
+                    health.record_success(duration)
+                    self._send_called(backend, list_values, lang, duration, None)
+                    if failed_backends:
+                        backend_fallback.send(sender=type(backend), backend=backend.name, lang=lang,
+                                              failed_backends=failed_backends)
+                    return response, backend.name
+            if not called:
+                # every circuit is open - fail fast instead of waiting
+                break
+            round_number += 1
+        raise ResponseError('Any of translation services does not respond') from last_error
+
+    async def atranslate_values(self, list_values, lang, source=None):
+        """Async translate(), same health, fallback and backoff rules. :return tuple[values, backend name]"""
+        tries, round_number, last_error, failed_backends = 0, 0, None, []
+        while tries < self.max_tries:
+            if round_number:
+                await asyncio.sleep(self._backoff(round_number))
+            called = False
+            for backend in self.ordered_backends():
+                if tries >= self.max_tries:
+                    break
+                health = self.health[backend.name]
+                if not health.acquire():
+                    continue
+                called = True
+                tries += 1
+                started = time.monotonic()
+                try:
+                    async with self._semaphore():
+                        response = await backend.atranslate(list_values, lang, source)
+                except Exception as e:
+                    duration = time.monotonic() - started
+                    health.record_failure(duration)
+                    self._send_called(backend, list_values, lang, duration, e)
+                    last_error = e
+                    failed_backends.append(backend.name)
+                else:
+                    duration = time.monotonic() - started
+                    health.record_success(duration)
+                    self._send_called(backend, list_values, lang, duration, None)
+                    if failed_backends:
+                        backend_fallback.send(sender=type(backend), backend=backend.name, lang=lang,
+                                              failed_backends=failed_backends)
+                    return response, backend.name
+            if not called:
+                break
+            round_number += 1
+        raise ResponseError('Any of translation services does not respond') from last_error
+
+
+def _run_sync(func):
+    """Call in-process only functions directly, without thread hop"""
+    async def inner(*args, **kwargs):
+        return func(*args, **kwargs)
+    return inner
 
 
 main_translator = BigBoyTranslator()
+
+
+@receiver(setting_changed)
+def reload_translation_backends(setting, **kwargs):
+    if setting == 'TRANSLATION_BACKENDS':
+        main_translator.reload_backends()
+        # remembered translations may come from backend of the same name but other settings
+        translation_memory.clear()
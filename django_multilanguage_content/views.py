@@ -1,11 +1,17 @@
-from operator import attrgetter
+from asgiref.sync import sync_to_async
 from rest_framework.viewsets import ModelViewSet
 from rest_framework.decorators import action
 from rest_framework.response import Response
 from rest_framework import status
-from .logic import global_langs
-from .serializers import translated_model_serializers_fabric
-from django.core.exceptions import ObjectDoesNotExist
+from rest_framework.exceptions import ValidationError
+from .caching import cache_enabled, translation_cache
+from .exceptions import PartialTranslationError
+from .logic import atranslate_instance, global_langs, translate_instance
+from .serializers import TranslationModelSerializer, get_connected_model_serializer
+from django.core.exceptions import ImproperlyConfigured, ObjectDoesNotExist
+from django.http import HttpResponseNotAllowed
+from django.utils.cache import patch_vary_headers
+from django.utils.translation.trans_real import parse_accept_lang_header
 
 
 def lang_param_in_global_lang(lang):
@@ -13,6 +19,101 @@ def lang_param_in_global_lang(lang):
 
 
 class TranslationViewSet(ModelViewSet):
+    # list and retrieve return only one language, chosen by ?lang= or Accept-Language header,
+    # translated values replace base values
+    language_negotiation = False
+    negotiated_actions = ('list', 'retrieve')
+    translation_lang = None
+    # with TRANSLATION_CACHE list and retrieve responses are cached by url and language.
+    # Enable only if queryset and serializer don't depend on user
+    cache_translations = False
+    # False - get_queryset() doesn't load translations, object is only checked before cached data is served
+    load_translations = True
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        if self.language_negotiation and self.action in self.negotiated_actions:
+            self.translation_lang = self.negotiate_translation_lang(request)
+
+    def negotiate_translation_lang(self, request):
+        """:return language from ?lang= or Accept-Language header, None - all serializer languages"""
+        langs = self.queryset.model.get_translation_langs()
+        lang = request.query_params.get('lang')
+        if lang:
+            if lang.lower() not in langs:
+                raise ValidationError({'lang': f'Language {lang} is not supported'})
+            return lang.lower()
+        for accepted, _ in parse_accept_lang_header(request.headers.get('Accept-Language', '')):
+            for candidate in (accepted.lower(), accepted.lower().split('-')[0]):
+                if candidate in langs:
+                    return candidate
+        return None
+
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        context['translation_lang'] = self.translation_lang
+        return context
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        if not self.load_translations:
+            return queryset
+        serializer_class = self.get_serializer_class()
+        if self.action == 'retrieve_update_connected':
+            # connected record of one language only
+            queryset = queryset.model.get_translation_storage().eager(queryset, [self.kwargs['lang']])
+        elif self.translation_lang:
+            queryset = queryset.model.get_translation_storage().eager(queryset, [self.translation_lang])
+        elif issubclass(serializer_class, TranslationModelSerializer):
+            queryset = serializer_class.setup_eager_loading(queryset)
+        return queryset
+
+    def check_cached_object(self):
+        """get_object() without translations: scoping, filters and object permissions hold for cached data"""
+        self.load_translations = False
+        try:
+            self.get_object()
+        finally:
+            self.load_translations = True
+
+    def _cached(self, key, view, check_object=False):
+        data = translation_cache.get(key)
+        if data is not None and check_object:
+            self.check_cached_object()
+        if data is None:
+            response = view()
+            if response.status_code != status.HTTP_200_OK:
+                return response
+            data = response.data
+            translation_cache.set(key, data)
+        return Response(data)
+
+    def list(self, request, *args, **kwargs):
+        if not (self.cache_translations and cache_enabled()):
+            return super().list(request, *args, **kwargs)
+        key = translation_cache.list_key(
+            self.queryset.model, f'{type(self).__name__}:{self.translation_lang}:{request.get_full_path()}'
+        )
+        return self._cached(key, lambda: super(TranslationViewSet, self).list(request, *args, **kwargs))
+
+    def retrieve(self, request, *args, **kwargs):
+        if not (self.cache_translations and cache_enabled()):
+            return super().retrieve(request, *args, **kwargs)
+        key = translation_cache.object_key(
+            self.queryset.model, kwargs[self.lookup_url_kwarg or self.lookup_field],
+            f'{type(self).__name__}:{self.translation_lang}:{request.get_full_path()}'
+        )
+        return self._cached(key, lambda: super(TranslationViewSet, self).retrieve(request, *args, **kwargs),
+                            check_object=True)
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        response = super().finalize_response(request, response, *args, **kwargs)
+        if self.language_negotiation and self.action in self.negotiated_actions:
+            patch_vary_headers(response, ('Accept-Language',))
+            if self.translation_lang:
+                response['Content-Language'] = self.translation_lang
+        return response
+
     @action(
         methods=['get', 'post'],
         detail=True,
@@ -21,17 +122,26 @@ class TranslationViewSet(ModelViewSet):
     def retrieve_update_connected(self, request, pk=None, lang=None):
         if not lang_param_in_global_lang(lang):
             return Response(status=status.HTTP_400_BAD_REQUEST)
+        cache_key = None
+        if request.method == 'GET' and self.cache_translations and cache_enabled():
+            cache_key = translation_cache.object_key(self.queryset.model, pk, f'{type(self).__name__}:connected:{lang}')
+            data = translation_cache.get(cache_key)
+            if data is not None:
+                self.check_cached_object()
+                return Response(data)
+        storage = self.queryset.model.get_translation_storage()
         try:
-            retrieved_model = self.get_queryset().get(pk=pk)
-            serializer = translated_model_serializers_fabric(
-                self.queryset.model, [lang], '__all__', True, False,
-                return_serializer_class=True
-            )
-            connected_model = attrgetter(f'{retrieved_model.get_translate_model_name(lang)}')(retrieved_model)
+            # scoped by get_queryset() and filters, object permissions are checked
+            retrieved_model = self.get_object()
+            serializer = get_connected_model_serializer(self.queryset.model, lang, '__all__', True)
+            connected_model = retrieved_model.get_connected_translated_model_instance(lang)
+            if connected_model is None:
+                raise storage.connected_model(lang).DoesNotExist
             if request.method == 'GET':
-                return Response(
-                    serializer(connected_model).data
-                )
+                data = serializer(connected_model).data
+                if cache_key is not None:
+                    translation_cache.set(cache_key, data)
+                return Response(data)
             if request.method == 'POST':
                 validating = serializer(connected_model, data=request.data)
                 if validating.is_valid():
@@ -41,3 +151,95 @@ class TranslationViewSet(ModelViewSet):
                     return Response(validating.errors)
         except ObjectDoesNotExist:
             return Response(status=status.HTTP_404_NOT_FOUND)
+
+    @action(methods=['post'], detail=True)
+    def translate(self, request, pk=None):
+        """Translate instance again into ?lang= languages, all model languages by default"""
+        model = self.queryset.model
+        langs = translate_langs_param(model, request.query_params.getlist('lang'))
+        if langs is None:
+            return Response(status=status.HTTP_400_BAD_REQUEST)
+        instance = self.get_object()
+        try:
+            translate_instance(instance, langs)
+        except PartialTranslationError as e:
+            return Response(translation_errors(e), status=status.HTTP_502_BAD_GATEWAY)
+        return Response(serialize_connected(instance, langs))
+
+
+def translate_langs_param(model, langs):
+    """:return requested languages, all model languages if none, None if any is not followed"""
+    followed = model.get_translation_langs()
+    langs = [lang.lower() for lang in langs] or list(followed)
+    return langs if all(lang in followed for lang in langs) else None
+
+
+def translation_errors(error: PartialTranslationError) -> dict:
+    return {'errors': {lang: str(lang_error) for lang, lang_error in error.errors.items()}}
+
+
+def serialize_connected(instance, langs) -> dict:
+    """{lang: connected record data}"""
+    model = type(instance)
+    records = model.get_translation_storage().get_many(instance, langs)
+    return {
+        lang: get_connected_model_serializer(model, lang, '__all__', True)(records[lang]).data
+        for lang in langs if lang in records
+    }
+
+
+def _viewset_instance(viewset, request, action, **kwargs):
+    """
+    Viewset handling action of request like viewset.as_view() does: authentication, permissions,
+    throttling and content negotiation are done, instance is found by get_object().
+    :return (viewset, instance, None) or (viewset, None, error response)
+    """
+    if not (isinstance(viewset, type) and issubclass(viewset, TranslationViewSet)):
+        raise ImproperlyConfigured('Async translation views need TranslationViewSet subclass as viewset')
+    view = viewset(action=action, detail=True, action_map={request.method.lower(): action},
+                   args=(), kwargs=kwargs)
+    view.request = view.initialize_request(request, **kwargs)
+    view.headers = view.default_response_headers
+    try:
+        view.initial(view.request, **kwargs)
+        return view, view.get_object(), None
+    except Exception as exc:
+        return view, None, view.finalize_response(view.request, view.handle_exception(exc))
+
+
+async def async_retrieve_update_connected(request, viewset, pk, lang):
+    """
+    Async counterpart of TranslationViewSet.retrieve_update_connected for ASGI deployments,
+    viewset action runs in thread with its authentication, permissions and queryset
+        path('simple/<pk>/translated/<lang>/', async_retrieve_update_connected, {'viewset': SimpleSet})
+    """
+    view = viewset.as_view({'get': 'retrieve_update_connected', 'post': 'retrieve_update_connected'})
+    return await sync_to_async(view)(request, pk=pk, lang=lang)
+
+
+async def async_translate(request, viewset, pk):
+    """
+    Async counterpart of TranslationViewSet.translate. Translator calls are awaited on event loop,
+    without holding a thread per language
+        path('simple/<pk>/translate/', async_translate, {'viewset': SimpleSet})
+    """
+    if request.method != 'POST':
+        return HttpResponseNotAllowed(['POST'])
+    view, instance, response = await sync_to_async(_viewset_instance)(viewset, request, 'translate', pk=pk)
+    if response is not None:
+        return response
+    langs = translate_langs_param(type(instance), view.request.query_params.getlist('lang'))
+    if langs is None:
+        response = Response(status=status.HTTP_400_BAD_REQUEST)
+    else:
+        try:
+            await atranslate_instance(instance, langs)
+            response = Response(await sync_to_async(serialize_connected)(instance, langs))
+        except PartialTranslationError as e:
+            response = Response(translation_errors(e), status=status.HTTP_502_BAD_GATEWAY)
+    return view.finalize_response(view.request, response)
+
+
+# like DRF views, CSRF is checked by SessionAuthentication only, API clients are not rejected
+async_retrieve_update_connected.csrf_exempt = True
+async_translate.csrf_exempt = True
@@ -0,0 +1,34 @@
+"""
+Admin change view rendering with TranslateAdminInlines of example SimpleAdmin
+
+    cd examples && BENCH_LANGS=5 python -m benchmarks.bench_admin
+"""
+from .common import bench_langs, create_simple_rows, measure, report_all, setup_database
+
+from django.contrib.auth import get_user_model  # noqa: E402
+from django.test import Client  # noqa: E402
+from django.urls import reverse  # noqa: E402
+
+
+def run():
+    setup_database()
+    row = create_simple_rows(1, bench_langs())[0]
+    user_model = get_user_model()
+    user = user_model.objects.filter(username='bench').first() or user_model.objects.create_superuser(
+        'bench', 'bench@example.com', 'bench'
+    )
+    client = Client()
+    client.force_login(user)
+    url = reverse('admin:djangotranslate_simple_change', args=[row.pk])
+
+    def change_view():
+        response = client.get(url)
+        assert response.status_code == 200, response.status_code
+
+    return {
+        'admin: change view': measure(change_view, repeat=10),
+    }
+
+
+if __name__ == '__main__':
+    report_all(run())
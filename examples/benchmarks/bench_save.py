@@ -0,0 +1,44 @@
+"""
+post_save translation latency: creating one translatable instance, sequentially and concurrently,
+and bulk creation throughput with bulk_translate
+
+    cd examples && BENCH_LANGS=5 BENCH_LATENCY=5 python -m benchmarks.bench_save
+"""
+import itertools
+from unittest import mock
+
+from .common import bench_langs, measure, report_all, setup_database
+
+from django_multilanguage_content import bulk_translate, logic  # noqa: E402
+from djangotranslate.models import Simple  # noqa: E402
+
+
+def run():
+    setup_database()
+    counter = itertools.count()
+
+    def create():
+        index = next(counter)
+        Simple.objects.create(name=f'name {index}', age=index, status='active')
+
+    def create_concurrent():
+        with mock.patch.object(logic, 'translation_concurrency', len(bench_langs())):
+            create()
+
+    def bulk_create_translate():
+        start = next(counter) * 1000
+        Simple.objects.bulk_create([
+            Simple(name=f'name {start + i}', age=i, status='active') for i in range(100)
+        ])
+        # rows created above - not translated yet
+        bulk_translate(Simple.objects.filter(**{f'{Simple.get_translate_model_name(bench_langs()[0])}__isnull': True}))
+
+    return {
+        'save: create, sequential languages': measure(create, repeat=10, warmup=1),
+        'save: create, concurrent languages': measure(create_concurrent, repeat=10, warmup=1),
+        'save: bulk_create + bulk_translate 100 rows': measure(bulk_create_translate, repeat=5, warmup=1),
+    }
+
+
+if __name__ == '__main__':
+    report_all(run())
@@ -0,0 +1,46 @@
+"""
+TranslationModelSerializer list serialization over all benchmark languages.
+Compares generating connected model serializer classes on every request with cached classes
+
+    cd examples && BENCH_LANGS=5 python -m benchmarks.bench_serializers
+"""
+from .common import bench_langs, create_simple_rows, measure, report_all, setup_database
+
+from django_multilanguage_content.serializers import clear_serializer_cache, get_connected_model_serializer  # noqa
+from djangotranslate.models import Simple  # noqa: E402
+from .urls import AllLanguagesSerializer  # noqa: E402
+
+
+def run():
+    setup_database()
+    create_simple_rows(20, bench_langs())
+    rows = list(AllLanguagesSerializer.setup_eager_loading(Simple.objects.all()))
+
+    def list_page():
+        return AllLanguagesSerializer(rows, many=True).data
+
+    def list_page_uncached():
+        clear_serializer_cache()
+        return list_page()
+
+    def list_page_with_query():
+        return AllLanguagesSerializer(AllLanguagesSerializer.setup_eager_loading(Simple.objects.all()), many=True).data
+
+    def connected_serializer():
+        return get_connected_model_serializer(Simple, 'en', '__all__', True)(rows[0].simple_en).data
+
+    def connected_serializer_uncached():
+        clear_serializer_cache()
+        return connected_serializer()
+
+    return {
+        'serializer: list 20 rows, classes generated per request': measure(list_page_uncached),
+        'serializer: list 20 rows, cached classes': measure(list_page),
+        'serializer: list 20 rows with query': measure(list_page_with_query),
+        'serializer: connected, class generated per request': measure(connected_serializer_uncached),
+        'serializer: connected, cached class': measure(connected_serializer),
+    }
+
+
+if __name__ == '__main__':
+    report_all(run())
@@ -0,0 +1,34 @@
+"""
+TranslationViewSet endpoints: list and retrieve_update_connected
+
+    cd examples && BENCH_LANGS=5 python -m benchmarks.bench_views
+"""
+from .common import bench_langs, create_simple_rows, measure, report_all, setup_database
+
+from django.test import Client  # noqa: E402
+from django.urls import reverse  # noqa: E402
+
+
+def run():
+    setup_database()
+    langs = bench_langs()
+    rows = create_simple_rows(20, langs)
+    client = Client()
+    list_url = reverse('simple-list')
+    connected_url = reverse('simple-retrieve-update-connected', kwargs={'pk': rows[0].pk, 'lang': langs[-1]})
+
+    def get(url, **params):
+        def request():
+            response = client.get(url, params)
+            assert response.status_code == 200, response.status_code
+        return request
+
+    return {
+        'views: list 20 rows': measure(get(list_url)),
+        'views: list 20 rows, one language': measure(get(list_url, lang=langs[-1])),
+        'views: retrieve_update_connected GET': measure(get(connected_url)),
+    }
+
+
+if __name__ == '__main__':
+    report_all(run())
@@ -0,0 +1,76 @@
+import os
+import statistics
+import time
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'benchmarks.settings')
+
+import django  # noqa: E402
+
+django.setup()
+
+from django.conf import settings  # noqa: E402
+from django.core.management import call_command  # noqa: E402
+from django.db import connection  # noqa: E402
+from django.test.utils import CaptureQueriesContext  # noqa: E402
+
+REPEAT = int(os.environ.get('BENCH_REPEAT', 30))
+_database_ready = False
+
+
+def setup_database():
+    """Create tables once per process and remove rows left by previous benchmark"""
+    global _database_ready
+    if not _database_ready:
+        call_command('migrate', run_syncdb=True, verbosity=0)
+        _database_ready = True
+    from djangotranslate.models import Simple
+    Simple.objects.all().delete()
+
+
+def bench_langs():
+    return [lang.lower() for lang in settings.TRANSLATING_LANGS]
+
+
+def create_simple_rows(count, langs):
+    """Base rows and connected rows, created without translator"""
+    from djangotranslate.models import Simple
+    Simple.objects.bulk_create([
+        Simple(name=f'name {i}', age=i, status='active' if i % 2 else 'pending') for i in range(count)
+    ])
+    rows = list(Simple.objects.order_by('pk'))
+    for lang in langs:
+        connected_model = Simple.get_connected_translated_model_class(lang)
+        connected_model.objects.bulk_create([
+            connected_model(name=f'{row.name} {lang}', status=f'{row.status} {lang}', simple_ptr=row) for row in rows
+        ])
+    return rows
+
+
+def measure(func, repeat=REPEAT, warmup=3):
+    """
+    Run func repeat times
+    :return dict - median and best time in ms, queries of the last run
+    """
+    for _ in range(warmup):
+        func()
+    timings = []
+    for _ in range(repeat):
+        with CaptureQueriesContext(connection) as queries:
+            started = time.perf_counter()
+            func()
+            timings.append((time.perf_counter() - started) * 1000)
+    return {
+        'median_ms': round(statistics.median(timings), 3),
+        'best_ms': round(min(timings), 3),
+        'queries': len(queries.captured_queries),
+    }
+
+
+def report(name, result):
+    print(f'{name:<60} median {result["median_ms"]:>9.3f} ms   best {result["best_ms"]:>9.3f} ms'
+          f'   queries {result["queries"]}')
+
+
+def report_all(results):
+    for name, result in results.items():
+        report(name, result)
@@ -0,0 +1,92 @@
+"""
+Benchmark suite. Every language count runs in its own process, results are compared with baselines.json
+
+    cd examples && python -m benchmarks.run [--langs 1 5 20] [--latency 5] [--save-baseline] [--tolerance 0.3]
+
+Query counts must match baseline exactly, median time may grow by tolerance at most.
+Exit code 1 on regression
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+BASELINES_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'baselines.json')
+BENCHMARK_MODULES = ['bench_save', 'bench_serializers', 'bench_views', 'bench_admin']
+
+
+def run_benchmarks():
+    """Child process: run every benchmark module, print results as JSON"""
+    import importlib
+
+    results = {}
+    for module_name in BENCHMARK_MODULES:
+        module = importlib.import_module(f'benchmarks.{module_name}')
+        results.update(module.run())
+    print(json.dumps(results))
+
+
+def run_for_langs(langs_count, latency, repeat):
+    env = dict(os.environ, BENCH_LANGS=str(langs_count), BENCH_LATENCY=str(latency), BENCH_REPEAT=str(repeat))
+    output = subprocess.run(
+        [sys.executable, '-m', 'benchmarks.run', '--child'],
+        env=env, check=True, stdout=subprocess.PIPE, universal_newlines=True
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def compare(name, result, baseline, tolerance):
+    """:return problem description or None"""
+    if baseline is None:
+        return None
+    if result['queries'] != baseline['queries']:
+        return f'queries {baseline["queries"]} -> {result["queries"]}'
+    if result['median_ms'] > baseline['median_ms'] * (1 + tolerance):
+        return f'median {baseline["median_ms"]} ms -> {result["median_ms"]} ms'
+    return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--langs', type=int, nargs='+', default=[1, 5, 20], help='Language counts')
+    parser.add_argument('--latency', type=float, default=5, help='Stand-in translator latency, ms')
+    parser.add_argument('--repeat', type=int, default=30, help='Runs per benchmark')
+    parser.add_argument('--tolerance', type=float, default=0.3, help='Allowed median growth, 0.3 - 30%%')
+    parser.add_argument('--save-baseline', action='store_true', help='Store results as new baselines')
+    parser.add_argument('--child', action='store_true', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        run_benchmarks()
+        return 0
+
+    baselines = {}
+    if os.path.exists(BASELINES_PATH):
+        with open(BASELINES_PATH) as baselines_file:
+            baselines = json.load(baselines_file)
+    results, regressions = {}, []
+    for langs_count in args.langs:
+        key = f'{langs_count} langs'
+        results[key] = run_for_langs(langs_count, args.latency, args.repeat)
+        print(f'\n{key}, translator latency {args.latency} ms')
+        for name, result in results[key].items():
+            problem = compare(name, result, baselines.get(key, {}).get(name), args.tolerance)
+            print(f'{name:<60} median {result["median_ms"]:>9.3f} ms   queries {result["queries"]:>4}'
+                  f'   {"REGRESSION: " + problem if problem else ""}')
+            if problem:
+                regressions.append(f'{key}: {name}: {problem}')
+
+    if args.save_baseline:
+        baselines.update(results)
+        with open(BASELINES_PATH, 'w') as baselines_file:
+            json.dump(baselines, baselines_file, indent=2, sort_keys=True)
+        print(f'\nBaselines saved to {BASELINES_PATH}')
+    elif regressions:
+        print(f'\n{len(regressions)} regressions')
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,41 @@
+"""
+Settings for benchmarks. In-memory database, example app tables are created without migrations,
+so any number of languages can be benchmarked.
+
+    BENCH_LANGS - number of translating languages (up to 20), default 3
+    BENCH_LATENCY - stand-in translator latency per request, ms, default 0
+"""
+import os
+
+from django_translate.settings import *  # noqa
+
+BENCH_ALL_LANGS = ['en', 'fr', 'it', 'de', 'es', 'pt', 'nl', 'pl', 'uk', 'cs',
+                   'sv', 'da', 'fi', 'no', 'ro', 'hu', 'el', 'tr', 'ja', 'ko']
+
+DATABASES = {
+    'default': {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': ':memory:',
+    }
+}
+
+MIGRATION_MODULES = {'djangotranslate': None}
+
+DEBUG = False
+
+ALLOWED_HOSTS = ['testserver']
+
+ROOT_URLCONF = 'benchmarks.urls'
+
+TRANSLATING_LANGS = BENCH_ALL_LANGS[:int(os.environ.get('BENCH_LANGS', 3))]
+
+TRANSLATION_BACKENDS = [{
+    'BACKEND': 'django_multilanguage_content.backends.LocalBackend',
+    'MAX_BATCH_ITEMS': 100,
+    'OPTIONS': {'template': '{text} [{lang}]', 'latency': float(os.environ.get('BENCH_LATENCY', 0)) / 1000},
+}]
+
+# every translation reaches stand-in translator
+TRANSLATION_MEMORY_SIZE = 0
+
+PASSWORD_HASHERS = ['django.contrib.auth.hashers.MD5PasswordHasher']
@@ -0,0 +1,29 @@
+"""Benchmark endpoints - serializer of every benchmark language, example admin"""
+from django.contrib import admin
+from django.urls import include, path
+from rest_framework.routers import DefaultRouter
+
+from django_multilanguage_content.serializers import TranslationModelSerializer
+from django_multilanguage_content.views import TranslationViewSet
+from djangotranslate.models import Simple
+
+
+class AllLanguagesSerializer(TranslationModelSerializer):
+    class Meta:
+        model = Simple
+        fields = '__all__'
+
+
+class AllLanguagesSet(TranslationViewSet):
+    language_negotiation = True
+    serializer_class = AllLanguagesSerializer
+    queryset = Simple.objects.all()
+
+
+router = DefaultRouter()
+router.register('simple', AllLanguagesSet, basename='simple')
+
+urlpatterns = [
+    path('admin/', admin.site.urls),
+    path('', include(router.urls)),
+]
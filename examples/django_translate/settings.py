@@ -38,6 +38,7 @@ INSTALLED_APPS = [
     'django.contrib.messages',
     'django.contrib.staticfiles',
     'rest_framework',
+    'django_multilanguage_content',
     'djangotranslate'
 ]
 
@@ -110,6 +111,11 @@ LANGUAGE_CODE = 'en-us'
 
 TRANSLATING_LANGS = ['EN', 'FR', 'IT']
 
+TRANSLATION_BACKENDS = [
+    {'BACKEND': 'django_multilanguage_content.backends.GoogletransBackend', 'MAX_BATCH_ITEMS': 100},
+    {'BACKEND': 'django_multilanguage_content.backends.DeepTranslatorBackend', 'MAX_BATCH_CHARS': 5000},
+]
+
 TIME_ZONE = 'UTC'
 
 USE_I18N = True
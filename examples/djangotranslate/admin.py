@@ -1,6 +1,7 @@
 from django.contrib import admin
-from .models import Simple
-from django_multilanguage_content.admin import TranslateAdminInlines, setup_inlines
+from .models import Article, Simple
+from django_multilanguage_content.admin import (TranslateAdminInlines, setup_inlines, translate_selected,
+                                                translations_inline)
 
 inlines = setup_inlines(
     TranslateAdminInlines(Simple,
@@ -19,3 +20,12 @@ class SimpleAdmin(admin.ModelAdmin):
 
 
 admin.site.register(Simple, SimpleAdmin)
+
+
+class ArticleAdmin(admin.ModelAdmin):
+    # all languages in one table, loaded with one query
+    inlines = [translations_inline(Article)]
+    actions = [translate_selected]
+
+
+admin.site.register(Article, ArticleAdmin)
@@ -0,0 +1,60 @@
+# Generated by Django 3.2.25 on 2026-10-18 13:26
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Diff',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=20)),
+                ('age', models.IntegerField()),
+                ('status', models.CharField(max_length=30)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='Simple',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=20)),
+                ('age', models.IntegerField()),
+                ('status', models.CharField(max_length=30)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='simple_it',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=20)),
+                ('status', models.CharField(max_length=30)),
+                ('simple_ptr', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, to='djangotranslate.simple')),
+            ],
+        ),
+        migrations.CreateModel(
+            name='simple_fr',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=20)),
+                ('status', models.CharField(max_length=30)),
+                ('simple_ptr', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, to='djangotranslate.simple')),
+            ],
+        ),
+        migrations.CreateModel(
+            name='simple_en',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=20)),
+                ('status', models.CharField(max_length=30)),
+                ('simple_ptr', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, to='djangotranslate.simple')),
+            ],
+        ),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 3.2.25 on 2026-10-18 13:33
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('djangotranslate', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='simple_en',
+            name='translation_source_hashes',
+            field=models.JSONField(default=dict, editable=False),
+        ),
+        migrations.AddField(
+            model_name='simple_fr',
+            name='translation_source_hashes',
+            field=models.JSONField(default=dict, editable=False),
+        ),
+        migrations.AddField(
+            model_name='simple_it',
+            name='translation_source_hashes',
+            field=models.JSONField(default=dict, editable=False),
+        ),
+    ]
@@ -0,0 +1,37 @@
+# Generated by Django 3.2.25 on 2026-10-18 13:36
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('djangotranslate', '0002_translation_source_hashes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Article',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('title', models.CharField(max_length=100)),
+                ('body', models.TextField()),
+                ('published', models.BooleanField(default=False)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='article_translation',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('title', models.CharField(max_length=100)),
+                ('body', models.TextField()),
+                ('lang', models.CharField(max_length=16)),
+                ('translation_source_hashes', models.JSONField(default=dict, editable=False)),
+                ('article_ptr', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='article_translations', to='djangotranslate.article')),
+            ],
+            options={
+                'unique_together': {('article_ptr', 'lang')},
+            },
+        ),
+    ]
@@ -0,0 +1,24 @@
+# Generated by Django 3.2.25 on 2026-10-18 14:17
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('djangotranslate', '0003_article'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SimpleProxy',
+            fields=[
+            ],
+            options={
+                'proxy': True,
+                'indexes': [],
+                'constraints': [],
+            },
+            bases=('djangotranslate.simple',),
+        ),
+    ]
@@ -1,5 +1,5 @@
 from django.db import models
-from django_multilanguage_content import to_translation
+from django_multilanguage_content import TranslationManager, to_translation
 
 
 class Diff(models.Model):
@@ -13,3 +13,19 @@ class Simple(models.Model):
     name = models.CharField(max_length=20)
     age = models.IntegerField()
     status = models.CharField(max_length=30)
+
+    objects = TranslationManager()
+
+
+@to_translation('title', 'body', storage='table')
+class Article(models.Model):
+    title = models.CharField(max_length=100)
+    body = models.TextField()
+    published = models.BooleanField(default=False)
+
+    objects = TranslationManager()
+
+
+class SimpleProxy(Simple):
+    class Meta:
+        proxy = True
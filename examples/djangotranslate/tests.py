@@ -1,3 +1,1029 @@
-from django.test import TestCase
+import time
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django_multilanguage_content.backends import BaseBackend
+from django_multilanguage_content.exceptions import ResponseError
+from .models import Article, Diff, Simple, SimpleProxy
 
-# Create your tests here.
+
+def create_translated_simple(count, langs=('en', 'fr', 'it')):
+    """Base and connected rows are created with bulk_create, so translator is not called"""
+    Simple.objects.bulk_create([Simple(name=f'name {i}', age=i, status='active') for i in range(count)])
+    rows = list(Simple.objects.filter(**{f'simple_{langs[0]}__isnull': True}).order_by('pk'))
+    for lang in langs:
+        connected_model = Simple.get_connected_translated_model_class(lang)
+        connected_model.objects.bulk_create([
+            connected_model(name=f'{row.name} {lang}', status=f'active {lang}', simple_ptr=row) for row in rows
+        ])
+    return rows
+
+
+class TranslationViewSetQueriesTest(TestCase):
+    def test_list_queries_do_not_depend_on_rows_count(self):
+        create_translated_simple(3)
+        with self.assertNumQueries(1):
+            response = self.client.get(reverse('simple-list'))
+        self.assertEqual(len(response.json()), 3)
+
+        create_translated_simple(30)
+        with self.assertNumQueries(1):
+            response = self.client.get(reverse('simple-list'))
+        self.assertEqual(len(response.json()), 33)
+        self.assertEqual(response.json()[0]['simple_fr']['name'], 'name 0 fr')
+
+    def test_retrieve_connected_single_query(self):
+        row = create_translated_simple(1)[0]
+        with self.assertNumQueries(1):
+            response = self.client.get(
+                reverse('simple-retrieve-update-connected', kwargs={'pk': row.pk, 'lang': 'it'})
+            )
+        self.assertEqual(response.json()['name'], 'name 0 it')
+
+    def test_connected_endpoint_is_scoped_by_queryset(self):
+        from rest_framework.test import APIRequestFactory
+        from .views import SimpleSet
+
+        class ScopedSet(SimpleSet):
+            def get_queryset(self):
+                return super().get_queryset().filter(age__gte=100)
+
+        row = create_translated_simple(1)[0]
+        view = ScopedSet.as_view({'get': 'retrieve_update_connected', 'post': 'retrieve_update_connected'})
+        factory = APIRequestFactory()
+        response = view(factory.get('/'), pk=row.pk, lang='it')
+        self.assertEqual(response.status_code, 404)
+        response = view(factory.post('/', {'name': 'changed', 'status': 'changed'}), pk=row.pk, lang='it')
+        self.assertEqual(response.status_code, 404)
+        self.assertEqual(Simple.get_translation_storage().get(row, 'it').name, 'name 0 it')
+
+
+class ConnectedSerializerCacheTest(TestCase):
+    def test_serializer_class_is_generated_once_per_arguments(self):
+        from django_multilanguage_content.serializers import get_connected_model_serializer
+        serializer = get_connected_model_serializer(Simple, 'it', '__all__', True)
+        self.assertIs(get_connected_model_serializer(Simple, 'it', '__all__', True), serializer)
+        self.assertIs(get_connected_model_serializer(Simple, 'it', ['name'], False),
+                      get_connected_model_serializer(Simple, 'it', ('name',), False))
+        others = [
+            get_connected_model_serializer(Simple, 'fr', '__all__', True),
+            get_connected_model_serializer(Simple, 'it', ('name',), True),
+            get_connected_model_serializer(Simple, 'it', '__all__', False),
+        ]
+        for other in others:
+            self.assertIsNot(other, serializer)
+        self.assertEqual(len({serializer, *others}), 4)
+
+
+class LanguageNegotiationTest(TestCase):
+    def test_lang_param_flattens_one_language(self):
+        create_translated_simple(5)
+        with self.assertNumQueries(1):
+            response = self.client.get(reverse('simple-list'), {'lang': 'it'})
+        first = response.json()[0]
+        self.assertEqual(first['name'], 'name 0 it')
+        self.assertEqual(first['status'], 'active it')
+        self.assertNotIn('simple_fr', first)
+        self.assertEqual(response['Content-Language'], 'it')
+
+    def test_accept_language_header(self):
+        row = create_translated_simple(1)[0]
+        response = self.client.get(reverse('simple-detail', kwargs={'pk': row.pk}),
+                                   HTTP_ACCEPT_LANGUAGE='de-DE, fr-CA;q=0.8, en;q=0.5')
+        self.assertEqual(response.json()['name'], 'name 0 fr')
+        self.assertIn('Accept-Language', response['Vary'])
+
+    def test_unknown_lang_param(self):
+        response = self.client.get(reverse('simple-list'), {'lang': 'xx'})
+        self.assertEqual(response.status_code, 400)
+
+
+class TranslatedQuerySetTest(TestCase):
+    def test_translated_with_fallback_in_one_query(self):
+        first, second = create_translated_simple(2, langs=('en',))
+        Simple.get_connected_translated_model_class('fr').objects.create(
+            simple_ptr=second, name='second fr', status='active fr'
+        )
+        with self.assertNumQueries(1):
+            values = list(Simple.objects.translated('fr', fallback=['en'])
+                          .order_by('-name_translated').values('pk', 'name_translated', 'status_translated'))
+        self.assertEqual(values, [
+            {'pk': second.pk, 'name_translated': 'second fr', 'status_translated': 'active fr'},
+            {'pk': first.pk, 'name_translated': 'name 0 en', 'status_translated': 'active en'},
+        ])
+
+    def test_filter_and_source_fallback(self):
+        row = create_translated_simple(1, langs=('en',))[0]
+        translated = Simple.objects.translated('it')
+        self.assertEqual(translated.get(pk=row.pk).name_translated, 'name 0')
+        self.assertFalse(translated.filter(name_translated='name 0 en').exists())
+        self.assertEqual(Simple.objects.translated('it', fallback_to_source=False).get().name_translated, None)
+
+
+class RegistryTest(TestCase):
+    def test_receiver_is_connected_to_translatable_models_only(self):
+        from django.db.models.signals import post_save
+        self.assertTrue(post_save.has_listeners(Simple))
+        self.assertFalse(post_save.has_listeners(Diff))
+        with self.assertNumQueries(1):
+            Diff.objects.create(name='cat', age=3, status='active')
+
+    def test_connected_models_map(self):
+        self.assertEqual(Simple.get_connected_translated_model_class('fr')._meta.model_name, 'simple_fr')
+        self.assertEqual(set(Article.get_all_connected_models()), {'article_translation'})
+        with self.assertRaises(ValueError):
+            Simple.get_connected_translated_model_class('xx')
+
+    @override_settings(TRANSLATION_BACKENDS=[{
+        'BACKEND': 'django_multilanguage_content.backends.LocalBackend',
+        'OPTIONS': {'template': '{text} ({lang})'},
+    }])
+    def test_proxy_models_are_translatable(self):
+        from django_multilanguage_content import bulk_translate
+        from django_multilanguage_content.management.utils import get_models
+        from django_multilanguage_content.registry import registry
+        self.assertIn(SimpleProxy, registry)
+        self.assertNotIn(Diff, registry)
+        self.assertEqual(get_models(['djangotranslate.SimpleProxy']), [SimpleProxy])
+        Simple.objects.bulk_create([Simple(name='cat', age=3, status='active')])
+        self.assertEqual(bulk_translate(SimpleProxy.objects.all(), langs=['fr']), {'fr': 1})
+        self.assertEqual(Simple.objects.get().simple_fr.name, 'cat (fr)')
+
+
+@override_settings(TRANSLATION_BACKENDS=[{
+    'BACKEND': 'django_multilanguage_content.backends.LocalBackend',
+    'OPTIONS': {'template': '{text} ({lang})', 'dictionary': {'fr': {'active': 'actif'}}},
+}])
+class OfflineTranslationTest(TestCase):
+    def test_create_translates_to_every_language(self):
+        row = Simple.objects.create(name='cat', age=3, status='active')
+        self.assertEqual(row.simple_fr.name, 'cat (fr)')
+        self.assertEqual(row.simple_fr.status, 'actif')
+        self.assertEqual(row.simple_it.status, 'active (it)')
+        self.assertEqual(Simple.objects.translated('en').get().name_translated, 'cat (en)')
+
+    def test_pipeline_metrics(self):
+        from django_multilanguage_content import metrics
+        metrics.install()
+        calls = metrics.backend_calls.value(backend='local', lang='it', status='ok')
+        writes = metrics.connected_writes.value(model='djangotranslate.Simple', lang='it')
+        Simple.objects.create(name='dog', age=2, status='sleeping')
+        self.assertEqual(metrics.backend_calls.value(backend='local', lang='it', status='ok'), calls + 1)
+        self.assertEqual(metrics.connected_writes.value(model='djangotranslate.Simple', lang='it'), writes + 1)
+        self.assertIn('translation_backend_latency_seconds_bucket{backend="local",le="+Inf"}',
+                      metrics.registry.render())
+
+
+@override_settings(TRANSLATION_BACKENDS=[{
+    'BACKEND': 'django_multilanguage_content.backends.LocalBackend',
+    'OPTIONS': {'template': '{text} ({lang})'},
+}])
+class TranslationQueueTest(TestCase):
+    def test_job_is_enqueued_on_commit_and_done_by_worker(self):
+        from io import StringIO
+        from unittest import mock
+        from django.core.management import call_command
+        from django_multilanguage_content.models import TranslationJob
+        with mock.patch('django_multilanguage_content.logic.translation_queue_enabled', True):
+            with self.captureOnCommitCallbacks(execute=True) as callbacks:
+                row = Simple.objects.create(name='cat', age=3, status='active')
+                self.assertFalse(TranslationJob.objects.exists())
+        self.assertEqual(len(callbacks), 1)
+        job = TranslationJob.objects.get()
+        self.assertEqual((job.model_label, job.object_pk, job.get_langs()), ('djangotranslate.Simple', str(row.pk),
+                                                                             ['en', 'fr', 'it']))
+        self.assertIsNone(Simple.get_translation_storage().get(row, 'fr'))
+
+        out = StringIO()
+        call_command('translation_worker', '--once', '--concurrency', '1', stdout=out)
+        self.assertIn('Jobs done: 1, failed: 0', out.getvalue())
+        row = Simple.objects.get(pk=row.pk)
+        self.assertEqual(Simple.get_translation_storage().get(row, 'fr').name, 'cat (fr)')
+        self.assertEqual(TranslationJob.objects.get().status, TranslationJob.DONE)
+
+    def test_claimed_job_is_not_claimed_again(self):
+        from datetime import timedelta
+        from django.utils import timezone
+        from django_multilanguage_content.jobs import claim_jobs, create_job
+        from django_multilanguage_content.models import TranslationJob
+        first, second = create_job('djangotranslate.Simple', 1, ['fr']), create_job('djangotranslate.Simple', 2, ['fr'])
+        later = create_job('djangotranslate.Simple', 3, ['fr'])
+        TranslationJob.objects.filter(pk=later.pk).update(available_at=timezone.now() + timedelta(minutes=1))
+        self.assertEqual([job.pk for job in claim_jobs(1)], [first.pk])
+        self.assertEqual([job.pk for job in claim_jobs(5)], [second.pk])
+        self.assertEqual(claim_jobs(5), [])
+        self.assertEqual(TranslationJob.objects.get(pk=first.pk).status, TranslationJob.RUNNING)
+
+    def test_failed_job_is_retried_then_dead_lettered(self):
+        from django.utils import timezone
+        from django_multilanguage_content.jobs import (claim_jobs, create_job, process_job, purge_done_jobs,
+                                                       requeue_dead_jobs)
+        from django_multilanguage_content.models import TranslationJob
+        job = create_job('djangotranslate.Missing', 1, ['fr'])
+        self.assertFalse(process_job(job, max_attempts=2))
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.attempts), (TranslationJob.PENDING, 1))
+        self.assertIn('LookupError', job.last_error)
+        self.assertGreater(job.available_at, timezone.now())
+        self.assertEqual(claim_jobs(5), [])  # retry waits for backoff
+
+        self.assertFalse(process_job(job, max_attempts=2))
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.attempts), (TranslationJob.DEAD, 2))
+        self.assertEqual(requeue_dead_jobs(), 1)
+        self.assertEqual([claimed.pk for claimed in claim_jobs(5)], [job.pk])
+
+        # instance deleted before translating - job is done, and purged later
+        done = create_job('djangotranslate.Simple', 0, ['fr'])
+        self.assertTrue(process_job(done))
+        self.assertEqual(purge_done_jobs(3600), 0)
+        self.assertEqual(purge_done_jobs(0), 1)
+        self.assertFalse(TranslationJob.objects.filter(pk=done.pk).exists())
+
+
+@override_settings(TRANSLATION_BACKENDS=[{
+    'BACKEND': 'django_multilanguage_content.backends.LocalBackend',
+    'OPTIONS': {'template': '{text} ({lang})'},
+}])
+class BulkTranslateTest(TestCase):
+    def test_shared_values_are_sent_once_and_translated_rows_skipped(self):
+        from django_multilanguage_content import bulk_translate
+        from django_multilanguage_content.memory import translation_memory
+        from django_multilanguage_content.signals import backend_called
+        Simple.objects.bulk_create([Simple(name=f'name {i}', age=i, status='active') for i in range(3)])
+        rows = list(Simple.objects.order_by('pk'))
+        Simple.get_connected_translated_model_class('fr').objects.create(name='nom', status='actif',
+                                                                         simple_ptr=rows[0])
+        translation_memory.clear()
+        calls = []
+
+        def called(lang, items, **kwargs):
+            calls.append((lang, items))
+        backend_called.connect(called)
+        self.addCleanup(backend_called.disconnect, called)
+
+        # per language: select of existing records, bulk_create per chunk of 2 records
+        with self.assertNumQueries(2 + 1 + 2):
+            created = bulk_translate(rows, langs=['fr', 'it'], batch_size=2)
+        self.assertEqual(created, {'fr': 2, 'it': 3})
+        # 'active' of every row is sent once per language, values are packed by batch_size
+        self.assertEqual(calls, [('fr', 2), ('fr', 1), ('it', 2), ('it', 2)])
+        records = Simple.get_translation_storage().get_many(Simple.objects.get(pk=rows[0].pk), ['fr', 'it'])
+        self.assertEqual(records['fr'].name, 'nom')
+        self.assertEqual((records['it'].name, records['it'].status), ('name 0 (it)', 'active (it)'))
+
+
+@override_settings(TRANSLATION_BACKENDS=[{
+    'BACKEND': 'django_multilanguage_content.backends.LocalBackend',
+    'OPTIONS': {'template': '{text} ({lang})'},
+}])
+class BackfillCommandTest(TestCase):
+    def setUp(self):
+        # rows without connected records, post_save is not sent
+        Simple.objects.bulk_create([Simple(name=f'name {i}', age=i, status='active') for i in range(5)])
+        self.rows = list(Simple.objects.order_by('pk'))
+
+    def backfill(self, *args):
+        from io import StringIO
+        from django.core.management import call_command
+        out = StringIO()
+        call_command('translation_backfill', '--models', 'djangotranslate.Simple', *args, stdout=out)
+        return out.getvalue()
+
+    def translated_pks(self, lang):
+        connected_model = Simple.get_connected_translated_model_class(lang)
+        return sorted(connected_model.objects.values_list('simple_ptr_id', flat=True))
+
+    def test_dry_run_and_unknown_lang(self):
+        from django.core.management import CommandError
+        self.assertIn('djangotranslate.Simple [fr]: 5 rows to translate', self.backfill('--langs', 'fr', '--dry-run'))
+        self.assertEqual(self.translated_pks('fr'), [])
+        with self.assertRaisesMessage(CommandError, 'not translated into de'):
+            self.backfill('--langs', 'fr', 'de')
+
+    def test_chunks_and_resume_from_checkpoint(self):
+        from unittest import mock
+        from django_multilanguage_content.logic import bulk_translate
+        from django_multilanguage_content.models import TranslationCheckpoint
+        calls, interrupt_at = [], [2]
+
+        def interrupted(batch, **kwargs):
+            calls.append([row.pk for row in batch])
+            if len(calls) in interrupt_at:
+                raise RuntimeError('interrupted')
+            return bulk_translate(batch, **kwargs)
+        command = 'django_multilanguage_content.management.commands.translation_backfill.bulk_translate'
+        with mock.patch(command, interrupted), self.assertRaises(RuntimeError):
+            self.backfill('--langs', 'fr', '--chunk-size', '2')
+        pks = [row.pk for row in self.rows]
+        self.assertEqual(calls, [pks[:2], pks[2:4]])
+        self.assertEqual(self.translated_pks('fr'), pks[:2])
+        checkpoint = TranslationCheckpoint.objects.get(name='backfill:djangotranslate.Simple:fr')
+        self.assertEqual(checkpoint.last_pk, str(pks[1]))
+
+        # next run continues after checkpoint and forgets it when finished
+        calls.clear()
+        interrupt_at.clear()
+        with mock.patch(command, interrupted):
+            self.assertIn('3 rows translated', self.backfill('--langs', 'fr', '--chunk-size', '2'))
+        self.assertEqual(calls, [pks[2:4], pks[4:]])
+        self.assertEqual(self.translated_pks('fr'), pks)
+        self.assertFalse(TranslationCheckpoint.objects.exists())
+
+
+@override_settings(TRANSLATION_BACKENDS=[{
+    'BACKEND': 'django_multilanguage_content.backends.LocalBackend',
+    'OPTIONS': {'template': '{text} ({lang})'},
+}])
+class IncrementalRetranslationTest(TestCase):
+    def test_only_changed_fields_are_translated(self):
+        from django_multilanguage_content import metrics
+        metrics.install()
+        row = Simple.objects.create(name='cat', age=3, status='active')
+        calls = metrics.backend_calls.value(backend='local', lang='fr', status='ok')
+
+        row.age = 4
+        with self.assertNumQueries(2):  # update and connected records lookup, nothing translated
+            row.save()
+        row.save(update_fields=['age'])  # no translated fields - no lookup at all
+        self.assertEqual(metrics.backend_calls.value(backend='local', lang='fr', status='ok'), calls)
+
+        row.status = 'sleeping'
+        row.save()
+        row = Simple.objects.get(pk=row.pk)
+        self.assertEqual(row.simple_fr.status, 'sleeping (fr)')
+        self.assertEqual(row.simple_fr.name, 'cat (fr)')
+        self.assertEqual(metrics.backend_calls.value(backend='local', lang='fr', status='ok'), calls + 1)
+
+
+@override_settings(TRANSLATION_BACKENDS=[{
+    'BACKEND': 'django_multilanguage_content.backends.LocalBackend',
+    'OPTIONS': {'template': '{text} ({lang})'},
+}])
+class SingleTableStorageTest(TestCase):
+    def test_save_and_update_rows_per_language(self):
+        article = Article.objects.create(title='cat', body='sleeps')
+        translation_model = Article.get_connected_translated_model_class('fr')
+        self.assertEqual(translation_model.objects.filter(article_ptr=article).count(), 3)
+        article.body = 'eats'
+        article.save()
+        self.assertEqual(Article.objects.translated('it').get().body_translated, 'eats (it)')
+        self.assertEqual(Article.objects.translated('it').get().title_translated, 'cat (it)')
+
+    def test_list_loads_every_language_in_one_query(self):
+        for title in ('cat', 'dog', 'fox'):
+            Article.objects.create(title=title, body='sleeps')
+        with self.assertNumQueries(2):  # page and all its translations
+            response = self.client.get(reverse('article-list'))
+        self.assertEqual(response.json()[1]['article_it']['title'], 'dog (it)')
+        self.assertNotIn('lang', response.json()[1]['article_it'])
+
+        response = self.client.get(reverse('article-list'), {'lang': 'fr'})
+        self.assertEqual(response.json()[2]['title'], 'fox (fr)')
+
+    @override_settings(TRANSLATION_BACKENDS=[{
+        'BACKEND': 'django_multilanguage_content.backends.LocalBackend',
+        'MAX_BATCH_CHARS': 20,
+        'OPTIONS': {'template': '<{text}>'},
+    }])
+    def test_long_text_is_split_at_sentence_boundaries(self):
+        Article.objects.create(title='cat', body='The cat sleeps. It dreams.\n\nThe dog barks.')
+        self.assertEqual(Article.objects.translated('fr').get().body_translated,
+                         '<The cat sleeps.> <It dreams.>\n\n<The dog barks.>')
+
+
+@override_settings(TRANSLATION_BACKENDS=[{
+    'BACKEND': 'django_multilanguage_content.backends.LocalBackend',
+    'OPTIONS': {'template': '{text} ({lang})'},
+}])
+class AsyncTranslationTest(TestCase):
+    def test_atranslate(self):
+        from asgiref.sync import async_to_sync
+        from django_multilanguage_content.translator import main_translator
+        self.assertEqual(async_to_sync(main_translator.atranslate)(['cat', 3, 'cat'], 'fr'),
+                         ['cat (fr)', 3, 'cat (fr)'])
+
+    async def test_async_views(self):
+        from asgiref.sync import sync_to_async
+        article = await sync_to_async(Article.objects.create)(title='cat', body='sleeps')
+        # single table storage - all languages are deleted
+        await sync_to_async(Article.get_connected_translated_model_class('it').objects.all().delete)()
+        response = await self.async_client.post(
+            reverse('article-async-translate', kwargs={'pk': article.pk}) + '?lang=it'
+        )
+        self.assertEqual(response.json(), {'it': {'id': response.json()['it']['id'],
+                                                  'title': 'cat (it)', 'body': 'sleeps (it)'}})
+        response = await self.async_client.get(
+            reverse('article-async-connected', kwargs={'pk': article.pk, 'lang': 'it'})
+        )
+        self.assertEqual(response.json()['title'], 'cat (it)')
+        response = await self.async_client.get(
+            reverse('article-async-connected', kwargs={'pk': article.pk, 'lang': 'fr'})
+        )
+        self.assertEqual(response.status_code, 404)
+
+    async def test_async_views_use_viewset_permissions(self):
+        from asgiref.sync import sync_to_async
+        from django.test import AsyncClient, AsyncRequestFactory
+        from rest_framework.permissions import IsAuthenticated
+        from django_multilanguage_content.views import async_retrieve_update_connected, async_translate
+        from .views import ArticleSet
+
+        class PrivateSet(ArticleSet):
+            permission_classes = [IsAuthenticated]
+
+        article = await sync_to_async(Article.objects.create)(title='cat', body='sleeps')
+        factory = AsyncRequestFactory()
+        response = await async_translate(factory.post('/?lang=it'), viewset=PrivateSet, pk=article.pk)
+        self.assertIn(response.render().status_code, (401, 403))
+        response = await async_retrieve_update_connected(factory.get('/'), viewset=PrivateSet, pk=article.pk,
+                                                         lang='it')
+        self.assertIn(response.status_code, (401, 403))
+        # API clients without CSRF token are not rejected
+        response = await AsyncClient(enforce_csrf_checks=True).post(
+            reverse('article-async-translate', kwargs={'pk': article.pk}) + '?lang=it'
+        )
+        self.assertEqual(response.status_code, 200)
+
+
+class RateLimitTest(TestCase):
+    def test_callers_get_consecutive_slots(self):
+        import tempfile
+        from django_multilanguage_content.ratelimit import DatabaseRateLimitStore, FileRateLimitStore, RateLimiter
+        with tempfile.TemporaryDirectory() as directory:
+            for store in (FileRateLimitStore(directory), DatabaseRateLimitStore()):
+                limiter = RateLimiter('local', requests_per_second=10, chars_per_second=1000, store=store)
+                waits = [limiter.reserve(chars=100) for _ in range(12)]
+                # 10 requests of burst go at once, then one per 100 ms
+                self.assertEqual(waits[:10], [0] * 10)
+                self.assertAlmostEqual(waits[10], 0.1, delta=0.05)
+                self.assertAlmostEqual(waits[11], 0.2, delta=0.05)
+
+    def test_cache_lock_is_released_by_owner_only(self):
+        from unittest import mock
+        from django_multilanguage_content.ratelimit import CacheRateLimitStore
+        store = CacheRateLimitStore(lock_timeout=0.05)
+        lock_key = 'translation_rate_limit_lock:local'
+        buckets = [('local:requests', 1, 10, 10)]
+        # lock of other caller is waited for until it expires, not deleted
+        store.cache.add(lock_key, 'other', timeout=0.3)
+        started = time.monotonic()
+        store.reserve('local', buckets)
+        self.assertGreaterEqual(time.monotonic() - started, 0.25)
+
+        # own lock expired and was taken by other caller meanwhile - it is kept
+        get_many = store.cache.get_many
+
+        def expire_lock(keys):
+            store.cache.set(lock_key, 'other', timeout=5)
+            return get_many(keys)
+        with mock.patch.object(store.cache, 'get_many', expire_lock):
+            store.reserve('local', buckets)
+        self.assertEqual(store.cache.get(lock_key), 'other')
+        store.cache.delete(lock_key)
+
+
+class FakeTime:
+    """Clock of translator module, sleep() only moves it"""
+
+    def __init__(self):
+        self.now = 1000.0
+        self.sleeps = []
+
+    def monotonic(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+class StubBackend(BaseBackend):
+    """Fails while failing is set, every call takes latency seconds of FakeTime"""
+
+    def __init__(self, clock=None, failing=False, latency=0.0, **kwargs):
+        super().__init__(**kwargs)
+        self.clock = clock
+        self.failing = failing
+        self.latency = latency
+        self.calls = 0
+
+    def translate_batch(self, values, lang, source=None):
+        self.calls += 1
+        self.clock.now += self.latency
+        if self.failing:
+            raise ResponseError(f'{self.name} is down')
+        return [f'{value} ({self.name})' for value in values]
+
+
+class TranslationMemoryTest(TestCase):
+    def test_lru_hits_misses_and_eviction(self):
+        from django_multilanguage_content.memory import TranslationMemory
+        memory = TranslationMemory(size=2)
+        memory.set_many({'cat': 'chat', 'dog': 'chien'}, 'fr', 'local')
+        self.assertEqual(memory.get_many(['cat', 'bird', 3], 'fr', 'local'), {'cat': 'chat'})
+        memory.set_many({'bird': 'oiseau'}, 'fr', 'local')  # dog is least recently used
+        self.assertEqual(memory.get_many(['cat', 'dog', 'bird'], 'fr', 'local'), {'cat': 'chat', 'bird': 'oiseau'})
+        self.assertEqual(memory.get_many(['cat'], 'it', 'local'), {})
+        self.assertEqual(memory.get_many(['cat'], 'fr', 'other'), {})
+        self.assertEqual(memory.stats(), {'lru_hits': 3, 'store_hits': 0, 'misses': 4, 'lru_size': 2})
+
+    def test_source_languages_do_not_collide(self):
+        from django_multilanguage_content.memory import TranslationMemory
+        memory = TranslationMemory(size=10)
+        # 'gift' is a present in English and poison in German
+        memory.set_many({'gift': 'cadeau'}, 'fr', 'local', source='en')
+        memory.set_many({'gift': 'poison'}, 'fr', 'local', source='de')
+        self.assertEqual(memory.get_many(['gift'], 'fr', 'local', source='en'), {'gift': 'cadeau'})
+        self.assertEqual(memory.get_many(['gift'], 'fr', 'local', source='de'), {'gift': 'poison'})
+        self.assertEqual(memory.get_many(['gift'], 'fr', 'local'), {})
+
+    def test_persistent_stores(self):
+        from django_multilanguage_content.memory import CacheMemoryStore, DatabaseMemoryStore, TranslationMemory
+        for store in (DatabaseMemoryStore(), CacheMemoryStore('default')):
+            writer = TranslationMemory(size=10, store=store)
+            writer.set_many({'gift': 'cadeau'}, 'fr', 'local', source='en')
+            writer.set_many({'gift': 'poison'}, 'fr', 'local', source='de')
+            # other process - empty in-process tier
+            reader = TranslationMemory(size=10, store=store)
+            self.assertEqual(reader.get_many(['gift', 'cat'], 'fr', 'local', source='de'), {'gift': 'poison'})
+            self.assertEqual(reader.get_many(['gift'], 'fr', 'local'), {})
+            self.assertEqual(reader.get_many(['gift'], 'fr', 'local', source='de'), {'gift': 'poison'})
+            self.assertEqual(reader.stats(), {'lru_hits': 1, 'store_hits': 1, 'misses': 2, 'lru_size': 1})
+
+    @override_settings(TRANSLATION_BACKENDS=[{
+        'BACKEND': 'django_multilanguage_content.backends.LocalBackend',
+        'OPTIONS': {'template': '{text} ({lang})'},
+    }])
+    def test_translator_keys_memory_by_source(self):
+        from django_multilanguage_content.memory import translation_memory
+        from django_multilanguage_content.translator import main_translator
+        translation_memory.set_many({'gift': 'cadeau'}, 'fr', main_translator.name, source='en')
+        self.assertEqual(main_translator(['gift'], 'fr', source='en'), ['cadeau'])
+        self.assertEqual(main_translator(['gift'], 'fr', source='de'), ['gift (fr)'])
+
+
+class BarrierBackend(BaseBackend):
+    """Languages of failing raise at once, others wait until barrier parties calls run together"""
+
+    def __init__(self, barrier=None, failing=(), **kwargs):
+        super().__init__(**kwargs)
+        self.barrier = barrier
+        self.failing = failing
+
+    def translate_batch(self, values, lang, source=None):
+        if lang in self.failing:
+            raise ResponseError(f'{lang} is down')
+        self.barrier.wait(timeout=5)
+        return [f'{value} ({lang})' for value in values]
+
+
+class ConcurrentTranslationTest(TestCase):
+    def test_languages_are_translated_in_parallel(self):
+        import threading
+        from concurrent.futures import ThreadPoolExecutor
+        from unittest import mock
+        from django_multilanguage_content.exceptions import PartialTranslationError
+        from django_multilanguage_content.logic import translate_instance
+        Simple.objects.bulk_create([Simple(name='cat', age=3, status='active')])
+        row = Simple.objects.get()
+        executor = ThreadPoolExecutor(max_workers=3)
+        self.addCleanup(executor.shutdown)
+        # sequential calls would break the barrier of en and fr, retries of it don't wait for backoff
+        backends = [{'BACKEND': 'djangotranslate.tests.BarrierBackend',
+                     'OPTIONS': {'barrier': threading.Barrier(2), 'failing': ['it']}}]
+        with override_settings(TRANSLATION_BACKENDS=backends), \
+                mock.patch('django_multilanguage_content.translator.random.uniform', lambda low, high: 0), \
+                mock.patch('django_multilanguage_content.logic.translation_concurrency', 3), \
+                mock.patch('django_multilanguage_content.logic._get_translation_executor', lambda: executor):
+            with self.assertRaises(PartialTranslationError) as raised:
+                translate_instance(row, ['en', 'fr', 'it'], source=None)
+        self.assertEqual(list(raised.exception.errors), ['it'])
+        self.assertIsInstance(raised.exception.errors['it'], ResponseError)
+        records = Simple.get_translation_storage().get_many(Simple.objects.get(), ['en', 'fr', 'it'])
+        self.assertEqual(sorted(records), ['en', 'fr'])
+        self.assertEqual(records['fr'].name, 'cat (fr)')
+
+
+class BackendHealthTest(TestCase):
+    def setUp(self):
+        from unittest import mock
+        from django_multilanguage_content.translator import BigBoyTranslator
+        self.clock = FakeTime()
+        patches = [
+            mock.patch('django_multilanguage_content.translator.time', self.clock),
+            # backoff jitter takes the upper bound
+            mock.patch('django_multilanguage_content.translator.random.uniform', lambda low, high: high),
+        ]
+        for patch in patches:
+            patch.start()
+            self.addCleanup(patch.stop)
+        self.translator = BigBoyTranslator([
+            {'BACKEND': 'djangotranslate.tests.StubBackend', 'NAME': name, 'OPTIONS': {'clock': self.clock}}
+            for name in ('primary', 'secondary')
+        ])
+        self.primary, self.secondary = self.translator.backends
+
+    def test_circuit_opens_and_lets_one_trial_call(self):
+        self.primary.failing = self.secondary.failing = True
+        with self.assertRaises(ResponseError):
+            self.translator.translate(['cat'], 'fr')
+        # 5 tries over both backends, rounds separated by exponential backoff
+        self.assertEqual(self.primary.calls + self.secondary.calls, 5)
+        self.assertEqual(self.clock.sleeps, [1.0, 2.0])
+        with self.assertRaises(ResponseError):
+            self.translator.translate(['cat'], 'fr')
+        self.assertEqual(self.translator.health['primary'].state, 'open')
+        self.assertEqual(self.translator.health['secondary'].state, 'open')
+
+        # open circuits fail fast
+        calls = self.primary.calls + self.secondary.calls
+        with self.assertRaises(ResponseError):
+            self.translator.translate(['cat'], 'fr')
+        self.assertEqual(self.primary.calls + self.secondary.calls, calls)
+
+        # after reset timeout trial call closes circuit, other backend is not called
+        self.clock.now += 30
+        self.primary.failing = False
+        secondary_calls = self.secondary.calls
+        self.assertEqual(self.translator.translate(['cat'], 'fr'), (['cat (primary)'], 'primary'))
+        self.assertEqual(self.translator.health['primary'].state, 'closed')
+        self.assertEqual(self.translator.health['secondary'].state, 'open')
+        self.assertEqual(self.secondary.calls, secondary_calls)
+
+    def test_failed_trial_opens_circuit_again(self):
+        health = self.translator.health['primary']
+        for _ in range(5):
+            health.record_failure(0.1)
+        self.assertFalse(health.acquire())
+        self.clock.now += 30
+        self.assertTrue(health.acquire())
+        self.assertFalse(health.acquire())  # one trial at a time
+        health.record_failure(0.1)
+        self.assertEqual(health.state, 'open')
+        self.assertFalse(health.acquire())
+
+    def test_fallback_order(self):
+        from django_multilanguage_content.signals import backend_fallback
+        fallbacks = []
+
+        def fallback(backend, failed_backends, **kwargs):
+            fallbacks.append((backend, failed_backends))
+        backend_fallback.connect(fallback)
+        self.addCleanup(backend_fallback.disconnect, fallback)
+
+        self.primary.failing = True
+        self.assertEqual(self.translator.translate(['cat'], 'fr'), (['cat (secondary)'], 'secondary'))
+        self.assertEqual(fallbacks, [('secondary', ['primary'])])
+        # failing backend goes last, next call is not retried through it
+        self.assertEqual(self.translator.ordered_backends(), [self.secondary, self.primary])
+        self.translator.translate(['dog'], 'fr')
+        self.assertEqual((self.primary.calls, self.secondary.calls), (1, 2))
+        self.assertEqual(self.clock.sleeps, [])
+
+    def test_fallback_translations_are_remembered_under_fallback(self):
+        from django_multilanguage_content.memory import translation_memory
+        from django_multilanguage_content.translator import BackendHealth
+        translation_memory.clear()
+        self.addCleanup(translation_memory.clear)
+        self.primary.failing = True
+        self.assertEqual(self.translator(['cat'], 'fr'), ['cat (secondary)'])
+        self.assertEqual(translation_memory.get_many(['cat'], 'fr', 'primary'), {})
+        self.assertEqual(translation_memory.get_many(['cat'], 'fr', 'secondary'), {'cat': 'cat (secondary)'})
+        # while fallback answers first, its translation is served from memory
+        calls = self.secondary.calls
+        self.assertEqual(self.translator(['cat'], 'fr'), ['cat (secondary)'])
+        self.assertEqual(self.secondary.calls, calls)
+        # healthy primary translates again, its translation is remembered and preferred
+        self.translator.health['primary'] = BackendHealth('primary', 0)
+        self.primary.failing = False
+        self.assertEqual(self.translator(['cat'], 'fr'), ['cat (primary)'])
+        self.assertEqual(self.translator(['cat'], 'fr'), ['cat (primary)'])
+        self.assertEqual(self.primary.calls, 2)
+
+    def test_healthy_primary_stays_first(self):
+        from django_multilanguage_content.translator import BackendHealth
+        self.primary.latency, self.secondary.latency = 2.0, 0.1
+        for _ in range(30):
+            self.translator.translate(['cat'], 'fr')
+            self.translator.health['secondary'].record_success(0.1)
+        self.assertEqual(self.translator.ordered_backends(), [self.primary, self.secondary])
+
+        # latency breaks ties of equal priority, once enough calls are measured
+        slow, fast = BackendHealth('slow'), BackendHealth('fast')
+        for _ in range(19):
+            slow.record_success(2.0)
+            fast.record_success(0.1)
+        self.assertEqual(slow.rank(), fast.rank())
+        slow.record_success(2.0)
+        fast.record_success(0.1)
+        self.assertLess(fast.rank(), slow.rank())
+
+
+@override_settings(TRANSLATION_CACHE=True, TRANSLATION_BACKENDS=[{
+    'BACKEND': 'django_multilanguage_content.backends.LocalBackend',
+    'OPTIONS': {'template': '{text} ({lang})'},
+}])
+class TranslationCacheTest(TestCase):
+    def test_connected_record_is_cached_until_changed(self):
+        article = Article.objects.create(title='cat', body='sleeps')
+        url = reverse('article-retrieve-update-connected', kwargs={'pk': article.pk, 'lang': 'fr'})
+        self.client.get(url)
+        with self.assertNumQueries(1):  # base row, checked before cached data is served
+            self.assertEqual(self.client.get(url).json()['title'], 'cat (fr)')
+        connected = Article.get_translation_storage().get(article, 'fr')
+        connected.title = 'chat'
+        connected.save()
+        self.assertEqual(self.client.get(url).json()['title'], 'chat')
+
+    def test_connected_record_cache_is_per_viewset(self):
+        from rest_framework.test import APIRequestFactory
+        from .views import ArticleSet
+
+        class PublishedSet(ArticleSet):
+            def get_queryset(self):
+                return super().get_queryset().filter(published=True)
+
+        article = Article.objects.create(title='cat', body='sleeps')
+        url = reverse('article-retrieve-update-connected', kwargs={'pk': article.pk, 'lang': 'fr'})
+        self.assertEqual(self.client.get(url).status_code, 200)
+        view = PublishedSet.as_view({'get': 'retrieve_update_connected'})
+        self.assertEqual(view(APIRequestFactory().get(url), pk=article.pk, lang='fr').status_code, 404)
+
+        # viewset without cache_translations is not cached
+        row = create_translated_simple(1)[0]
+        url = reverse('simple-retrieve-update-connected', kwargs={'pk': row.pk, 'lang': 'fr'})
+        self.client.get(url)
+        with self.assertNumQueries(1):
+            self.client.get(url)
+
+    def test_cached_object_is_checked_against_permissions(self):
+        from django.contrib.auth.models import AnonymousUser, User
+        from rest_framework.permissions import BasePermission
+        from rest_framework.test import APIRequestFactory, force_authenticate
+        from .views import ArticleSet
+
+        class StaffObjectsOnly(BasePermission):
+            def has_object_permission(self, request, view, obj):
+                return request.user.is_staff
+
+        class StaffArticleSet(ArticleSet):
+            permission_classes = [StaffObjectsOnly]
+
+        article = Article.objects.create(title='cat', body='sleeps')
+        staff = User.objects.create_user('staff', is_staff=True)
+        for actions, kwargs in (({'get': 'retrieve'}, {}), ({'get': 'retrieve_update_connected'}, {'lang': 'fr'})):
+            view = StaffArticleSet.as_view(actions)
+            responses = []
+            for user in (staff, AnonymousUser(), staff):
+                request = APIRequestFactory().get('/')
+                force_authenticate(request, user)
+                responses.append(view(request, pk=article.pk, **kwargs).status_code)
+            self.assertEqual(responses, [200, 403, 200])
+
+    def test_list_pages_are_invalidated(self):
+        from django_multilanguage_content import bulk_translate
+        Article.objects.create(title='cat', body='sleeps')
+        self.client.get(reverse('article-list'), {'lang': 'it'})
+        with self.assertNumQueries(0):
+            self.client.get(reverse('article-list'), {'lang': 'it'})
+        Article.objects.create(title='dog', body='barks')
+        self.assertEqual(len(self.client.get(reverse('article-list'), {'lang': 'it'}).json()), 2)
+
+        with override_settings(TRANSLATION_BACKENDS=[{
+            'BACKEND': 'django_multilanguage_content.backends.LocalBackend', 'OPTIONS': {'template': '{text}!'},
+        }]):
+            bulk_translate(Article.objects.all(), langs=['it'], overwrite=True)  # no signals, model version changes
+        self.assertEqual(self.client.get(reverse('article-list'), {'lang': 'it'}).json()[0]['title'], 'cat!')
+
+
+@override_settings(TRANSLATION_BACKENDS=[{
+    'BACKEND': 'django_multilanguage_content.backends.LocalBackend',
+    'OPTIONS': {'template': '{text} ({lang})'},
+}])
+class LazyTranslationTest(TestCase):
+    def setUp(self):
+        from django_multilanguage_content.demand import demand_tracker
+        self.demand_tracker = demand_tracker
+        self.demand_tracker.reset(Article)
+        Article.get_translation_options().lazy = True
+
+    def tearDown(self):
+        Article.get_translation_options().lazy = False
+        self.demand_tracker.reset(Article)
+
+    def test_translated_on_first_read(self):
+        article = Article.objects.create(title='cat', body='sleeps')
+        self.assertEqual(Article.get_translation_storage().get_many(article, ('en', 'fr', 'it')), {})
+
+        url = reverse('article-retrieve-update-connected', kwargs={'pk': article.pk, 'lang': 'fr'})
+        self.assertEqual(self.client.get(url).json()['title'], 'cat (fr)')
+        with self.assertNumQueries(2):  # base row and prefetched translation, nothing is written
+            self.assertEqual(self.client.get(url).json()['title'], 'cat (fr)')
+
+    def test_single_flight(self):
+        import threading
+        from concurrent.futures import ThreadPoolExecutor
+        from django_multilanguage_content.demand import SingleFlight
+        single_flight, started, release, calls = SingleFlight(), threading.Event(), threading.Event(), []
+
+        def translate():
+            calls.append(1)
+            started.set()
+            release.wait(5)
+            return 'record'
+
+        with ThreadPoolExecutor(4) as executor:
+            leader = executor.submit(single_flight.do, 'key', translate)
+            started.wait(5)
+            followers = [executor.submit(single_flight.do, 'key', translate) for _ in range(3)]
+            release.set()
+            results = [leader.result()] + [follower.result() for follower in followers]
+        self.assertEqual(results, ['record'] * 4)
+        self.assertEqual(len(calls), 1)
+
+    def test_hot_langs_are_translated_on_save(self):
+        from unittest import mock
+        from django_multilanguage_content import demand
+        article = Article.objects.create(title='cat', body='sleeps')
+        for lang in ('fr', 'fr', 'fr', 'it'):
+            article.get_connected_translated_model_instance(lang)
+        self.assertEqual(self.demand_tracker.counts(Article), {'fr': 3, 'it': 1})
+        self.assertEqual(self.demand_tracker.hot_langs(Article, share=0.5, min_reads=5), ())
+
+        with mock.patch.object(demand, 'hot_langs_share', 0.5), mock.patch.object(demand, 'hot_langs_min_reads', 4):
+            created = Article.objects.create(title='dog', body='barks')
+        self.assertEqual(list(Article.get_translation_storage().get_many(created, ('en', 'fr', 'it'))), ['fr'])
+
+
+@override_settings(TRANSLATION_BACKENDS=[{
+    'BACKEND': 'django_multilanguage_content.backends.LocalBackend',
+    'OPTIONS': {'template': '{text} ({lang})', 'detected': 'FR'},
+}])
+class PrefilterTest(TestCase):
+    def test_untranslatable_values_are_not_sent(self):
+        from django_multilanguage_content.signals import backend_called
+        from django_multilanguage_content.translator import main_translator
+        sent = []
+
+        def called(items, **kwargs):
+            sent.append(items)
+
+        backend_called.connect(called)
+        try:
+            values = ['', None, 42, ' 3.14 ', 'https://example.com/a', 'me@example.com', 'cat', 'cat']
+            self.assertEqual(main_translator(values, 'it'), values[:-2] + ['cat (it)', 'cat (it)'])
+            self.assertEqual(main_translator(['cat', 'dog'], 'it', source='it'), ['cat', 'dog'])
+        finally:
+            backend_called.disconnect(called)
+        self.assertEqual(sent, [1])
+
+    def test_language_equal_to_detected_source_is_copied(self):
+        article = Article.objects.create(title='chat', body='dort')
+        records = Article.get_translation_storage().get_many(article, ('en', 'fr', 'it'))
+        self.assertEqual(records['fr'].title, 'chat')
+        self.assertEqual(records['it'].title, 'chat (it)')
+
+
+@override_settings(TRANSLATION_BACKENDS=[{
+    'BACKEND': 'django_multilanguage_content.backends.LocalBackend',
+    'OPTIONS': {'template': '{text} ({lang})'},
+}])
+class TranslationsAdminTest(TestCase):
+    def setUp(self):
+        from django.contrib.auth.models import User
+        self.client.force_login(User.objects.create_superuser('admin', 'admin@example.com', 'password'))
+
+    def test_change_page_edits_every_language(self):
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+        article = Article.objects.create(title='cat', body='sleeps')
+        Article.get_translation_storage().connected_queryset('it').delete()
+        url = reverse('admin:djangotranslate_article_change', args=[article.pk])
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url)
+        self.assertContains(response, 'cat (fr)')
+        translation_table = Article.get_translation_storage().translation_model._meta.db_table
+        self.assertEqual(len([query for query in queries if translation_table in query['sql']]), 1)
+
+        prefix = 'article_translations'
+        data = {'title': 'cat', 'body': 'sleeps', f'{prefix}-TOTAL_FORMS': 3, f'{prefix}-INITIAL_FORMS': 3}
+        for index, lang in enumerate(('en', 'fr', 'it')):
+            data[f'{prefix}-{index}-title'] = {'en': 'cat (en)', 'fr': 'chat', 'it': 'gatto'}[lang]
+            data[f'{prefix}-{index}-body'] = {'en': 'sleeps (en)', 'fr': 'sleeps (fr)', 'it': 'dorme'}[lang]
+        self.assertEqual(self.client.post(url, data).status_code, 302)
+        records = Article.get_translation_storage().get_many(article, ('en', 'fr', 'it'))
+        self.assertEqual({lang: record.title for lang, record in records.items()},
+                         {'en': 'cat (en)', 'fr': 'chat', 'it': 'gatto'})
+
+    def test_missing_language_gets_other_fields_translated(self):
+        from django_multilanguage_content.consistency import scan_model
+        article = Article.objects.create(title='cat', body='sleeps')
+        Article.get_translation_storage().connected_queryset('it').delete()
+        prefix = 'article_translations'
+        data = {'title': 'cat', 'body': 'sleeps', f'{prefix}-TOTAL_FORMS': 3, f'{prefix}-INITIAL_FORMS': 3}
+        for index, lang in enumerate(('en', 'fr')):
+            data[f'{prefix}-{index}-title'], data[f'{prefix}-{index}-body'] = f'cat ({lang})', f'sleeps ({lang})'
+        data[f'{prefix}-2-title'], data[f'{prefix}-2-body'] = 'gatto', ''  # body of it is not edited
+        self.assertEqual(self.client.post(reverse('admin:djangotranslate_article_change', args=[article.pk]),
+                                          data).status_code, 302)
+        record = Article.get_translation_storage().get(article, 'it')
+        self.assertEqual((record.title, record.body), ('gatto', 'sleeps (it)'))
+        self.assertEqual([report.stale for report in scan_model(Article, ['it'], stale=True)], [0])
+
+    def test_translate_selected_action(self):
+        from unittest import mock
+        from django_multilanguage_content import admin as translation_admin
+        articles = [Article.objects.create(title=title, body='') for title in ('cat', 'dog')]
+        with mock.patch.object(translation_admin, 'bulk_translate', wraps=translation_admin.bulk_translate) as bulk:
+            self.client.post(reverse('admin:djangotranslate_article_changelist'), {
+                'action': 'translate_selected', '_selected_action': [article.pk for article in articles],
+            })
+        self.assertEqual(bulk.call_count, 1)
+        self.assertEqual(Article.get_translation_storage().fetch(articles[1], 'it').title, 'dog (it)')
+
+
+@override_settings(TRANSLATION_BACKENDS=[{
+    'BACKEND': 'django_multilanguage_content.backends.LocalBackend',
+    'OPTIONS': {'template': '{text} ({lang})'},
+}])
+class ConsistencyTest(TestCase):
+    def test_scan_and_repair(self):
+        from django_multilanguage_content.consistency import repair_model, scan_model
+        storage = Article.get_translation_storage()
+        articles = [Article.objects.create(title=title, body='') for title in ('cat', 'dog', 'owl')]
+        storage.connected_queryset('it').filter(article_ptr__in=articles[:2]).delete()
+        Article.objects.filter(pk=articles[2].pk).update(title='eagle')  # no signal - fr, en, it are stale
+        storage.new_record(articles[0], 'de', {'title': 'Katze', 'body': ''}).save()  # language is not followed
+
+        with self.assertNumQueries(2):  # missing records of every language, orphaned records of every language
+            scan_model(Article, sample_size=0)
+        reports = {report.lang: report for report in scan_model(Article, stale=True)}
+        self.assertEqual((reports['it'].missing, reports['it'].missing_sample), (2, [articles[0].pk, articles[1].pk]))
+        self.assertEqual(reports['de'].orphaned, 1)
+        self.assertEqual([reports[lang].stale for lang in ('en', 'fr', 'it')], [1, 1, 1])
+
+        repair_model(Article, missing=True, orphaned=True, stale=True)
+        self.assertTrue(all(report.ok for report in scan_model(Article, stale=True)))
+        self.assertEqual(storage.fetch(articles[2], 'fr').title, 'eagle (fr)')
+
+    def test_simple_model_scan(self):
+        from django_multilanguage_content.consistency import scan
+        rows = create_translated_simple(2, langs=('fr', 'it', 'en'))
+        Simple.get_connected_translated_model_class('en').objects.filter(simple_ptr=rows[0]).delete()
+        reports = {report.lang: report for report in scan([Simple], stale=True)}
+        self.assertEqual(reports['en'].missing_sample, [rows[0].pk])
+        # bulk created records have no source hashes
+        self.assertEqual(reports['fr'].stale, 2)
+
+
+@override_settings(TRANSLATION_BACKENDS=[{
+    'BACKEND': 'django_multilanguage_content.backends.LocalBackend',
+    'OPTIONS': {'template': '{text} ({lang})'},
+}])
+class ExchangeTest(TestCase):
+    def test_export_and_import_round_trip(self):
+        import io
+        from django_multilanguage_content.exchange import (WRITERS, export_entries, import_entries,
+                                                           read_entries)
+        from django_multilanguage_content.memory import translation_memory
+        from django_multilanguage_content.translator import main_translator
+        storage = Article.get_translation_storage()
+        cat = Article.objects.create(title='cat', body='sleeps\n"quietly"')
+        owl = Article.objects.create(title='owl', body='')
+        storage.connected_queryset('it').filter(article_ptr=owl).delete()
+
+        for file_format in ('jsonl', 'po', 'xliff'):
+            out = io.StringIO()
+            WRITERS[file_format](export_entries([Article], ['fr', 'it']), out)
+            data = out.getvalue()
+            source = io.BytesIO(data.encode()) if file_format == 'xliff' else io.StringIO(data)
+            entries = list(read_entries(source, file_format))
+            self.assertEqual(entries, list(export_entries([Article], ['fr', 'it'])))
+        self.assertEqual([(entry.pk, entry.lang, entry.field) for entry in entries],
+                         [(str(cat.pk), 'fr', 'title'), (str(cat.pk), 'fr', 'body'), (str(owl.pk), 'fr', 'title'),
+                          (str(cat.pk), 'it', 'title'), (str(cat.pk), 'it', 'body')])
+
+        corrected = [entries[0]._replace(translation='chat'), entries[3]._replace(translation='gatto'),
+                     entries[2]._replace(lang='it', translation='gufo'),  # missing record is created
+                     entries[4]._replace(source='changed', translation='x')]  # source changed since export
+        stats = import_entries(corrected, batch_size=2)
+        self.assertEqual(stats, {'updated': 2, 'created': 1, 'skipped': 1})
+        self.assertEqual(storage.fetch(cat, 'fr').title, 'chat')
+        self.assertEqual(storage.fetch(owl, 'it').title, 'gufo')
+        self.assertEqual(translation_memory.get_many(['cat'], 'it', main_translator.name), {'cat': 'gatto'})
+        # corrected fields are up to date, they are not translated again on save
+        cat.save()
+        self.assertEqual(storage.fetch(cat, 'fr').title, 'chat')
+
+    def test_unknown_model_labels_are_skipped(self):
+        import io
+        from django_multilanguage_content.exchange import Entry, import_entries, write_xliff
+        cat = Article.objects.create(title='cat', body='sleeps')
+        entries = [Entry('djangotranslate.Missing', '1', 'fr', 'title', 'cat', 'chat'),
+                   Entry('malformed', '1', 'fr', 'title', 'cat', 'chat'),
+                   Entry('djangotranslate.Diff', '1', 'fr', 'name', 'cat', 'chat'),
+                   Entry('djangotranslate.Article', str(cat.pk), 'fr', 'title', 'cat', 'chat')]
+        self.assertEqual(import_entries(entries), {'updated': 1, 'created': 0, 'skipped': 3})
+        out = io.StringIO()
+        self.assertEqual(write_xliff(entries[:2], out), 2)
+        self.assertIn('source-language="und"', out.getvalue())
@@ -1,11 +1,17 @@
 from rest_framework.routers import DefaultRouter
 from django.urls import path, include
-from .views import SimpleSet
+from django_multilanguage_content.views import async_retrieve_update_connected, async_translate
+from .views import ArticleSet, SimpleSet
 
 router = DefaultRouter()
 router.register('simple', SimpleSet, basename='simple')
+router.register('article', ArticleSet, basename='article')
 
 
 urlpatterns = [
-    path('', include(router.urls))
+    path('', include(router.urls)),
+    # async counterparts of connected records actions, for ASGI
+    path('async/article/<pk>/translated/<lang>/', async_retrieve_update_connected, {'viewset': ArticleSet},
+         name='article-async-connected'),
+    path('async/article/<pk>/translate/', async_translate, {'viewset': ArticleSet}, name='article-async-translate'),
 ]
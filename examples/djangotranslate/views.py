@@ -1,4 +1,4 @@
-from .models import Simple
+from .models import Article, Simple
 from django_multilanguage_content.serializers import TranslationModelSerializer
 from django_multilanguage_content.views import TranslationViewSet
 
@@ -14,5 +14,21 @@ class SimpleSerializer(TranslationModelSerializer):
 
 
 class SimpleSet(TranslationViewSet):
+    language_negotiation = True
     serializer_class = SimpleSerializer
     queryset = Simple.objects.all()
+
+
+class ArticleSerializer(TranslationModelSerializer):
+
+    class Meta:
+        model = Article
+        fields = '__all__'
+        translations = ['en', 'fr', 'it']
+
+
+class ArticleSet(TranslationViewSet):
+    language_negotiation = True
+    cache_translations = True
+    serializer_class = ArticleSerializer
+    queryset = Article.objects.all()